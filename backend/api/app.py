@@ -1,13 +1,14 @@
-from flask import Flask, request, jsonify, send_from_directory, make_response
+from flask import Blueprint, Flask, Response, g, request, jsonify, send_from_directory, make_response, stream_with_context
 from flask_cors import CORS
 import sys
 import os
 from pathlib import Path
 import json
 import logging
+import hashlib
+import threading
+import time
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Add the services directory to the system path
@@ -16,57 +17,253 @@ sys.path.append(str(service_dir))
 
 try:
     import game_manager
+    import cover_art
+    import file_watch
+    import config as config_service
+    import database
+    import metrics
 except ImportError as e:
     logger.error(f"Error importing game_manager: {e}")
     logger.error(f"Python path: {sys.path}")
     logger.error(f"Looking for module in: {service_dir}")
     raise
 
-app = Flask(__name__)
-CORS(app)  # Enable CORS for cross-origin requests
+from routes.games import games_blueprint
 
-# Initialize the database
-game_manager.init_db()
+# Routes are registered on the app by create_app(); importing this module has
+# no side effects beyond defining them.
+api = Blueprint("api", __name__)
 
 # Directory to store cover art images
 COVER_ART_DIR = Path(__file__).parent / 'cover_art'
-CACHE_COVER_ART_DIR = Path(os.getenv("CACHE_COVER_ART_DIR", "cache/cover_art"))
 SETTINGS_FILE = Path(__file__).parent / 'settings.json'
+settings_store = config_service.ConfigStore(str(SETTINGS_FILE), config_service.SETTINGS_SCHEMA)
 MUSIC_DIR = Path(os.getenv("MUSIC_DIR", "music"))
+MUSIC_MAX_AGE = 3600
 
-@app.route("/", methods=["GET"])
+def send_static_file(directory, filename, max_age=None):
+    # send_file already answers conditional (304) and Range (206 / 416)
+    # requests; max_age lets clients reuse the file without revalidating.
+    return send_from_directory(directory, filename, max_age=max_age)
+
+def pool_exhausted(e):
+    # Every database connection is busy; the request may well succeed shortly
+    logger.warning(str(e))
+    response = jsonify({"error": "The server is busy, please retry."})
+    response.headers["Retry-After"] = "1"
+    return response, 503
+
+def error_response(e):
+    # JSON error for a request that failed with ``e``
+    if isinstance(e, database.PoolExhausted):
+        return pool_exhausted(e)
+    return jsonify({"error": str(e)}), 500
+
+def scan_music_dir(path):
+    try:
+        with os.scandir(path) as entries:
+            return sorted(entry.name for entry in entries if entry.is_file())
+    except FileNotFoundError:
+        return []
+
+# Re-listed only when the directory's mtime changes (a file was added, removed or renamed)
+music_listing = file_watch.StatCache(str(MUSIC_DIR), scan_music_dir)
+
+@api.route("/", methods=["GET"])
 def root():
     logger.info("Root endpoint called")
     return jsonify({
         "name": "Game Launcher API",
         "version": "1.0",
         "endpoints": {
-            "GET /api/games": "List all games",
+            "GET /api/games": "List games (optional limit, cursor, "
+                             "sort=id|title|added_date|display_order|most_played|recently_played, order, search)",
+            "GET /api/games/changes": "Library changes since a revision (SSE, or JSON when polled)",
             "POST /api/games": "Add a new game",
-            "POST /api/games/<id>/run": "Run a game",
+            "POST /api/games/<id>/run": "Run a game (returns immediately with a session; "
+                                          "store URLs give an untracked handed_off session)",
+            "GET /api/games/<id>/sessions": "Recent sessions of a game (optional limit)",
+            "GET /api/sessions": "List running game sessions",
+            "POST /api/sessions/<id>/stop": "Stop a running game session",
+            "GET /api/catalog/": "All games with paths and store IDs, from the in-memory catalog",
+            "POST /api/catalog/": "Add a game unless its executable path is already in the library",
+            "DELETE /api/catalog/<id>": "Delete a game through the catalog",
+            "POST /api/catalog/<id>/launch": "Run a game through the catalog",
+            "POST /api/games/batch": "Apply add/update/delete operations in one transaction (optional atomic)",
             "PATCH /api/games/<id>": "Update a game",
+            "GET /api/library/export": "Download the library as NDJSON (?covers=1 for a tar.gz with cover art)",
+            "POST /api/library/import": "Merge an NDJSON export or archive into the library (matched by executable path)",
             "DELETE /api/games/<id>": "Delete a game",
-            "POST /api/games/scan": "Scan directory for games",
-            "GET /cover_art/<filename>": "Get cover art image",
+            "POST /api/games/scan": "Queue a directory scan (returns a job)",
+            "POST /api/games/scan_steam": "Queue a scan of the Steam libraries (returns a job)",
+            "POST /api/games/scan_epic": "Queue a scan of installed Epic games (returns a job)",
+            "GET /api/jobs/<id>": "Job status and progress",
+            "GET /api/jobs/<id>/events": "Job progress as Server-Sent Events",
+            "POST /api/games/order": "Set the display order of games",
+            "GET /cover_art/<filename>": "Get cover art image (?size=grid|detail|original)",
             "GET /api/settings": "Get settings",
             "POST /api/settings": "Update settings",
             "GET /api/music": "List available music files",
-            "GET /music/<filename>": "Get background music file"
+            "GET /music/<filename>": "Get background music file",
+            "GET /metrics": "Prometheus metrics (latency histograms, DB statements, scan throughput)"
         }
     })
 
-@app.route("/api/games", methods=["GET"])
-def list_games():
-    logger.info("List games endpoint called")
-    games = game_manager.get_games()
-    return jsonify([{
-        "id": g[0], 
-        "title": g[1], 
+MAX_PAGE_SIZE = 1000
+
+def game_to_dict(g):
+    game = {
+        "id": g[0],
+        "title": g[1],
         "cover_art_path": g[2],
         "background": g[3] if g[3] is not None else g[2]  # Use background if available, otherwise use cover_art_path
-    } for g in games])
+    }
+    if len(g) > 4:
+        game["added_date"] = g[4]
+        game["display_order"] = g[5]
+        game["playtime"] = g[6]
+        game["launch_count"] = g[7]
+        game["last_played"] = g[8] or None
+    return game
+
+def stream_json_array(rows):
+    # Emit the list row by row so large libraries never sit in memory as one JSON document
+    yield "["
+    for idx, row in enumerate(rows):
+        yield ("," if idx else "") + json.dumps(game_to_dict(row))
+    yield "]"
+
+# Serialized default game list, rebuilt only when game_manager's library
+# revision moves on. Keyed by revision so polling an idle library never
+# touches SQLite.
+_games_list_cache = None  # (revision, etag, body, feed revision)
+_games_list_lock = threading.Lock()
+
+def cached_games_list():
+    global _games_list_cache
+    revision = game_manager.library_revision()
+    cached = _games_list_cache
+    if cached is None or cached[0] != revision:
+        with _games_list_lock:
+            cached = _games_list_cache
+            if cached is None or cached[0] != revision:
+                # Read before the list, so a change racing with it is replayed
+                # by the change feed rather than lost
+                feed_revision = game_manager.feed_revision()
+                body = "".join(stream_json_array(game_manager.iter_games())).encode()
+                # Content hash rather than the revision, so every worker process
+                # hands out the same strong ETag for the same list.
+                etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+                cached = (revision, etag, body, feed_revision)
+                _games_list_cache = cached
+    return cached[1], cached[2], cached[3]
+
+@api.route("/api/games", methods=["GET"])
+def list_games():
+    logger.info("List games endpoint called")
+    if not request.args:
+        etag, body, feed_revision = cached_games_list()
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        else:
+            response = Response(body, mimetype="application/json")
+        response.set_etag(etag)
+        # Resume point for /api/games/changes
+        response.headers["X-Library-Revision"] = str(feed_revision)
+        response.headers["Cache-Control"] = "no-cache"
+        return response
+    sort = request.args.get("sort", "id")
+    order = request.args.get("order", "asc")
+    search = request.args.get("search") or None
+    cursor = request.args.get("cursor") or None
+    limit = request.args.get("limit", type=int)
+    if limit is not None and limit < 1:
+        return jsonify({"error": "'limit' must be at least 1"}), 400
+    try:
+        if limit is None and cursor is None:
+            rows = game_manager.iter_games(sort=sort, order=order, search=search)
+            return Response(stream_with_context(stream_json_array(rows)), mimetype="application/json")
+        # A cursor without a limit gets full pages
+        limit = MAX_PAGE_SIZE if limit is None else min(limit, MAX_PAGE_SIZE)
+        rows, next_cursor = game_manager.query_games(limit, sort=sort, order=order, search=search, cursor=cursor)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({"games": [game_to_dict(g) for g in rows], "next_cursor": next_cursor})
 
-@app.route("/api/games", methods=["POST"])
+def change_to_dict(change):
+    revision, op, game_id, row = change
+    entry = {"revision": revision, "op": op, "id": game_id}
+    if row is not None:
+        entry["game"] = game_to_dict(row)
+    return entry
+
+# How often the change feed re-reads the log for writes made by other server
+# processes; writes made by this process wake it immediately.
+CHANGE_POLL_INTERVAL = 1.0
+# Idle event streams send a comment line this often so that the connection
+# (and any proxy in between) does not time out
+SSE_KEEPALIVE = 15
+# Every open event stream holds a server thread (see launcher.py), so streams
+# end after this long and the browser's EventSource reconnects after its retry
+# delay, resuming from Last-Event-ID. A burst of idle tabs cannot starve
+# ordinary requests for longer than this.
+SSE_MAX_DURATION = 300
+SSE_RETRY_MS = 2000
+
+@api.route("/api/games/changes", methods=["GET"])
+def game_changes():
+    """Library deltas after ``since`` (or the SSE Last-Event-ID).
+
+    EventSource clients get a stream of "change" events whose id is the
+    revision, so a reconnect resumes where it stopped; "reset" means the
+    revision is too old and the list has to be fetched again. Other clients
+    get one JSON batch to poll with.
+    """
+    # An EventSource reconnect repeats the original URL, so its Last-Event-ID
+    # is newer than any ?since= in it
+    since = request.headers.get("Last-Event-ID", type=int)
+    if since is None:
+        since = request.args.get("since", type=int)
+    if since is None:
+        since = game_manager.feed_revision()
+    if "text/event-stream" not in request.accept_mimetypes.values():
+        changes, reset = game_manager.changes_since(since)
+        revision = changes[-1][0] if changes else (game_manager.feed_revision() if reset else since)
+        return jsonify({"revision": revision, "reset": reset, "changes": [change_to_dict(c) for c in changes]})
+
+    def events():
+        revision = since
+        # The change log is only read again once library_revision() has moved,
+        # so an idle stream costs a stat() per poll rather than a query
+        seen = None
+        idle = 0.0
+        deadline = time.monotonic() + SSE_MAX_DURATION
+        yield f"retry: {SSE_RETRY_MS}\n\n"
+        while time.monotonic() < deadline:
+            marker = game_manager.library_revision()
+            if marker != seen:
+                changes, reset = game_manager.changes_since(revision)
+                if reset:
+                    revision = game_manager.feed_revision()
+                    yield f"id: {revision}\nevent: reset\ndata: {json.dumps({'revision': revision})}\n\n"
+                    continue
+                for change in changes:
+                    revision = change[0]
+                    yield f"id: {revision}\nevent: change\ndata: {json.dumps(change_to_dict(change))}\n\n"
+                if changes:
+                    idle = 0.0
+                    continue  # there may be more than one batch
+                seen = marker
+            if not game_manager.wait_for_library_change(marker, timeout=CHANGE_POLL_INTERVAL):
+                idle += CHANGE_POLL_INTERVAL
+                if idle >= SSE_KEEPALIVE:
+                    idle = 0.0
+                    yield ": keep-alive\n\n"
+
+    return Response(stream_with_context(events()), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@api.route("/api/games", methods=["POST"])
 def add_game():
     data = request.json
     title = data.get("title")
@@ -81,17 +278,92 @@ def add_game():
     logger.info(f"Game '{title}' added successfully")
     return jsonify({"message": f"Game '{title}' added successfully."}), 201
 
-@app.route("/api/games/<int:game_id>/run", methods=["POST"])
+@api.route("/api/games/<int:game_id>/run", methods=["POST"])
 def run_game(game_id):
     try:
-        game_manager.run_game(game_id)
-        logger.info(f"Game with ID {game_id} launched successfully")
-        return jsonify({"message": f"Game with ID {game_id} launched successfully."}), 200
+        session = game_manager.run_game(game_id)
     except Exception as e:
         logger.error(f"Error launching game with ID {game_id}: {e}")
-        return jsonify({"error": str(e)}), 500
+        return error_response(e)
+    if session is None:
+        logger.error(f"Game with ID {game_id} could not be launched")
+        return jsonify({"error": f"Game with ID {game_id} could not be launched."}), 500
+    logger.info(f"Game with ID {game_id} launched successfully")
+    return jsonify({"message": f"Game with ID {game_id} launched successfully.", "session": session}), 200
+
+@api.route("/api/games/<int:game_id>/sessions", methods=["GET"])
+def list_game_sessions(game_id):
+    limit = max(1, min(request.args.get("limit", 50, type=int), MAX_PAGE_SIZE))
+    return jsonify(game_manager.game_sessions(game_id, limit))
+
+@api.route("/api/sessions", methods=["GET"])
+def list_sessions():
+    return jsonify(game_manager.running_sessions())
+
+@api.route("/api/sessions/<int:session_id>/stop", methods=["POST"])
+def stop_session(session_id):
+    try:
+        if not game_manager.stop_session(session_id):
+            return jsonify({"error": f"No running session with ID {session_id}."}), 404
+    except Exception as e:
+        logger.error(f"Error stopping session {session_id}: {e}")
+        return error_response(e)
+    logger.info(f"Session {session_id} stopped")
+    return jsonify({"message": f"Session {session_id} stopped."}), 200
+
+@api.route("/api/games/batch", methods=["POST"])
+def batch_games():
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "Request body must be a JSON object"}), 400
+    operations = data.get("operations")
+    if not isinstance(operations, list) or not operations:
+        return jsonify({"error": "'operations' must be a non-empty list"}), 400
+    if not all(isinstance(operation, dict) for operation in operations):
+        return jsonify({"error": "Every operation must be an object"}), 400
+    if len(operations) > game_manager.MAX_BATCH_SIZE:
+        return jsonify({"error": f"At most {game_manager.MAX_BATCH_SIZE} operations per batch"}), 413
+    atomic = data.get("atomic", True)
+    if not isinstance(atomic, bool):
+        return jsonify({"error": "'atomic' must be true or false"}), 400
+    try:
+        committed, results = game_manager.apply_game_batch(operations, atomic=atomic)
+    except Exception as e:
+        logger.error(f"Error applying a batch of {len(operations)} operations: {e}")
+        return error_response(e)
+    logger.info(f"Batch of {len(operations)} operations {'committed' if committed else 'rolled back'}")
+    # 409 when an atomic batch was rolled back because an operation failed
+    return jsonify({"committed": committed, "results": results}), 200 if committed else 409
+
+@api.route("/api/library/export", methods=["GET"])
+def export_library():
+    # ?covers=1 bundles the cover art into a tar.gz (?compress=0 for plain tar)
+    if request.args.get("covers") in ("1", "true"):
+        compress = request.args.get("compress") not in ("0", "false")
+        response = Response(game_manager.iter_export_archive(compress=compress),
+                            mimetype="application/gzip" if compress else "application/x-tar")
+        filename = "game-library.tar.gz" if compress else "game-library.tar"
+    else:
+        response = Response(game_manager.iter_export_ndjson(), mimetype="application/x-ndjson")
+        filename = "game-library.ndjson"
+    response.headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    logger.info(f"Library export started ({filename})")
+    return response
+
+@api.route("/api/library/import", methods=["POST"])
+def import_library():
+    # The body is read as a stream: NDJSON or an archive from /api/library/export
+    try:
+        summary = game_manager.import_library(request.stream)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error importing a library: {e}")
+        return error_response(e)
+    logger.info(f"Library imported: {summary['inserted']} added, {summary['updated']} updated")
+    return jsonify(summary), 200
 
-@app.route("/api/games/<int:game_id>", methods=["PATCH"])
+@api.route("/api/games/<int:game_id>", methods=["PATCH"])
 def update_game(game_id):
     data = request.json
     title = data.get("title")
@@ -102,7 +374,7 @@ def update_game(game_id):
     logger.info(f"Game with ID {game_id} updated successfully")
     return jsonify({"message": f"Game with ID {game_id} updated successfully."}), 200
 
-@app.route("/api/games/<int:game_id>", methods=["DELETE"])
+@api.route("/api/games/<int:game_id>", methods=["DELETE"])
 def delete_game(game_id):
     try:
         game_manager.delete_game(game_id)
@@ -110,30 +382,97 @@ def delete_game(game_id):
         return jsonify({"message": f"Game with ID {game_id} deleted successfully."}), 200
     except Exception as e:
         logger.error(f"Error deleting game with ID {game_id}: {e}")
-        return jsonify({"error": str(e)}), 500
+        return error_response(e)
 
-@app.route("/api/games/scan", methods=["POST"])
+def job_accepted(job, created, message):
+    # 202 with the job to poll; a scan that was already running is returned as is
+    response = jsonify({"message": message if created else "A matching scan is already in progress.",
+                        "job": job, "coalesced": not created})
+    response.status_code = 202
+    response.headers["Location"] = f"/api/jobs/{job['id']}"
+    return response
+
+@api.route("/api/games/scan", methods=["POST"])
 def scan_games():
-    directory = request.json.get("directory", ".")
+    data = request.get_json(silent=True) or {}
+    directory = data.get("directory", ".")
+    full = bool(data.get("full", False))
+    try:
+        job, created = game_manager.start_scan(directory, full=full)
+        logger.info(f"Scan of directory '{directory}' queued as job {job['id']}")
+        return job_accepted(job, created, f"Scan of directory '{directory}' queued.")
+    except Exception as e:
+        logger.error(f"Error queueing a scan of directory '{directory}': {e}")
+        return error_response(e)
+
+@api.route("/api/games/scan_steam", methods=["POST"])
+def scan_steam_games():
     try:
-        game_manager.scan_for_games(directory)
-        logger.info(f"Scanned for games in directory '{directory}'")
-        return jsonify({"message": f"Scanned for games in directory '{directory}'."}), 200
+        job, created = game_manager.start_steam_scan()
+        logger.info(f"Steam scan queued as job {job['id']}")
+        return job_accepted(job, created, "Steam scan queued.")
     except Exception as e:
-        logger.error(f"Error scanning for games in directory '{directory}': {e}")
-        return jsonify({"error": str(e)}), 500
+        logger.error(f"Error queueing a Steam scan: {e}")
+        return error_response(e)
 
-@app.route("/api/games/scan_epic", methods=["POST"])
+@api.route("/api/games/scan_epic", methods=["POST"])
 def scan_epic_games():
+    full = bool((request.get_json(silent=True) or {}).get("full", False))
     try:
-        game_manager.scan_for_epic_games()
-        logger.info("Scanned for Epic Games")
-        return jsonify({"message": "Scanned for Epic Games."}), 200
+        job, created = game_manager.start_epic_scan(full=full)
+        logger.info(f"Epic Games scan queued as job {job['id']}")
+        return job_accepted(job, created, "Epic Games scan queued.")
     except Exception as e:
-        logger.error(f"Error scanning for Epic Games: {e}")
-        return jsonify({"error": str(e)}), 500
+        logger.error(f"Error queueing an Epic Games scan: {e}")
+        return error_response(e)
+
+@api.route("/api/jobs", methods=["GET"])
+def list_jobs():
+    limit = min(max(request.args.get("limit", 50, type=int), 1), MAX_PAGE_SIZE)
+    return jsonify(game_manager.get_job_queue().list(limit))
+
+@api.route("/api/jobs/<int:job_id>", methods=["GET"])
+def get_job(job_id):
+    job = game_manager.get_job_queue().get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job)
+
+# Progress events are sent at most this often
+JOB_EVENT_INTERVAL = 0.25
 
-@app.route("/api/games/bulk_delete", methods=["POST"])
+@api.route("/api/jobs/<int:job_id>/events", methods=["GET"])
+def job_events(job_id):
+    queue = game_manager.get_job_queue()
+    job = queue.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+
+    def events():
+        current = job
+        deadline = time.monotonic() + SSE_MAX_DURATION
+        yield f"retry: {SSE_RETRY_MS}\n\n"
+        while True:
+            finished = current["status"] not in ("queued", "running")
+            yield f"event: {current['status'] if finished else 'progress'}\ndata: {json.dumps(current)}\n\n"
+            if finished or time.monotonic() >= deadline:
+                return  # a reconnect starts again from the job's current state
+            time.sleep(JOB_EVENT_INTERVAL)
+            previous = current
+            while current == previous:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                current = queue.wait(job_id, previous, timeout=min(SSE_KEEPALIVE, remaining))
+                if current is None:
+                    return
+                if current == previous:
+                    yield ": keep-alive\n\n"
+
+    return Response(stream_with_context(events()), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@api.route("/api/games/bulk_delete", methods=["POST"])
 def bulk_delete_games():
     data = request.json
     game_ids = data.get("game_ids", [])
@@ -148,53 +487,146 @@ def bulk_delete_games():
         return jsonify({"message": f"Games with IDs {game_ids} deleted successfully."}), 200
     except Exception as e:
         logger.error(f"Error deleting games with IDs {game_ids}: {e}")
-        return jsonify({"error": str(e)}), 500
+        return error_response(e)
+
+@api.route("/api/games/order", methods=["POST"])
+def reorder_games():
+    game_ids = (request.json or {}).get("game_ids", [])
 
-@app.route("/cover_art/<filename>")
+    if not game_ids:
+        logger.error("No game IDs provided for reorder")
+        return jsonify({"error": "No game IDs provided"}), 400
+    if not isinstance(game_ids, list) or not all(type(game_id) is int for game_id in game_ids):
+        return jsonify({"error": "'game_ids' must be a list of integer IDs"}), 400
+
+    game_manager.reorder_games(game_ids)
+    logger.info(f"Display order updated for {len(game_ids)} games")
+    return jsonify({"message": "Display order updated successfully."}), 200
+
+@api.route("/cover_art/<filename>")
 def get_cover_art(filename):
     logger.info(f"Request for cover art: {filename}")
-    response = make_response(send_from_directory(CACHE_COVER_ART_DIR, filename))
-    response.headers['Cache-Control'] = 'public, max-age=31536000'  # Cache for 1 year
+    size = request.args.get("size", "original")
+    if size != "original" and size not in cover_art.VARIANTS:
+        return jsonify({"error": f"Unknown cover art size '{size}'"}), 400
+    # No Accept header at all means anything goes (see cover_art.WILDCARD_FORMATS)
+    accepted = [mimetype for mimetype, quality in request.accept_mimetypes if quality > 0]
+    if "Accept" not in request.headers:
+        accepted = ["*/*"]
+    store_dir = Path(game_manager.get_cover_store_dir())
+    name, exact = cover_art.resolve(str(store_dir), filename, size, accepted)
+    directory = store_dir
+    if not (store_dir / name).is_file() and (COVER_ART_DIR / filename).is_file():
+        directory, name = COVER_ART_DIR, filename  # added before the content-addressed store
+    response = make_response(send_static_file(directory, name))
+    if not exact:
+        # Variant still being generated: don't let the original stick under this URL
+        response.headers['Cache-Control'] = 'no-cache'
+    elif cover_art.is_content_addressed(filename):
+        response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    else:
+        response.headers['Cache-Control'] = 'public, max-age=31536000'  # Cache for 1 year
+    response.vary.add("Accept")
     return response
 
-@app.route("/api/settings", methods=["GET"])
+@api.route("/api/settings", methods=["GET"])
 def get_settings():
     logger.info("Get settings endpoint called")
-    with open(SETTINGS_FILE, "r") as file:
-        settings = json.load(file)
-    return jsonify(settings)
+    return jsonify(settings_store.get())
 
-@app.route("/api/settings", methods=["POST"])
+@api.route("/api/settings", methods=["POST"])
 def update_settings():
-    data = request.json
-    with open(SETTINGS_FILE, "w") as file:
-        json.dump(data, file, indent=4)
+    data = request.get_json(silent=True)
+    try:
+        settings_store.replace(data)
+    except config_service.ConfigError as e:
+        return jsonify({"error": str(e)}), 400
     logger.info("Settings updated successfully")
     return jsonify({"message": "Settings updated successfully."})
 
-@app.route("/api/music", methods=["GET"])
+@api.route("/api/music", methods=["GET"])
 def list_music():
     logger.info("List music endpoint called")
-    music_files = [f for f in os.listdir(MUSIC_DIR) if os.path.isfile(os.path.join(MUSIC_DIR, f))]
-    return jsonify(music_files)
+    return jsonify(music_listing.get())
 
-@app.route("/music/<filename>")
+@api.route("/music/<filename>")
 def get_music(filename):
     logger.info(f"Request for music: {filename}")
-    return send_from_directory(MUSIC_DIR, filename)
+    return send_static_file(MUSIC_DIR, filename, max_age=MUSIC_MAX_AGE)
 
-@app.route("/api/config", methods=["POST"])
+@api.route("/api/config", methods=["POST"])
 def update_config():
     new_config = request.json
     try:
         game_manager.edit_config(new_config)
         logger.info("Configuration updated successfully")
         return jsonify({"message": "Configuration updated successfully."}), 200
+    except config_service.ConfigError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         logger.error(f"Error updating configuration: {e}")
-        return jsonify({"error": str(e)}), 500
+        return error_response(e)
+
+@api.route("/metrics", methods=["GET"])
+def prometheus_metrics():
+    # Per process: under a multi-worker server each scrape sees one worker
+    return Response(metrics.REGISTRY.render(), mimetype="text/plain; version=0.0.4")
+
+# game_manager functions that are too small or called too often to be worth
+# timing, and the interactive CLI
+UNTIMED_FUNCTIONS = (
+    "app_data_dir", "config_store", "connection", "decode_cursor", "display_menu", "encode_cursor",
+    "get_config", "get_cover_store_dir", "get_db_path", "get_pool", "library_revision", "main",
+    "simple_menu", "transaction", "wait_for_library_change",
+)
+
+def record_request_metrics(app):
+    @app.before_request
+    def start_request_timer():
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def observe_request(response):
+        started = g.pop("request_started", None)
+        if started is not None:
+            endpoint = request.url_rule.rule if request.url_rule is not None else "unmatched"
+            metrics.http_request_seconds.observe(time.perf_counter() - started, method=request.method,
+                                                 endpoint=endpoint, status=response.status_code)
+        return response
+
+def create_app():
+    app = Flask(__name__)
+    CORS(app)  # Enable CORS for cross-origin requests
+    # Behind a front-end server that supports X-Sendfile, let it send static files;
+    # otherwise send_file uses the WSGI server's file_wrapper (sendfile where supported).
+    app.config["USE_X_SENDFILE"] = os.getenv("USE_X_SENDFILE", "0") == "1"
+
+    record_request_metrics(app)
+    database.set_trace_callback(metrics.count_statement)
+    metrics.instrument(game_manager, exclude=UNTIMED_FUNCTIONS)
+    # PROFILE_DIR=<dir> writes a cProfile dump per request there (profiling
+    # slows every request down, so it is off unless asked for)
+    profile_dir = os.getenv("PROFILE_DIR")
+    if profile_dir:
+        from werkzeug.middleware.profiler import ProfilerMiddleware
+        os.makedirs(profile_dir, exist_ok=True)
+        app.wsgi_app = ProfilerMiddleware(app.wsgi_app, stream=None, profile_dir=profile_dir)
+
+    # Both files are served from memory; edits made on disk are picked up by
+    # the watchers without a restart.
+    settings_store.watch()
+    game_manager.config_store().watch()
+
+    # Initialize the database
+    game_manager.init_db()
+
+    app.register_blueprint(api)
+    app.register_blueprint(games_blueprint, url_prefix="/api/catalog")
+    app.register_error_handler(database.PoolExhausted, pool_exhausted)
+    return app
 
 if __name__ == "__main__":
-    logger.info("Starting backend server")
+    logging.basicConfig(level=logging.INFO)
+    logger.info("Starting backend development server (use launcher.py in production)")
     # Disable reloader to prevent the Flask app from restarting
-    app.run(debug=True, port=5000, use_reloader=False)
\ No newline at end of file
+    create_app().run(debug=os.getenv("FLASK_DEBUG") == "1", port=5000, use_reloader=False, threaded=True)
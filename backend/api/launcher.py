@@ -0,0 +1,121 @@
+"""Production entry point for the Game Launcher API.
+
+Runs app.create_app() under a real WSGI server instead of Flask's development
+server:
+
+* gunicorn (Linux/macOS): ``--workers`` pre-forked processes with ``--threads``
+  threads each (gthread worker, so long-lived SSE streams only hold a thread);
+* waitress (any platform, the default on Windows): one process with
+  ``--threads`` threads.
+
+Each open event stream (change feed, job progress) holds one thread until it
+ends, which app.SSE_MAX_DURATION caps at a few minutes before the browser
+reconnects. Requests queue up while every thread is busy, so ``--threads`` in
+total must stay above the number of streams expected at once; the defaults
+leave room for 32 per server. Each process gets a database connection per
+thread unless config.json sets db_pool_size.
+
+Every option can also be set through the environment (GAME_LAUNCHER_HOST,
+GAME_LAUNCHER_PORT, GAME_LAUNCHER_WORKERS, GAME_LAUNCHER_THREADS,
+GAME_LAUNCHER_SERVER).
+
+    python backend/api/launcher.py --workers 4 --threads 8
+"""
+import argparse
+import logging
+import os
+import sys
+
+from app import create_app
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 5000
+# Threads are mostly idle in SSE streams or waiting on SQLite, so they are cheap
+SERVER_THREADS = 32
+# Database connections on top of one per thread (see size_pool)
+POOL_HEADROOM = 4
+
+
+def default_workers():
+    # Requests mostly wait on SQLite and the disk, so a few processes go a long way
+    return min(os.cpu_count() or 1, 4)
+
+
+def default_threads(server, workers):
+    # About SERVER_THREADS in total: waitress runs them all in one process,
+    # gunicorn splits them across its workers
+    if server == "waitress":
+        return SERVER_THREADS
+    return max(8, SERVER_THREADS // max(1, workers))
+
+
+def size_pool(threads):
+    # One connection per request thread (a thread reuses its own), plus a few
+    # for job workers, the cover art pool and session reapers
+    import game_manager
+    game_manager.DB_POOL_SIZE = max(game_manager.DB_POOL_SIZE, threads + POOL_HEADROOM)
+
+
+def run_gunicorn(host, port, workers, threads):
+    from gunicorn.app.base import BaseApplication
+
+    class LauncherApplication(BaseApplication):
+        def load_config(self):
+            self.cfg.set("bind", f"{host}:{port}")
+            self.cfg.set("workers", workers)
+            self.cfg.set("threads", threads)
+            self.cfg.set("worker_class", "gthread")
+            # SSE streams (job progress, change feed) stay open indefinitely
+            self.cfg.set("timeout", 0)
+            self.cfg.set("accesslog", "-")
+
+        def load(self):
+            # Built in each worker after the fork, so every process opens its
+            # own SQLite connections and file watchers
+            return create_app()
+
+    LauncherApplication().run()
+
+
+def run_waitress(host, port, threads):
+    from waitress import serve
+    serve(create_app(), host=host, port=port, threads=threads)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=os.getenv("GAME_LAUNCHER_HOST", DEFAULT_HOST))
+    parser.add_argument("--port", type=int, default=int(os.getenv("GAME_LAUNCHER_PORT", DEFAULT_PORT)))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("GAME_LAUNCHER_WORKERS", default_workers())),
+                        help="worker processes (gunicorn only)")
+    parser.add_argument("--threads", type=int, default=os.getenv("GAME_LAUNCHER_THREADS"),
+                        help="threads per worker process (default: about %d per server)" % SERVER_THREADS)
+    parser.add_argument("--server", choices=["auto", "gunicorn", "waitress"],
+                        default=os.getenv("GAME_LAUNCHER_SERVER", "auto"))
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    server = args.server
+    if server == "auto":
+        server = "waitress" if os.name == "nt" else "gunicorn"
+    if args.threads is None:
+        args.threads = default_threads(server, args.workers)
+    size_pool(args.threads)
+    try:
+        if server == "gunicorn":
+            logger.info(f"Starting gunicorn on {args.host}:{args.port} "
+                        f"({args.workers} workers x {args.threads} threads)")
+            run_gunicorn(args.host, args.port, args.workers, args.threads)
+        else:
+            if args.workers > 1:
+                logger.info("waitress serves from a single process; --workers is ignored")
+            logger.info(f"Starting waitress on {args.host}:{args.port} ({args.threads} threads)")
+            run_waitress(args.host, args.port, args.threads)
+    except ImportError as e:
+        sys.exit(f"{server} is not installed ({e.name}); install it or choose another --server")
+
+
+if __name__ == "__main__":
+    main()
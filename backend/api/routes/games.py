@@ -1,8 +1,9 @@
 from flask import Blueprint, request, jsonify
-from services.game_manager import GameManager
+from game_manager import GameManager
 
 games_blueprint = Blueprint("games", __name__)
-game_manager = GameManager("db/launcher.db")  # Path to your SQLite database
+# In-memory catalog of the configured library database; loaded on first use
+game_manager = GameManager()
 
 # List all games
 @games_blueprint.route("/", methods=["GET"])
@@ -21,20 +22,24 @@ def add_game():
     if not title or not executable_path:
         return jsonify({"error": "Title and executable_path are required"}), 400
 
-    game_manager.add_game(title, executable_path, cover_art_path)
-    return jsonify({"message": "Game added successfully"}), 201
+    game, created = game_manager.add_game(title, executable_path, cover_art_path)
+    if not created:
+        return jsonify({"error": "A game with this executable_path is already in the library",
+                        "games": game_manager.find_by_path(executable_path)}), 409
+    return jsonify({"message": "Game added successfully", "game": game}), 201
 
 # Delete a game by ID
 @games_blueprint.route("/<int:game_id>", methods=["DELETE"])
 def delete_game(game_id):
-    game_manager.delete_game(game_id)
+    if not game_manager.delete_game(game_id):
+        return jsonify({"error": f"No game found with ID {game_id}"}), 404
     return jsonify({"message": "Game deleted successfully"}), 200
 
 # Launch a game by ID
 @games_blueprint.route("/<int:game_id>/launch", methods=["POST"])
 def launch_game(game_id):
-    success = game_manager.launch_game(game_id)
-    if success:
-        return jsonify({"message": "Game launched successfully"}), 200
+    session = game_manager.launch_game(game_id)
+    if session:
+        return jsonify({"message": "Game launched successfully", "session": session}), 200
     else:
         return jsonify({"error": "Failed to launch game"}), 500
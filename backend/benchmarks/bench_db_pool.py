@@ -0,0 +1,110 @@
+"""Requests/sec of the game_manager DB access pattern, before and after pooling.
+
+"before" opens a fresh sqlite3 connection per operation (the old game_manager
+behaviour); "after" goes through services/database.py. Each simulated request
+is a game list read, with every ``--write-every``-th request adding a game.
+
+    python backend/benchmarks/bench_db_pool.py --threads 8 --requests 4000
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent / "services"))
+
+import database  # noqa: E402
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS games (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        title TEXT NOT NULL,
+        executable_path TEXT NOT NULL,
+        cover_art_path TEXT,
+        background TEXT,
+        added_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+SELECT_GAMES = "SELECT id, title, cover_art_path, background FROM games"
+INSERT_GAME = "INSERT INTO games (title, executable_path) VALUES (?, ?)"
+
+
+def seed(db_path, games):
+    con = sqlite3.connect(db_path)
+    con.execute(SCHEMA)
+    con.executemany(INSERT_GAME, ((f"Game {i}", f"C:/Games/{i}/game.exe") for i in range(games)))
+    con.commit()
+    con.close()
+
+
+def naive_request(db_path, write):
+    con = sqlite3.connect(db_path)
+    try:
+        if write:
+            con.execute(INSERT_GAME, ("Bench", "C:/Games/bench.exe"))
+            con.commit()
+        else:
+            con.execute(SELECT_GAMES).fetchall()
+    finally:
+        con.close()
+
+
+def pooled_request(pool, write):
+    if write:
+        with pool.transaction() as con:
+            con.execute(INSERT_GAME, ("Bench", "C:/Games/bench.exe"))
+    else:
+        with pool.connection() as con:
+            con.execute(SELECT_GAMES).fetchall()
+
+
+def run(handler, threads, requests, write_every):
+    errors = []
+    per_thread = requests // threads
+
+    def worker(offset):
+        for i in range(per_thread):
+            try:
+                handler(write_every > 0 and (offset + i) % write_every == 0)
+            except sqlite3.OperationalError as e:
+                errors.append(e)
+
+    workers = [threading.Thread(target=worker, args=(n * per_thread,)) for n in range(threads)]
+    start = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - start
+    return per_thread * threads / elapsed, len(errors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=4000)
+    parser.add_argument("--games", type=int, default=200)
+    parser.add_argument("--write-every", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        before_db = os.path.join(tmp, "before.db")
+        after_db = os.path.join(tmp, "after.db")
+        seed(before_db, args.games)
+        seed(after_db, args.games)
+
+        rate, errors = run(lambda w: naive_request(before_db, w), args.threads, args.requests, args.write_every)
+        print(f"before (connect per call): {rate:10.1f} req/s  locked errors: {errors}")
+
+        pool = database.get_pool(after_db, size=args.threads)
+        rate, errors = run(lambda w: pooled_request(pool, w), args.threads, args.requests, args.write_every)
+        print(f"after  (pooled, WAL):      {rate:10.1f} req/s  locked errors: {errors}")
+        database.close_all()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Directory scan time: the old nested os.walk versus services/scanner.py.
+
+Builds a synthetic install root (``--games`` game folders, each ``--depth``
+levels deep with a few executables and filler files) and times both walkers.
+
+    python backend/benchmarks/bench_scanner.py --games 300 --depth 6
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent / "services"))
+
+import scanner  # noqa: E402
+
+
+def build_tree(root, games, depth):
+    for g in range(games):
+        path = os.path.join(root, f"Game{g}")
+        for level in range(depth):
+            os.makedirs(path, exist_ok=True)
+            for name in (f"Game{g}_{level}.exe", "data.pak", "readme.txt"):
+                open(os.path.join(path, name), "w").close()
+            path = os.path.join(path, f"level{level}")
+        redist = os.path.join(root, f"Game{g}", "_CommonRedist")
+        os.makedirs(redist, exist_ok=True)
+        open(os.path.join(redist, "vcredist.exe"), "w").close()
+
+
+def legacy_scan(directory):
+    # The scan_for_games walk prior to the scanner module, minus the inserts.
+    found = []
+    for root, dirs, files in os.walk(directory):
+        for file in files:
+            if file.endswith(".exe"):
+                found.append(os.path.join(root, file))
+        for dir in dirs:
+            for sub_root, sub_dirs, sub_files in os.walk(os.path.join(root, dir)):
+                for sub_file in sub_files:
+                    if sub_file.endswith(".exe"):
+                        found.append(os.path.join(sub_root, sub_file))
+    return found
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--games", type=int, default=300)
+    parser.add_argument("--depth", type=int, default=6)
+    parser.add_argument("--workers", type=int, default=scanner.DEFAULT_WORKERS)
+    parser.add_argument("--root", help="scan an existing directory instead of a synthetic tree")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = args.root
+        if root is None:
+            root = tmp
+            build_tree(root, args.games, args.depth)
+
+        legacy_time, legacy = timed(lambda: legacy_scan(root))
+        print(f"nested os.walk: {legacy_time:8.3f}s  {len(legacy)} results ({len(set(legacy))} unique)")
+
+        new_time, found = timed(lambda: list(scanner.scan_tree(root, workers=args.workers)))
+        print(f"scanner:        {new_time:8.3f}s  {len(found)} results")
+        print(f"speedup:        {legacy_time / new_time:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
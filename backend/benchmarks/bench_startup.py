@@ -0,0 +1,79 @@
+"""Cold-start import cost of the CLI and API modules against a tracked budget.
+
+Each module is imported in a fresh interpreter under ``python -X importtime``;
+the cumulative time of the module's own line is the figure that counts. The
+median over ``--runs`` is compared with startup_budget.json, and the script
+exits non-zero when a module is over budget. The imports run without a
+config.json on purpose: importing must not read configuration or touch the DB.
+
+    python backend/benchmarks/bench_startup.py
+    python backend/benchmarks/bench_startup.py --update-budget
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent.parent
+BUDGET_FILE = Path(__file__).parent / "startup_budget.json"
+# Module -> directory that has to be on sys.path to import it
+MODULES = {
+    "game_manager": BACKEND_DIR / "services",
+    "app": BACKEND_DIR / "api",
+}
+# Headroom added to measured times when the budget is rewritten
+BUDGET_HEADROOM = 1.5
+
+
+def import_time_ms(module, path):
+    code = f"import sys; sys.path.insert(0, {str(path)!r}); import {module}"
+    with tempfile.TemporaryDirectory() as empty_home:
+        env = dict(os.environ, APPDATA=empty_home, HOME=empty_home)
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], env=env,
+                                capture_output=True, text=True, check=True)
+    for line in result.stderr.splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \| (\s*)(\S+)$", line)
+        if match and match.group(3) == module and not match.group(2):
+            return int(match.group(1)) / 1000
+    raise RuntimeError(f"No importtime entry for {module}:\n{result.stderr[-2000:]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--update-budget", action="store_true",
+                        help=f"write measured times x{BUDGET_HEADROOM} to {BUDGET_FILE.name}")
+    args = parser.parse_args()
+
+    budget = json.loads(BUDGET_FILE.read_text()) if BUDGET_FILE.exists() else {}
+    measured = {}
+    over_budget = False
+    for module, path in MODULES.items():
+        try:
+            times = [import_time_ms(module, path) for _ in range(args.runs)]
+        except subprocess.CalledProcessError as e:
+            print(f"{module:14} import failed:\n{e.stderr}")
+            over_budget = True
+            continue
+        measured[module] = statistics.median(times)
+        limit = budget.get(module)
+        status = "" if limit is None else ("OK" if measured[module] <= limit else "OVER BUDGET")
+        over_budget = over_budget or status == "OVER BUDGET"
+        limit_text = "-" if limit is None else f"{limit:.1f}"
+        print(f"{module:14} {measured[module]:8.1f} ms  (budget {limit_text} ms)  {status}")
+
+    if args.update_budget:
+        BUDGET_FILE.write_text(json.dumps(
+            {module: round(ms * BUDGET_HEADROOM, 1) for module, ms in measured.items()}, indent=4) + "\n")
+        print(f"Budget written to {BUDGET_FILE}")
+    elif over_budget:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Steam library discovery over a synthetic library of ``--apps`` manifests.
+
+The manifests are split across the main Steam folder and a second library
+listed in libraryfolders.vdf, and carry realistic depot and user config blocks.
+Times a cold scan (every manifest parsed), a warm scan (mtime cache hits only)
+and a scan after ``--touched`` manifests were rewritten.
+
+    python backend/benchmarks/bench_steam.py --apps 2000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent / "services"))
+
+import file_watch  # noqa: E402
+import steam  # noqa: E402
+
+MANIFEST = """"AppState"
+{{
+\t"appid"\t\t"{appid}"
+\t"Universe"\t\t"1"
+\t"name"\t\t"Synthetic Game {appid}"
+\t"StateFlags"\t\t"4"
+\t"installdir"\t\t"Synthetic Game {appid}"
+\t"LastUpdated"\t\t"1700000000"
+\t"SizeOnDisk"\t\t"{size}"
+\t"buildid"\t\t"1234567"
+\t"InstalledDepots"
+\t{{
+{depots}\t}}
+\t"UserConfig"
+\t{{
+\t\t"language"\t\t"english"
+\t}}
+\t"MountedConfig"
+\t{{
+\t\t"language"\t\t"english"
+\t}}
+}}
+"""
+DEPOT = '\t\t"{depot}"\n\t\t{{\n\t\t\t"manifest"\t\t"{manifest}"\n\t\t\t"size"\t\t"{size}"\n\t\t}}\n'
+
+
+def write_manifest(steamapps, appid):
+    depots = "".join(DEPOT.format(depot=appid + d, manifest=appid * 7919 + d, size=d * 1024) for d in range(1, 5))
+    with open(os.path.join(steamapps, f"appmanifest_{appid}.acf"), "w") as f:
+        f.write(MANIFEST.format(appid=appid, size=appid * 1024, depots=depots))
+
+
+def build_library(root, apps):
+    main = os.path.join(root, "Steam")
+    second = os.path.join(root, "SteamLibrary")
+    for library in (main, second):
+        os.makedirs(os.path.join(library, "steamapps"))
+    with open(os.path.join(main, "steamapps", "libraryfolders.vdf"), "w") as f:
+        f.write('"libraryfolders"\n{\n')
+        for index, library in enumerate((main, second)):
+            escaped = library.replace("\\", "\\\\")
+            f.write(f'\t"{index}"\n\t{{\n\t\t"path"\t\t"{escaped}"\n\t\t"label"\t\t""\n\t}}\n')
+        f.write("}\n")
+    for appid in range(10, 10 + apps):
+        write_manifest(os.path.join(main if appid % 2 else second, "steamapps"), appid)
+    return main
+
+
+def full_parse(path):
+    return steam.load(path).get("appstate", {})
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return (time.perf_counter() - start) * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--apps", type=int, default=2000)
+    parser.add_argument("--touched", type=int, default=20)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        steam_path = build_library(root, args.apps)
+
+        full_ms, games = timed(lambda: steam.find_installed_games(steam_path, cache=file_watch.ManifestCache(full_parse)))
+        print(f"{'full parse (no cache)':26} {full_ms:8.1f} ms  {len(games)} games")
+
+        cache = file_watch.ManifestCache(steam.read_app_manifest)
+        cold_ms, games = timed(lambda: steam.find_installed_games(steam_path, cache=cache))
+        print(f"{'cold, header only':26} {cold_ms:8.1f} ms  {len(games)} games")
+
+        warm = [timed(lambda: steam.find_installed_games(steam_path, cache=cache))[0] for _ in range(args.runs)]
+        print(f"{'warm (cache hits)':26} {min(warm):8.1f} ms  (best of {args.runs})")
+
+        time.sleep(0.01)
+        for appid in range(11, 11 + 2 * args.touched, 2):
+            write_manifest(os.path.join(steam_path, "steamapps"), appid)
+        misses = cache.misses
+        touched_ms, _ = timed(lambda: steam.find_installed_games(steam_path, cache=cache))
+        print(f"{f'{args.touched} manifests changed':26} {touched_ms:8.1f} ms  ({cache.misses - misses} re-parsed)")
+
+
+if __name__ == "__main__":
+    main()
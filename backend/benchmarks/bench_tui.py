@@ -0,0 +1,94 @@
+"""Frame cost of the curses game browser (services/tui.py) by library size.
+
+Drives tui.Browser with scripted keys against an in-memory window that only
+counts writes, so no terminal is needed. For each size it reports the time per
+keypress (handling plus redraw) and how many rows were rewritten, for arrow
+keys, page down and type-to-filter.
+
+    python backend/benchmarks/bench_tui.py
+    python backend/benchmarks/bench_tui.py --sizes 50 5000 50000 --rows 50
+"""
+import argparse
+import curses
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent / "services"))
+
+import tui
+
+WORDS = ["dark", "souls", "legend", "quest", "star", "craft", "racing", "city", "tales", "zero"]
+
+
+class CountingWindow:
+    def __init__(self, rows, cols):
+        self.size = (rows, cols)
+        self.writes = 0
+
+    def getmaxyx(self):
+        return self.size
+
+    def move(self, y, x):
+        pass
+
+    def clrtoeol(self):
+        pass
+
+    def addstr(self, y, x, text, attr=0):
+        self.writes += 1
+
+    def setscrreg(self, top, bottom):
+        pass
+
+    def scrollok(self, flag):
+        pass
+
+    def scroll(self, lines):
+        pass
+
+    def refresh(self):
+        pass
+
+
+def make_games(count):
+    return [(i, f"{WORDS[i % 10].title()} {WORDS[i // 10 % 10]} {WORDS[i // 100 % 10]} {i}") for i in range(count)]
+
+
+def per_key(browser, window, keys):
+    window.writes = 0
+    start = time.perf_counter()
+    for key in keys:
+        browser.handle_key(key)
+        browser.draw()
+    elapsed = time.perf_counter() - start
+    return elapsed / len(keys) * 1e6, window.writes / len(keys)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 5000, 50000])
+    parser.add_argument("--rows", type=int, default=40)
+    parser.add_argument("--cols", type=int, default=120)
+    args = parser.parse_args()
+
+    print(f"{'games':>7} {'action':>14} {'us/key':>9} {'rows/key':>9}")
+    for size in args.sizes:
+        window = CountingWindow(args.rows, args.cols)
+        build_start = time.perf_counter()
+        browser = tui.Browser(window, make_games(size))
+        browser.draw()
+        print(f"{size:7} {'open':>14} {(time.perf_counter() - build_start) * 1e6:9.0f} {window.writes:9.1f}")
+        scripts = {
+            "arrow down": [curses.KEY_DOWN] * 500,
+            "page down": [curses.KEY_NPAGE] * 50,
+            "filter+clear": list("star craft") + ["\x1b"],
+            "backspace": list("dark") + [curses.KEY_BACKSPACE] * 4,
+        }
+        for name, keys in scripts.items():
+            micros, rows = per_key(browser, window, keys)
+            print(f"{size:7} {name:>14} {micros:9.1f} {rows:9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Load test against a running API server: p50/p99 latency and throughput.
+
+``--concurrency`` client threads each keep one HTTP/1.1 connection open and
+cycle through the endpoints for ``--duration`` seconds. Start the server first,
+e.g. ``python backend/api/launcher.py --workers 4``, then:
+
+    python backend/benchmarks/load_test.py --url http://127.0.0.1:5000 --concurrency 32
+    python backend/benchmarks/load_test.py --endpoint /api/games --endpoint "/api/games?limit=50"
+"""
+import argparse
+import http.client
+import statistics
+import threading
+import time
+from urllib.parse import urlsplit
+
+DEFAULT_ENDPOINTS = [
+    "/",
+    "/api/games",
+    "/api/games?limit=50&sort=title",
+    "/api/games?search=game&limit=50",
+    "/api/settings",
+    "/api/music",
+    "/api/sessions",
+]
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return float("nan")
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def client(host, port, endpoints, offset, deadline, results, errors):
+    con = http.client.HTTPConnection(host, port, timeout=30)
+    index = offset
+    while time.perf_counter() < deadline:
+        path = endpoints[index % len(endpoints)]
+        index += 1
+        start = time.perf_counter()
+        try:
+            con.request("GET", path)
+            response = con.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            errors[path] = errors.get(path, 0) + 1
+            con.close()
+            con = http.client.HTTPConnection(host, port, timeout=30)
+            continue
+        elapsed = time.perf_counter() - start
+        if response.status >= 400:
+            errors[path] = errors.get(path, 0) + 1
+        results.setdefault(path, []).append(elapsed)
+    con.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:5000")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--endpoint", action="append", dest="endpoints",
+                        help="path to request (repeatable); defaults to the main read endpoints")
+    args = parser.parse_args()
+
+    url = urlsplit(args.url)
+    endpoints = args.endpoints or DEFAULT_ENDPOINTS
+    # Per-thread dicts, merged afterwards, so the clients never share a lock
+    per_thread = [({}, {}) for _ in range(args.concurrency)]
+    deadline = time.perf_counter() + args.duration
+    threads = [threading.Thread(target=client, args=(url.hostname, url.port or 80, endpoints, i, deadline,
+                                                     results, errors))
+               for i, (results, errors) in enumerate(per_thread)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+
+    print(f"{args.concurrency} clients, {wall:.1f} s against {args.url}\n")
+    print(f"{'endpoint':40} {'requests':>9} {'errors':>7} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8}")
+    everything = []
+    total_errors = 0
+    for path in endpoints:
+        latencies = sorted(t for results, _ in per_thread for t in results.get(path, ()))
+        errors = sum(e.get(path, 0) for _, e in per_thread)
+        everything.extend(latencies)
+        total_errors += errors
+        print(f"{path[:40]:40} {len(latencies):9} {errors:7} {len(latencies) / wall:8.1f} "
+              f"{percentile(latencies, 0.50) * 1000:8.2f} {percentile(latencies, 0.99) * 1000:8.2f}")
+    everything.sort()
+    print(f"{'all':40} {len(everything):9} {total_errors:7} {len(everything) / wall:8.1f} "
+          f"{percentile(everything, 0.50) * 1000:8.2f} {percentile(everything, 0.99) * 1000:8.2f}")
+    if everything:
+        print(f"\nmean {statistics.fmean(everything) * 1000:.2f} ms, max {everything[-1] * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
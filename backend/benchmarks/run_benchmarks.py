@@ -0,0 +1,212 @@
+"""Benchmark suite for game_manager and the HTTP API, with stored baselines.
+
+For each library size (``--sizes``, default 100, 10k and 100k games) a fresh
+database is filled with synthetic games and the main game_manager calls and
+Flask endpoints (through the test client) are timed. Scans run against a
+synthetic directory tree, a synthetic Epic manifest folder and a synthetic
+Steam library. Every case reports the fastest of ``--repeat`` runs, which is
+far less sensitive to background load than the mean or median.
+
+Results are compared with baseline.json; a case slower than baseline times
+``--threshold`` is flagged and makes the script exit non-zero, so CI can run it
+as a regression gate. Timings only compare on the same machine, so record the
+baseline with ``--update-baseline`` where the gate runs. Everything runs in a
+temporary directory with its own config.json, so the real library is never
+touched.
+
+    python backend/benchmarks/run_benchmarks.py
+    python backend/benchmarks/run_benchmarks.py --sizes 100 10000 --repeat 5
+    python backend/benchmarks/run_benchmarks.py --update-baseline
+"""
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent.parent
+BASELINE_FILE = Path(__file__).parent / "baseline.json"
+DEFAULT_SIZES = (100, 10_000, 100_000)
+DEFAULT_THRESHOLD = 1.5
+# Cases under this many milliseconds are dominated by timer noise and are
+# reported but never flagged
+NOISE_FLOOR_MS = 2.0
+
+sys.path.append(str(BACKEND_DIR / "services"))
+sys.path.append(str(BACKEND_DIR / "api"))
+
+
+def measure(fn, repeat, setup=None):
+    """Fastest milliseconds of ``fn(*setup())`` over ``repeat`` runs; setup is not timed."""
+    times = []
+    for _ in range(repeat):
+        args = setup() if setup is not None else ()
+        # Like timeit: a collection triggered by earlier allocations is not
+        # the cost of the call being measured
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            fn(*args)
+            times.append((time.perf_counter() - start) * 1000)
+        finally:
+            gc.enable()
+    return min(times)
+
+
+def write_config(path, **config):
+    with open(path, "w") as f:
+        json.dump(config, f)
+
+
+def library_cases(game_manager, app_module, client, size, repeat):
+    game_manager.add_games_bulk({"title": f"Game {i:06d}", "url": f"C:/Games/{i}/game{i}.exe"}
+                                for i in range(size))
+    counter = iter(range(10**9))
+
+    def add_one():
+        n = next(counter)
+        game_manager.add_game_to_db(f"Bench {n}", f"C:/Bench/{n}.exe")
+
+    def new_batch():
+        summary = game_manager.add_games_bulk({"title": f"Batch {n}", "url": f"C:/Batch/{n}.exe"}
+                                              for n in (next(counter) for _ in range(100)))
+        return ([game["id"] for game in summary["inserted"]],)
+
+    def drop_list_cache():
+        app_module._games_list_cache = None
+        return ()
+
+    yield "get_games", measure(game_manager.get_games, repeat)
+    yield "query_games_title_page", measure(lambda: game_manager.query_games(50, sort="title"), repeat)
+    yield "query_games_search", measure(lambda: game_manager.query_games(50, search="Game 0001"), repeat)
+    yield "add_game_to_db", measure(add_one, repeat)
+    yield "delete_games_100", measure(game_manager.delete_games, repeat, setup=new_batch)
+    client.get("/api/games")
+    yield "http_games_cached", measure(lambda: client.get("/api/games"), repeat)
+    yield "http_games_uncached", measure(lambda: client.get("/api/games"), repeat, setup=drop_list_cache)
+    yield "http_games_page", measure(lambda: client.get("/api/games?limit=50&sort=title"), repeat)
+    yield "http_games_search", measure(lambda: client.get("/api/games?search=Game%200001&limit=50"), repeat)
+
+
+def build_epic_manifests(data_path, count):
+    import epic
+    manifests = epic.manifest_dir(data_path)
+    os.makedirs(manifests)
+    os.makedirs(os.path.dirname(epic.launcher_installed_path(data_path)))
+    installed = []
+    for i in range(count):
+        item = {"DisplayName": f"Epic Game {i}", "AppName": f"app{i}", "CatalogItemId": f"catalog{i}",
+                "CatalogNamespace": f"ns{i}", "InstallLocation": f"C:/Epic/{i}", "LaunchExecutable": "game.exe",
+                "AppCategories": ["public", "games", "applications"], "bIsIncompleteInstall": False}
+        with open(os.path.join(manifests, f"{i:032x}.item"), "w") as f:
+            json.dump(item, f)
+        installed.append({"AppName": f"app{i}", "InstallLocation": f"C:/Epic/{i}"})
+    with open(epic.launcher_installed_path(data_path), "w") as f:
+        json.dump({"InstallationList": installed}, f)
+
+
+def backdate(root, seconds=3600):
+    """Move every mtime under ``root`` into the past, like a tree that has not
+    been touched since long before the scan."""
+    stamp = time.time() - seconds
+    for dirpath, dirnames, filenames in os.walk(root, topdown=False):
+        for name in filenames:
+            os.utime(os.path.join(dirpath, name), (stamp, stamp))
+        os.utime(dirpath, (stamp, stamp))
+
+
+def scan_cases(game_manager, root, repeat):
+    import bench_scanner
+    import bench_steam
+    import file_watch
+    import steam
+
+    tree = os.path.join(root, "tree")
+    bench_scanner.build_tree(tree, 300, 4)
+    # Directories modified within scanner.RACY_MTIME_WINDOW_NS are always
+    # re-listed, which would make the incremental scan a full one
+    backdate(tree)
+    yield "scan_for_games_full", measure(lambda: game_manager.scan_for_games(tree, full=True), repeat)
+    yield "scan_for_games_incremental", measure(lambda: game_manager.scan_for_games(tree), repeat)
+
+    epic_path = os.path.join(root, "Epic")
+    build_epic_manifests(epic_path, 500)
+    yield "fetch_epic_games_cold", measure(lambda: game_manager.fetch_epic_games(full=True), repeat)
+    yield "fetch_epic_games_warm", measure(game_manager.fetch_epic_games, repeat)
+
+    def reset_steam_cache():
+        steam._manifest_cache = file_watch.ManifestCache(steam.read_app_manifest)
+        return ()
+
+    bench_steam.build_library(os.path.join(root, "steam"), 2000)
+    yield "fetch_steam_games_cold", measure(game_manager.fetch_steam_games, repeat, setup=reset_steam_cache)
+    yield "fetch_steam_games_warm", measure(game_manager.fetch_steam_games, repeat)
+
+
+def run(sizes, repeat):
+    results = {}
+    with tempfile.TemporaryDirectory() as root:
+        config_path = os.path.join(root, "config.json")
+        os.environ["GAME_LAUNCHER_CONFIG"] = config_path
+        os.environ["APPDATA"] = os.path.join(root, "appdata")
+        write_config(config_path, db_path=os.path.join(root, "scan.db"),
+                     steam_integration={"steam_path": os.path.join(root, "steam", "Steam")},
+                     epic_integration={"epic_path": os.path.join(root, "Epic")})
+        # game_manager prints a line per operation; keep the report readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            import app as app_module
+            import game_manager
+            client = app_module.create_app().test_client()
+            for name, ms in scan_cases(game_manager, root, repeat):
+                results[name] = ms
+        for size in sizes:
+            print(f"... {size} games", file=sys.stderr)
+            with contextlib.redirect_stdout(io.StringIO()):
+                config = dict(game_manager.get_config(), db_path=os.path.join(root, f"library-{size}.db"))
+                game_manager.edit_config(config)
+                for name, ms in library_cases(game_manager, app_module, client, size, repeat):
+                    results[f"{name}@{size}"] = ms
+        game_manager.config_store().close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="flag cases slower than baseline x THRESHOLD (default %(default)s)")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_FILE)
+    parser.add_argument("--update-baseline", action="store_true", help="store the measured times as the baseline")
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.repeat)
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    regressions = []
+    print(f"{'case':40} {'ms':>10} {'baseline':>10} {'ratio':>7}")
+    for name, ms in results.items():
+        base = baseline.get(name)
+        ratio = ms / base if base else None
+        flagged = ratio is not None and ratio > args.threshold and ms > NOISE_FLOOR_MS
+        if flagged:
+            regressions.append(name)
+        print(f"{name:40} {ms:10.3f} {'-' if base is None else f'{base:.3f}':>10} "
+              f"{'-' if ratio is None else f'{ratio:.2f}':>7}{'  REGRESSION' if flagged else ''}")
+
+    if args.update_baseline:
+        baseline.update({name: round(ms, 3) for name, ms in results.items()})
+        args.baseline.write_text(json.dumps(dict(sorted(baseline.items())), indent=4) + "\n")
+        print(f"Baseline written to {args.baseline}")
+    elif regressions:
+        print(f"\n{len(regressions)} case(s) slower than baseline x {args.threshold}: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
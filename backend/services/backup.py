@@ -0,0 +1,198 @@
+import json
+import os
+import queue
+import shutil
+import tarfile
+import tempfile
+import threading
+
+FORMAT = "game-launcher/library"
+VERSION = 1
+# Fields of one exported game, in output order
+FIELDS = ("title", "executable_path", "cover_art_path", "background", "added_date", "source", "external_id",
+          "install_location", "playtime", "launch_count", "last_played")
+NUMERIC_FIELDS = ("playtime", "launch_count", "last_played")
+LIBRARY_MEMBER = "library.ndjson"
+COVERS_PREFIX = "covers/"
+COPY_CHUNK_SIZE = 64 * 1024
+# Only the first few bad lines are reported, so importing a broken file stays
+# constant in memory too
+MAX_REPORTED_ERRORS = 100
+
+
+def is_cover_name(name):
+    """Whether ``name`` is a bare file name, as stored in the cover store, rather
+    than a path that could point anywhere on disk."""
+    return (isinstance(name, str) and name not in ("", ".", "..")
+            and not any(separator in name for separator in ("/", "\\", ":", "\0")))
+
+
+def header_line():
+    return json.dumps({"format": FORMAT, "version": VERSION}) + "\n"
+
+
+def game_line(values):
+    """One NDJSON line for a game given its FIELDS values."""
+    return json.dumps(dict(zip(FIELDS, values)), ensure_ascii=False) + "\n"
+
+
+def read_games(lines):
+    """Parse NDJSON lines into (line number, game dict, error) tuples.
+
+    Exactly one of game and error is set. A header line is checked and skipped;
+    a header from a newer format version raises ValueError.
+    """
+    for number, line in enumerate(lines, start=1):
+        if isinstance(line, bytes):
+            line = line.decode("utf-8-sig" if number == 1 else "utf-8", errors="replace")
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            item = json.loads(line)
+        except ValueError as e:
+            yield number, None, f"Line {number}: invalid JSON ({e})"
+            continue
+        if not isinstance(item, dict):
+            yield number, None, f"Line {number}: expected an object"
+            continue
+        if "format" in item:
+            if item["format"] != FORMAT or not isinstance(item.get("version"), int) or item["version"] > VERSION:
+                raise ValueError(f"Unsupported export format {item.get('format')!r} version {item.get('version')!r}")
+            continue
+        title = item.get("title")
+        executable_path = item.get("executable_path")
+        if not isinstance(title, str) or not title or not isinstance(executable_path, str) or not executable_path:
+            yield number, None, f"Line {number}: 'title' and 'executable_path' are required"
+            continue
+        game = {field: item.get(field) for field in FIELDS}
+        for field in NUMERIC_FIELDS:
+            if isinstance(game[field], bool) or not isinstance(game[field], (int, float)):
+                game[field] = None
+        for field in FIELDS:
+            if field not in NUMERIC_FIELDS and not isinstance(game[field], str):
+                game[field] = None
+        if game["cover_art_path"] is not None and not is_cover_name(game["cover_art_path"]):
+            game["cover_art_path"] = None  # absolute and relative paths are never trusted
+        yield number, game, None
+
+
+def is_archive(head):
+    """Whether an import starting with ``head`` is an archive rather than NDJSON.
+
+    NDJSON starts with "{" (after an optional BOM and whitespace); anything else
+    is handed to tarfile, which rejects what is not a tar or tar.gz.
+    """
+    head = head.lstrip(b"\xef\xbb\xbf \t\r\n")
+    return bool(head) and not head.startswith(b"{")
+
+
+def write_archive(fileobj, covers, write_library, compress=True):
+    """Stream a tar archive of ``covers`` ((arcname, path) pairs) followed by
+    the library, which ``write_library(binary_file)`` writes.
+
+    The library goes last so that an import sees every cover before the games
+    that refer to it, and through a temporary file because a tar member needs
+    its size up front.
+    """
+    with tarfile.open(fileobj=fileobj, mode="w|gz" if compress else "w|") as tar:
+        for arcname, path in covers:
+            tar.add(path, arcname=COVERS_PREFIX + arcname, recursive=False)
+        with tempfile.TemporaryFile() as library:
+            write_library(library)
+            info = tarfile.TarInfo(LIBRARY_MEMBER)
+            info.size = library.tell()
+            library.seek(0)
+            tar.addfile(info, library)
+
+
+def read_archive(fileobj, store_cover, import_library):
+    """Read an archive made by write_archive from a non-seekable stream.
+
+    Each cover is handed to ``store_cover(temp_path, arcname)`` and the library
+    member to ``import_library(binary_file)``, whose result is returned.
+    """
+    try:
+        return _read_archive(fileobj, store_cover, import_library)
+    except tarfile.TarError as e:
+        raise ValueError(f"Not a library archive: {e}")
+
+
+def _read_archive(fileobj, store_cover, import_library):
+    result = None
+    with tarfile.open(fileobj=fileobj, mode="r|*") as tar:
+        for member in tar:
+            if member.isfile() and member.name.startswith(COVERS_PREFIX):
+                arcname = os.path.basename(member.name)
+                source = tar.extractfile(member)
+                fd, tmp_path = tempfile.mkstemp(suffix=os.path.splitext(arcname)[1])
+                try:
+                    with os.fdopen(fd, "wb") as tmp:
+                        shutil.copyfileobj(source, tmp, COPY_CHUNK_SIZE)
+                    store_cover(tmp_path, arcname)
+                finally:
+                    os.remove(tmp_path)
+            elif member.isfile() and member.name == LIBRARY_MEMBER:
+                result = import_library(tar.extractfile(member))
+    if result is None:
+        raise ValueError(f"Archive has no {LIBRARY_MEMBER}")
+    return result
+
+
+class _QueueWriter:
+    def __init__(self, chunks, cancelled):
+        self._chunks = chunks
+        self._cancelled = cancelled
+
+    def write(self, data):
+        while not self._cancelled.is_set():
+            try:
+                self._chunks.put(bytes(data), timeout=0.5)
+                return len(data)
+            except queue.Full:
+                pass
+        raise OSError("Export cancelled")
+
+    def flush(self):
+        pass
+
+
+def iter_written(produce, max_chunks=16):
+    """Turn ``produce(fileobj)``, which writes to a file object, into an
+    iterator of bytes chunks, e.g. for a streamed HTTP response.
+
+    ``produce`` runs on its own thread behind a bounded queue, so memory use
+    does not depend on the size of the output. Closing the iterator early
+    makes the next write raise and ``produce`` stop.
+    """
+    chunks = queue.Queue(max_chunks)
+    cancelled = threading.Event()
+    done = object()
+    errors = []
+
+    def run():
+        try:
+            produce(_QueueWriter(chunks, cancelled))
+        except BaseException as e:
+            errors.append(e)
+        finally:
+            # Blocking put: the reader is either draining or has cancelled
+            while not cancelled.is_set():
+                try:
+                    chunks.put(done, timeout=0.5)
+                    break
+                except queue.Full:
+                    pass
+
+    thread = threading.Thread(target=run, name="export", daemon=True)
+    thread.start()
+    try:
+        while True:
+            chunk = chunks.get()
+            if chunk is done:
+                break
+            yield chunk
+        if errors:
+            raise errors[0]
+    finally:
+        cancelled.set()
@@ -0,0 +1,226 @@
+import copy
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+
+import file_watch
+
+
+class ConfigError(ValueError):
+    pass
+
+
+# A schema maps a key to the accepted type (or tuple of types), or to a nested
+# schema for an object value. Keys that are not listed are kept unchecked.
+LAUNCHER_SCHEMA = {
+    "db_path": str,
+    "steam_integration": {"steam_path": str},
+    "epic_integration": {"epic_path": str},
+    "scan_directory": str,
+    "scan_ignore": list,
+    "scan_max_depth": (int, type(None)),
+    "scan_workers": int,
+    "db_pool_size": int,
+    "db_busy_timeout_ms": int,
+    "job_workers": int,
+}
+LAUNCHER_DEFAULTS = {
+    "steam_integration": {"steam_path": ""},
+    "epic_integration": {"epic_path": ""},
+    "scan_directory": "",
+}
+
+# The frontend stores its settings as flat strings, but real JSON values are
+# accepted as well.
+_SETTING = (str, bool, int, float, dict, list, type(None))
+SETTINGS_SCHEMA = {
+    "auto_close_launcher": _SETTING,
+    "background_music": _SETTING,
+    "dark_mode": _SETTING,
+    "max_games_display": _SETTING,
+    "minimize_on_game_launch": _SETTING,
+    "notifications": _SETTING,
+    "overlay_enabled": _SETTING,
+    "scan_directory": _SETTING,
+    "steam_integration": _SETTING,
+    "system_resources": _SETTING,
+    "theme": _SETTING,
+    "updates": _SETTING,
+}
+
+
+def validate(data, schema, path=""):
+    if not isinstance(data, dict):
+        raise ConfigError(f"{path or 'configuration'} must be an object")
+    for key, expected in schema.items():
+        if key not in data:
+            continue
+        value = data[key]
+        name = f"{path}.{key}" if path else key
+        if isinstance(expected, dict):
+            validate(value, expected, name)
+        elif not isinstance(value, expected) or (isinstance(value, bool) and bool not in _types(expected)):
+            raise ConfigError(f"{name} must be of type {_type_names(expected)}")
+
+
+def _types(expected):
+    return expected if isinstance(expected, tuple) else (expected,)
+
+
+def _type_names(expected):
+    return " or ".join("null" if t is type(None) else t.__name__ for t in _types(expected))
+
+
+def _merge_defaults(data, defaults):
+    merged = copy.deepcopy(defaults)
+    for key, value in data.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge_defaults(value, merged[key])
+        else:
+            merged[key] = value
+    return merged
+
+
+@contextmanager
+def _file_lock(path):
+    # Serializes writers across processes; os.replace alone only guarantees
+    # that readers never see a half-written file.
+    with open(path + ".lock", "a+b") as lock_file:
+        if os.name == "nt":
+            import msvcrt
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def atomic_write_json(path, data):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class ConfigStore:
+    """A JSON file kept in memory.
+
+    The file is read on the first ``get()`` and again only when the watcher
+    sees it change on disk, so reads never touch the disk. Writes are validated
+    against ``schema`` before anything is written and replace the file
+    atomically. Listeners are called with ``(old, new)`` after every change.
+    """
+
+    def __init__(self, path, schema=None, defaults=None):
+        self.path = path
+        self.schema = schema or {}
+        self.defaults = defaults or {}
+        self._data = None
+        self._lock = threading.RLock()
+        self._listeners = []
+        self._watcher = None
+
+    def _load_file(self):
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            data = {}
+        except json.JSONDecodeError as e:
+            raise ConfigError(f"{self.path} is not valid JSON: {e}") from None
+        validate(data, self.schema)
+        return data
+
+    def _read(self):
+        return _merge_defaults(self._load_file(), self.defaults)
+
+    def get(self):
+        """The current configuration. Treat it as read-only; copy before editing."""
+        data = self._data
+        if data is None:
+            with self._lock:
+                if self._data is None:
+                    self._data = self._read()
+                data = self._data
+        return data
+
+    def reload(self):
+        with self._lock:
+            old = self._data
+            self._data = self._read()
+            new = self._data
+        self._notify(old, new)
+        return new
+
+    def replace(self, new_data):
+        validate(new_data, self.schema)
+        new_data = copy.deepcopy(new_data)
+        with self._lock:
+            old = self.get()
+            with _file_lock(self.path):
+                atomic_write_json(self.path, new_data)
+            if self._watcher is not None:
+                self._watcher.expect()
+            self._data = _merge_defaults(new_data, self.defaults)
+            new = self._data
+        self._notify(old, new)
+        return new
+
+    def update(self, changes):
+        """Apply ``changes`` on top of the file's current content and write it back."""
+        with self._lock, _file_lock(self.path):
+            # Re-read under the lock so a concurrent writer's change is not lost
+            current = self._load_file()
+            current.update(copy.deepcopy(changes))
+            validate(current, self.schema)
+            old = self._data
+            atomic_write_json(self.path, current)
+            if self._watcher is not None:
+                self._watcher.expect()
+            self._data = new = _merge_defaults(current, self.defaults)
+        self._notify(old, new)
+        return new
+
+    def subscribe(self, listener):
+        self._listeners.append(listener)
+
+    def _notify(self, old, new):
+        for listener in list(self._listeners):
+            listener(old, new)
+
+    def _on_file_changed(self, path):
+        try:
+            self.reload()
+        except (ConfigError, OSError) as e:
+            # Keep serving the last good configuration until the file is fixed
+            print(f"Ignoring invalid configuration in {path}: {e}")
+
+    def watch(self, check_interval=file_watch.DEFAULT_CHECK_INTERVAL):
+        with self._lock:
+            if self._watcher is None:
+                self._watcher = file_watch.FileWatcher(self.path, self._on_file_changed, check_interval).start()
+        return self
+
+    def close(self):
+        with self._lock:
+            watcher, self._watcher = self._watcher, None
+        if watcher is not None:
+            watcher.stop()
@@ -0,0 +1,185 @@
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+import threading
+
+# Bounding boxes of the generated variants; originals are kept untouched.
+VARIANTS = {
+    "grid": (300, 450),
+    "detail": (600, 900),
+}
+# Served in this order of preference when the client accepts them.
+FORMAT_MIMETYPES = {
+    "avif": "image/avif",
+    "webp": "image/webp",
+}
+# Formats that every current browser decodes, so a wildcard Accept ("*/*",
+# "image/*", or no header at all) gets them too; AVIF has to be named.
+WILDCARD_FORMATS = ("webp",)
+WILDCARD_MIMETYPES = ("*/*", "image/*")
+DEFAULT_WORKERS = 2
+HASH_CHUNK_SIZE = 1 << 20
+
+# <40 hex digits>.<ext> as produced by store_cover; these names never change content
+CONTENT_ADDRESSED_NAME = re.compile(r"^[0-9a-f]{40}\.[A-Za-z0-9]+$")
+
+_executor = None
+_executor_lock = threading.Lock()
+_scheduled = set()
+_output_formats = None
+
+
+def output_formats():
+    # Pillow is optional and slow to import, so it is only loaded on first use
+    global _output_formats
+    if _output_formats is None:
+        try:
+            from PIL import features
+        except ImportError:
+            _output_formats = []
+            return _output_formats
+        available = []
+        for fmt in FORMAT_MIMETYPES:
+            try:
+                if features.check(fmt):
+                    available.append(fmt)
+            except ValueError:
+                continue  # Pillow too old to know the feature at all
+        _output_formats = available
+    return _output_formats
+
+
+def is_content_addressed(filename):
+    return CONTENT_ADDRESSED_NAME.match(filename) is not None
+
+
+def file_digest(path):
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _atomic_copy(source, dest):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(dest), suffix=".tmp")
+    os.close(fd)
+    try:
+        shutil.copyfile(source, tmp_path)
+        os.replace(tmp_path, dest)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def store_cover(source_path, store_dir):
+    """Copy a cover image into ``store_dir`` under its content hash.
+
+    Identical images are stored once, and covers that merely share a filename
+    no longer overwrite each other. Returns the stored filename and queues the
+    resized variants for background generation.
+    """
+    ext = os.path.splitext(source_path)[1].lower() or ".img"
+    filename = file_digest(source_path) + ext
+    dest = os.path.join(store_dir, filename)
+    if not os.path.exists(dest):
+        os.makedirs(store_dir, exist_ok=True)
+        _atomic_copy(source_path, dest)
+    schedule_variants(store_dir, filename)
+    return filename
+
+
+def variant_name(filename, variant, fmt):
+    return f"{os.path.splitext(filename)[0]}.{variant}.{fmt}"
+
+
+def failed_marker_name(filename):
+    # Left next to an original whose variants could not be generated, so that
+    # requests serve the original instead of retrying on every hit. Deleting
+    # the marker retries on the next request.
+    return f"{os.path.splitext(filename)[0]}.failed"
+
+
+def _get_executor():
+    # Imported here so that importing this module stays cheap for the CLI
+    from concurrent.futures import ThreadPoolExecutor
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=DEFAULT_WORKERS, thread_name_prefix="cover-art")
+        return _executor
+
+
+def schedule_variants(store_dir, filename):
+    formats = output_formats()
+    if not formats or os.path.exists(os.path.join(store_dir, failed_marker_name(filename))):
+        return None
+    missing = [(variant, fmt) for variant in VARIANTS for fmt in formats
+               if not os.path.exists(os.path.join(store_dir, variant_name(filename, variant, fmt)))]
+    if not missing:
+        return None
+    key = (store_dir, filename)
+    with _executor_lock:
+        if key in _scheduled:
+            return None
+        _scheduled.add(key)
+    return _get_executor().submit(_generate_variants, store_dir, filename, missing)
+
+
+def _generate_variants(store_dir, filename, missing):
+    try:
+        from PIL import Image
+        with Image.open(os.path.join(store_dir, filename)) as image:
+            image.load()
+            if image.mode not in ("RGB", "RGBA"):
+                image = image.convert("RGBA" if image.mode in ("LA", "P", "PA") else "RGB")
+            thumbnails = {}
+            for variant, fmt in missing:
+                if variant not in thumbnails:
+                    thumbnails[variant] = image.copy()
+                    thumbnails[variant].thumbnail(VARIANTS[variant], Image.LANCZOS)
+                dest = os.path.join(store_dir, variant_name(filename, variant, fmt))
+                fd, tmp_path = tempfile.mkstemp(dir=store_dir, suffix=".tmp")
+                os.close(fd)
+                try:
+                    thumbnails[variant].save(tmp_path, format=fmt.upper(), quality=80)
+                    os.replace(tmp_path, dest)
+                except BaseException:
+                    os.remove(tmp_path)
+                    raise
+    except Exception:
+        # Not an image Pillow can read (or write in these formats)
+        with open(os.path.join(store_dir, failed_marker_name(filename)), "w"):
+            pass
+    finally:
+        with _executor_lock:
+            _scheduled.discard((store_dir, filename))
+
+
+def _accepts(fmt, accepted_mimetypes):
+    if FORMAT_MIMETYPES[fmt] in accepted_mimetypes:
+        return True
+    return fmt in WILDCARD_FORMATS and any(mimetype in accepted_mimetypes for mimetype in WILDCARD_MIMETYPES)
+
+
+def resolve(store_dir, filename, variant=None, accepted_mimetypes=()):
+    """Pick the file to serve for ``filename`` at ``variant`` size.
+
+    Returns (name, is_exact). ``is_exact`` is False when the requested variant
+    has not been generated yet and the original is returned instead; it is
+    True for the original when no variant will ever be made for this client.
+    """
+    if variant not in VARIANTS:
+        return filename, True
+    formats = [fmt for fmt in output_formats() if _accepts(fmt, accepted_mimetypes)]
+    for fmt in formats:
+        name = variant_name(filename, variant, fmt)
+        if os.path.exists(os.path.join(store_dir, name)):
+            return name, True
+    if not formats or os.path.exists(os.path.join(store_dir, failed_marker_name(filename))):
+        return filename, True
+    if os.path.exists(os.path.join(store_dir, filename)):
+        schedule_variants(store_dir, filename)
+    return filename, False
@@ -0,0 +1,188 @@
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+DEFAULT_POOL_SIZE = 8
+DEFAULT_BUSY_TIMEOUT_MS = 5000
+# Per-connection cache of compiled statements; game_manager only uses a
+# handful of fixed SQL strings so they stay prepared for the pool's lifetime.
+STATEMENT_CACHE_SIZE = 256
+
+class PoolExhausted(sqlite3.OperationalError):
+    """Every connection stayed checked out for longer than the busy timeout."""
+
+
+# Installed on every connection opened from then on (see set_trace_callback)
+_trace_callback = None
+
+
+def set_trace_callback(callback):
+    """Call ``callback(sql)`` for every statement run on pooled connections
+    opened after this call; None turns tracing off for new connections."""
+    global _trace_callback
+    _trace_callback = callback
+
+
+class ConnectionPool:
+    """Thread-safe pool of long-lived SQLite connections for one database file.
+
+    Connections are opened lazily up to ``size``, run in WAL mode and are handed
+    out one thread at a time. A thread that already holds a connection gets the
+    same one back from nested ``connection()``/``transaction()`` calls, so
+    helpers can be composed without checking out a second connection.
+    """
+
+    def __init__(self, db_path, size=DEFAULT_POOL_SIZE, busy_timeout_ms=DEFAULT_BUSY_TIMEOUT_MS):
+        self.db_path = db_path
+        self.size = max(1, int(size))
+        self.busy_timeout_ms = int(busy_timeout_ms)
+        self._idle = queue.LifoQueue()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._opened = 0
+        self._closed = False
+
+    def _open(self):
+        con = sqlite3.connect(
+            self.db_path,
+            timeout=self.busy_timeout_ms / 1000,
+            isolation_level=None,
+            check_same_thread=False,
+            cached_statements=STATEMENT_CACHE_SIZE,
+        )
+        con.execute("PRAGMA journal_mode=WAL")
+        con.execute("PRAGMA synchronous=NORMAL")
+        con.execute(f"PRAGMA busy_timeout={self.busy_timeout_ms}")
+        if _trace_callback is not None:
+            con.set_trace_callback(_trace_callback)
+        return con
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._closed:
+                raise RuntimeError(f"Connection pool for '{self.db_path}' is closed.")
+            if self._opened < self.size:
+                self._opened += 1
+                try:
+                    return self._open()
+                except Exception:
+                    self._opened -= 1
+                    raise
+        try:
+            return self._idle.get(timeout=self.busy_timeout_ms / 1000)
+        except queue.Empty:
+            raise PoolExhausted(f"connection pool exhausted: all {self.size} connections to "
+                                f"'{self.db_path}' are in use") from None
+
+    def _release(self, con):
+        if con.in_transaction:
+            con.rollback()
+        if self._closed:
+            con.close()
+            with self._lock:
+                self._opened -= 1
+        else:
+            self._idle.put(con)
+
+    @contextmanager
+    def connection(self):
+        held = getattr(self._local, "con", None)
+        if held is not None:
+            yield held
+            return
+        con = self._acquire()
+        self._local.con = con
+        try:
+            yield con
+        finally:
+            self._local.con = None
+            self._release(con)
+
+    @contextmanager
+    def transaction(self):
+        # BEGIN IMMEDIATE takes the write lock up front so that concurrent
+        # writers wait on busy_timeout instead of failing on lock upgrade.
+        with self.connection() as con:
+            if con.in_transaction:
+                yield con
+                return
+            con.execute("BEGIN IMMEDIATE")
+            self._local.after_commit = []
+            try:
+                yield con
+            except BaseException:
+                con.rollback()
+                raise
+            else:
+                con.commit()
+                for callback in self._local.after_commit:
+                    callback()
+            finally:
+                self._local.after_commit = None
+
+    def after_commit(self, callback):
+        # Runs once the calling thread's outermost transaction has committed, so
+        # anything it notifies (caches, change feeds) never sees uncommitted data.
+        pending = getattr(self._local, "after_commit", None)
+        if pending is None:
+            callback()
+        else:
+            pending.append(callback)
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                con = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            con.close()
+            with self._lock:
+                self._opened -= 1
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path, size=DEFAULT_POOL_SIZE, busy_timeout_ms=DEFAULT_BUSY_TIMEOUT_MS):
+    pool = _pools.get(db_path)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(db_path)
+            if pool is None:
+                pool = ConnectionPool(db_path, size, busy_timeout_ms)
+                _pools[db_path] = pool
+    return pool
+
+
+# SQLite connections must not be used across fork() (pre-forking WSGI
+# servers). A child starts without pools; the inherited ones stay referenced
+# but are never used or closed, so the child cannot disturb the parent's locks.
+_inherited_pools = []
+
+
+def _reset_after_fork():
+    global _pools_lock
+    _inherited_pools.extend(_pools.values())
+    _pools.clear()
+    _pools_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def close_all():
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
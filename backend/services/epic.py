@@ -0,0 +1,107 @@
+import json
+import os
+import sys
+
+import file_watch
+
+MANIFEST_EXTENSION = ".item"
+DEFAULT_WORKERS = 4
+
+
+def default_data_path():
+    # The Epic Games Launcher keeps its install records under ProgramData;
+    # there is no native Linux launcher, so nothing is discovered there.
+    if os.name == "nt":
+        return os.path.join(os.getenv("PROGRAMDATA", r"C:\ProgramData"), "Epic")
+    if sys.platform == "darwin":
+        return os.path.expanduser("~/Library/Application Support/Epic")
+    return None
+
+
+def manifest_dir(data_path):
+    return os.path.join(data_path, "EpicGamesLauncher", "Data", "Manifests")
+
+
+def launcher_installed_path(data_path):
+    return os.path.join(data_path, "UnrealEngineLauncher", "LauncherInstalled.dat")
+
+
+def read_json(path):
+    with open(path, "r", encoding="utf-8-sig") as f:
+        return json.load(f)
+
+
+def read_launcher_installed(path):
+    """LauncherInstalled.dat as ``{AppName: InstallLocation}``."""
+    installed = read_json(path).get("InstallationList") or []
+    return {entry["AppName"]: entry.get("InstallLocation") for entry in installed if entry.get("AppName")}
+
+
+def launch_url(item):
+    # The launcher handles sign-in and ownership checks that starting the
+    # executable directly would skip.
+    return ("com.epicgames.launcher://apps/"
+            f"{item['CatalogNamespace']}%3A{item['CatalogItemId']}%3A{item['AppName']}?action=launch&silent=true")
+
+
+def _is_game(item):
+    if not isinstance(item, dict) or item.get("bIsIncompleteInstall"):
+        return False
+    if not all(item.get(key) for key in ("DisplayName", "AppName", "CatalogItemId", "CatalogNamespace")):
+        return False
+    categories = item.get("AppCategories") or []
+    if categories and "games" not in categories:
+        return False  # engines, plugins and other launcher content
+    main_game = item.get("MainGameAppName")
+    return not main_game or main_game == item["AppName"]  # DLC points at its base game
+
+
+_manifest_cache = file_watch.ManifestCache(read_json)
+_installed_cache = file_watch.ManifestCache(read_launcher_installed)
+
+
+def find_installed_games(data_path, cache=None, workers=DEFAULT_WORKERS):
+    """Discovered-game dicts for every installed Epic game.
+
+    Each ``.item`` manifest describes one install; manifests whose app is
+    missing from LauncherInstalled.dat are leftovers of uninstalled games and
+    are dropped. Both files are parsed through mtime caches, and manifests that
+    changed are read in parallel.
+    """
+    cache = cache if cache is not None else _manifest_cache
+    entries = []
+    try:
+        with os.scandir(manifest_dir(data_path)) as it:
+            for entry in it:
+                if entry.name.endswith(MANIFEST_EXTENSION):
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((entry.path, (st.st_mtime_ns, st.st_size)))
+    except OSError:
+        return []
+    items = cache.get_many(entries, workers=workers)
+    cache.prune(items)
+
+    dat_path = launcher_installed_path(data_path)
+    installed = _installed_cache.get(dat_path) if os.path.exists(dat_path) else None
+
+    games = []
+    for path, _ in entries:
+        item = items[path]
+        if not _is_game(item):
+            continue
+        install_location = item.get("InstallLocation")
+        if installed is not None:
+            if item["AppName"] not in installed:
+                continue
+            install_location = installed[item["AppName"]] or install_location
+        games.append({
+            "title": item["DisplayName"],
+            "url": launch_url(item),
+            "source": "epic",
+            "external_id": item["CatalogItemId"],
+            "install_location": os.path.normpath(install_location) if install_location else None,
+        })
+    return games
@@ -0,0 +1,149 @@
+import os
+import threading
+import time
+
+DEFAULT_CHECK_INTERVAL = 1.0
+
+
+def stat_signature(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class StatCache:
+    """Caches ``loader(path)`` until the path's mtime/size signature changes.
+
+    The signature is re-checked at most every ``check_interval`` seconds, so a
+    hot read costs neither disk I/O nor a stat call. For a directory the mtime
+    moves whenever an entry is added, removed or renamed.
+    """
+
+    def __init__(self, path, loader, check_interval=DEFAULT_CHECK_INTERVAL):
+        self.path = path
+        self.loader = loader
+        self.check_interval = check_interval
+        self._signature = None
+        self._value = None
+        self._checked_at = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < self.check_interval:
+            return self._value
+        with self._lock:
+            signature = stat_signature(self.path)
+            if self._checked_at is None or signature != self._signature:
+                self._value = self.loader(self.path)
+                self._signature = signature
+            self._checked_at = now
+            return self._value
+
+    def invalidate(self):
+        with self._lock:
+            self._checked_at = None
+
+
+class FileWatcher:
+    """Polls ``path`` from a daemon thread and calls ``callback(path)`` when its
+    signature changes. ``expect()`` records a change the owner made itself so
+    that it does not come back as a notification."""
+
+    def __init__(self, path, callback, check_interval=DEFAULT_CHECK_INTERVAL):
+        self.path = path
+        self.callback = callback
+        self.check_interval = check_interval
+        self._signature = stat_signature(path)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=f"watch-{os.path.basename(self.path)}",
+                                            daemon=True)
+            self._thread.start()
+        return self
+
+    def expect(self):
+        self._signature = stat_signature(self.path)
+
+    def _run(self):
+        while not self._stop.wait(self.check_interval):
+            signature = stat_signature(self.path)
+            if signature != self._signature:
+                self._signature = signature
+                try:
+                    self.callback(self.path)
+                except Exception as e:
+                    print(f"Reloading {self.path} failed: {e}")
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+class ManifestCache:
+    """Parsed files keyed by path and invalidated by their mtime/size signature,
+    so repeated scans only re-read the files that were rewritten since the last
+    one. Files that cannot be read or parsed are cached as None."""
+
+    def __init__(self, reader):
+        self.reader = reader
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _read(self, path):
+        try:
+            return self.reader(path)
+        except (OSError, ValueError):
+            return None
+
+    def get(self, path, signature=None):
+        signature = signature or stat_signature(path)
+        entry = self._entries.get(path)
+        if entry is not None and entry[0] == signature:
+            self.hits += 1
+            return entry[1]
+        value = self._read(path)
+        with self._lock:
+            self._entries[path] = (signature, value)
+        self.misses += 1
+        return value
+
+    def get_many(self, entries, workers=1):
+        """``{path: value}`` for ``(path, signature)`` pairs; misses are read
+        on up to ``workers`` threads."""
+        results = {}
+        misses = []
+        for path, signature in entries:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == signature:
+                results[path] = entry[1]
+            else:
+                misses.append((path, signature))
+        self.hits += len(results)
+        if workers > 1 and len(misses) > 1:
+            # Imported here so that importing this module stays cheap for the CLI
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(max_workers=min(workers, len(misses))) as executor:
+                values = list(executor.map(self._read, [path for path, _ in misses]))
+        else:
+            values = [self._read(path) for path, _ in misses]
+        with self._lock:
+            for (path, signature), value in zip(misses, values):
+                self._entries[path] = (signature, value)
+                results[path] = value
+        self.misses += len(misses)
+        return results
+
+    def prune(self, paths):
+        with self._lock:
+            for path in set(self._entries) - set(paths):
+                del self._entries[path]
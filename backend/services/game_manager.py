@@ -1,30 +1,121 @@
-import sqlite3
 import os
-import subprocess
+import re
+import sys
+import sqlite3
 import json
-import shutil
-
-try:
-    import curses
-    CURSES_AVAILABLE = True
-except ImportError:
-    CURSES_AVAILABLE = False
+import base64
+import copy
+import threading
+import time
 
-# Load configuration from JSON file
-config_path = os.path.join(os.path.dirname(__file__), "config.json")
-with open(config_path, "r") as config_file:
-    config = json.load(config_file)
+import cover_art
+import database
+import scanner
 
-DB_PATH = config["db_path"]
+CONFIG_PATH = os.getenv("GAME_LAUNCHER_CONFIG") or os.path.join(os.path.dirname(__file__), "config.json")
+# Legacy location of covers added before the content-addressed store
 COVER_ART_DIR = os.path.join(os.path.dirname(__file__), "../api/cover_art")
-CACHE_COVER_ART_DIR = os.path.join(os.getenv("APPDATA"), "sagrusea", "game-launcher", "cache", "cover_art")
+
+# Configuration is read on first use rather than at import time and then
+# served from memory; see config.ConfigStore.
+_config_store = None
+_config_store_lock = threading.Lock()
+
+def config_store():
+    import config as config_service  # read on first use, never at import time
+    global _config_store
+    if _config_store is None:
+        with _config_store_lock:
+            if _config_store is None:
+                store = config_service.ConfigStore(CONFIG_PATH, config_service.LAUNCHER_SCHEMA,
+                                                   config_service.LAUNCHER_DEFAULTS)
+                store.subscribe(_on_config_changed)
+                _config_store = store
+    return _config_store
+
+def get_config():
+    return config_store().get()
+
+def _db_path(config):
+    return config.get("db_path") or os.path.join(app_data_dir(), "launcher.db")
+
+def get_db_path():
+    return _db_path(get_config())
+
+def app_data_dir():
+    # %APPDATA% on Windows, the XDG data directory elsewhere
+    base = os.getenv("APPDATA") or os.getenv("XDG_DATA_HOME") or os.path.join(os.path.expanduser("~"), ".local", "share")
+    return os.path.join(base, "sagrusea", "game-launcher")
+
+def get_cover_store_dir():
+    # Content-addressed cover store (see cover_art.store_cover)
+    return os.getenv("CACHE_COVER_ART_DIR") or os.path.join(app_data_dir(), "cache", "cover_art")
+
+# Used unless config.json sets db_pool_size; the API server raises it to
+# match its thread count (see launcher.py)
+DB_POOL_SIZE = database.DEFAULT_POOL_SIZE
+
+def get_pool():
+    config = get_config()
+    return database.get_pool(
+        get_db_path(),
+        size=config.get("db_pool_size", DB_POOL_SIZE),
+        busy_timeout_ms=config.get("db_busy_timeout_ms", database.DEFAULT_BUSY_TIMEOUT_MS),
+    )
+
+def connection():
+    return get_pool().connection()
+
+def transaction():
+    return get_pool().transaction()
+
+# Moves on after every committed change to the games table, so anything
+# derived from the library (e.g. the serialized list in app.py) can be cached
+# until the next write. Writes made by other server processes are seen through
+# a marker file next to the database that every write touches; checking it
+# costs one stat() and no SQLite query.
+_library_revision = 0
+_library_revision_changed = threading.Condition()
+
+def _revision_marker_path():
+    return get_db_path() + ".revision"
+
+def library_revision():
+    import file_watch  # already loaded by config_store(); this is a dictionary lookup
+    return _library_revision, file_watch.stat_signature(_revision_marker_path())
+
+def _touch_revision_marker():
+    path = _revision_marker_path()
+    now = time.time_ns()
+    try:
+        with open(path, "a"):
+            pass
+        os.utime(path, ns=(now, now))
+    except OSError as e:
+        print(f"Could not update {path}: {e}")
+
+def _bump_library_revision():
+    global _library_revision
+    with _library_revision_changed:
+        _library_revision += 1
+        _touch_revision_marker()
+        _library_revision_changed.notify_all()
+
+def wait_for_library_change(revision, timeout=None):
+    """Block until library_revision() moves past ``revision``; False on timeout.
+
+    Only writes made by this process wake the caller early; callers poll with a
+    timeout to notice the other processes' writes.
+    """
+    with _library_revision_changed:
+        return _library_revision_changed.wait_for(lambda: library_revision() != revision, timeout)
+
+def _library_changed():
+    get_pool().after_commit(_bump_library_revision)
 
 def init_db():
-    print(config_path)
-    print(DB_PATH)
-    con = sqlite3.connect(DB_PATH)
-    cur = con.cursor()
-    cur.execute("""
+    with transaction() as con:
+        con.execute("""
         CREATE TABLE IF NOT EXISTS games (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             title TEXT NOT NULL,
@@ -34,91 +125,444 @@ def init_db():
             added_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
     """)
-    con.commit()
-    con.close()
-
-def get_lowest_available_id():
-    con = sqlite3.connect(DB_PATH)
-    cur = con.cursor()
-    cur.execute("SELECT id FROM games ORDER BY id")
-    ids = [row[0] for row in cur.fetchall()]
-    con.close()
-    for i in range(1, len(ids) + 2):
-        if i not in ids:
-            return i
+        # Directory/mtime index used by incremental rescans (see rescan_directory)
+        con.execute("""
+        CREATE TABLE IF NOT EXISTS scan_roots (
+            root TEXT PRIMARY KEY,
+            signature TEXT NOT NULL,
+            scanned_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+        con.execute("""
+        CREATE TABLE IF NOT EXISTS scan_dirs (
+            root TEXT NOT NULL,
+            path TEXT NOT NULL,
+            parent TEXT,
+            mtime_ns INTEGER NOT NULL,
+            PRIMARY KEY (root, path)
+        ) WITHOUT ROWID
+    """)
+        con.execute("""
+        CREATE TABLE IF NOT EXISTS scan_files (
+            root TEXT NOT NULL,
+            path TEXT NOT NULL,
+            dir TEXT NOT NULL,
+            size INTEGER,
+            mtime_ns INTEGER,
+            PRIMARY KEY (root, path)
+        ) WITHOUT ROWID
+    """)
+        con.execute("CREATE INDEX IF NOT EXISTS idx_scan_files_dir ON scan_files (root, dir)")
+        _migrate(con)
+        _trim_change_log(con)
+
+def _add_column(con, table, column, definition):
+    columns = {row[1] for row in con.execute(f"PRAGMA table_info({table})")}
+    if column not in columns:
+        con.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+def _migration_query_indexes(con):
+    # Older databases were created before the background column existed
+    _add_column(con, "games", "background", "TEXT")
+    con.execute("CREATE INDEX IF NOT EXISTS idx_games_title ON games (title COLLATE NOCASE, id)")
+    con.execute("CREATE INDEX IF NOT EXISTS idx_games_added_date ON games (added_date, id)")
+    try:
+        con.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS games_fts USING fts5(
+                title, content='games', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+            )
+        """)
+    except sqlite3.OperationalError:
+        return  # SQLite built without FTS5; search falls back to idx_games_title
+    con.execute("""
+        CREATE TRIGGER IF NOT EXISTS games_fts_insert AFTER INSERT ON games BEGIN
+            INSERT INTO games_fts (rowid, title) VALUES (new.id, new.title);
+        END
+    """)
+    con.execute("""
+        CREATE TRIGGER IF NOT EXISTS games_fts_delete AFTER DELETE ON games BEGIN
+            INSERT INTO games_fts (games_fts, rowid, title) VALUES ('delete', old.id, old.title);
+        END
+    """)
+    con.execute("""
+        CREATE TRIGGER IF NOT EXISTS games_fts_update AFTER UPDATE OF id, title ON games BEGIN
+            INSERT INTO games_fts (games_fts, rowid, title) VALUES ('delete', old.id, old.title);
+            INSERT INTO games_fts (rowid, title) VALUES (new.id, new.title);
+        END
+    """)
+    con.execute("INSERT INTO games_fts (games_fts) VALUES ('rebuild')")
+
+def _migration_display_order(con):
+    # IDs no longer get renumbered on delete; list position lives here instead
+    _add_column(con, "games", "display_order", "INTEGER")
+    con.execute("UPDATE games SET display_order = id WHERE display_order IS NULL")
+    con.execute("CREATE INDEX IF NOT EXISTS idx_games_display_order ON games (display_order, id)")
+    con.execute("""
+        CREATE TRIGGER IF NOT EXISTS games_default_display_order AFTER INSERT ON games
+        WHEN new.display_order IS NULL BEGIN
+            UPDATE games SET display_order = new.id WHERE id = new.id;
+        END
+    """)
+
+def _migration_sessions(con):
+    con.execute("""
+        CREATE TABLE IF NOT EXISTS sessions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            game_id INTEGER NOT NULL,
+            pid INTEGER,
+            command TEXT NOT NULL,
+            status TEXT NOT NULL,
+            exit_code INTEGER,
+            started_at REAL NOT NULL,
+            ended_at REAL
+        )
+    """)
+    con.execute("CREATE INDEX IF NOT EXISTS idx_sessions_running ON sessions (id) WHERE status = 'running'")
+    con.execute("CREATE INDEX IF NOT EXISTS idx_sessions_game ON sessions (game_id, started_at)")
+
+def _migration_store_ids(con):
+    # Games discovered through a store keep its stable ID and install folder,
+    # which is what scans deduplicate on
+    _add_column(con, "games", "source", "TEXT")
+    _add_column(con, "games", "external_id", "TEXT")
+    _add_column(con, "games", "install_location", "TEXT")
+    con.execute("""
+        UPDATE games SET source = 'steam', external_id = substr(executable_path, 19)
+        WHERE executable_path LIKE 'steam://rungameid/%' AND source IS NULL
+    """)
+    con.execute("CREATE INDEX IF NOT EXISTS idx_games_executable_path ON games (executable_path)")
+    con.execute("CREATE INDEX IF NOT EXISTS idx_games_external_id ON games (source, external_id) WHERE external_id IS NOT NULL")
+    con.execute("CREATE INDEX IF NOT EXISTS idx_games_install_location ON games (install_location) WHERE install_location IS NOT NULL")
+
+def _migration_jobs(con):
+    # Background operations (see jobs.JobQueue); pid identifies the server
+    # process that runs a queued/running job
+    con.execute("""
+        CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,
+            key TEXT NOT NULL,
+            status TEXT NOT NULL,
+            pid INTEGER,
+            progress TEXT,
+            result TEXT,
+            error TEXT,
+            created_at REAL NOT NULL,
+            started_at REAL,
+            ended_at REAL
+        )
+    """)
+    con.execute("CREATE INDEX IF NOT EXISTS idx_jobs_active ON jobs (kind, key) WHERE status IN ('queued', 'running')")
+
+def _migration_change_feed(con):
+    # Every write to games, from any code path or process, appends a row here;
+    # the AUTOINCREMENT key is the library's persistent revision (see changes_since)
+    con.execute("""
+        CREATE TABLE IF NOT EXISTS changes (
+            revision INTEGER PRIMARY KEY AUTOINCREMENT,
+            op TEXT NOT NULL,
+            game_id INTEGER NOT NULL
+        )
+    """)
+    con.execute("""
+        CREATE TRIGGER IF NOT EXISTS games_changes_insert AFTER INSERT ON games BEGIN
+            INSERT INTO changes (op, game_id) VALUES ('insert', new.id);
+        END
+    """)
+    con.execute("""
+        CREATE TRIGGER IF NOT EXISTS games_changes_update AFTER UPDATE ON games BEGIN
+            INSERT INTO changes (op, game_id) VALUES ('update', new.id);
+        END
+    """)
+    con.execute("""
+        CREATE TRIGGER IF NOT EXISTS games_changes_delete AFTER DELETE ON games BEGIN
+            INSERT INTO changes (op, game_id) VALUES ('delete', old.id);
+        END
+    """)
+
+def _migration_play_stats(con):
+    # Aggregates over the sessions table, kept on the game row by triggers so
+    # that sorting by them is an index walk however many sessions are logged.
+    # last_played is 0 rather than NULL for games never launched, which keeps
+    # keyset pagination (see _games_query) free of NULL comparisons.
+    _add_column(con, "games", "playtime", "REAL NOT NULL DEFAULT 0")
+    _add_column(con, "games", "launch_count", "INTEGER NOT NULL DEFAULT 0")
+    _add_column(con, "games", "last_played", "REAL NOT NULL DEFAULT 0")
+    con.execute("""
+        UPDATE games SET
+            launch_count = (SELECT count(*) FROM sessions WHERE game_id = games.id),
+            last_played = coalesce((SELECT max(started_at) FROM sessions WHERE game_id = games.id), 0),
+            playtime = coalesce((SELECT sum(max(0, ended_at - started_at)) FROM sessions
+                                 WHERE game_id = games.id AND status IN ('exited', 'stopped')), 0)
+        WHERE id IN (SELECT game_id FROM sessions)
+    """)
+    con.execute("CREATE INDEX IF NOT EXISTS idx_games_last_played ON games (last_played, id)")
+    con.execute("CREATE INDEX IF NOT EXISTS idx_games_playtime ON games (playtime, id)")
+    con.execute("""
+        CREATE TRIGGER IF NOT EXISTS sessions_stats_launch AFTER INSERT ON sessions BEGIN
+            UPDATE games SET launch_count = launch_count + 1, last_played = max(last_played, new.started_at)
+            WHERE id = new.game_id;
+        END
+    """)
+    # Lost sessions (the process vanished while no launcher was watching) have
+    # no real end time, and handed-off ones (store URLs) only time the opener,
+    # so they count as a launch but add no playtime
+    con.execute("""
+        CREATE TRIGGER IF NOT EXISTS sessions_stats_end AFTER UPDATE OF ended_at ON sessions
+        WHEN old.ended_at IS NULL AND new.ended_at IS NOT NULL AND new.status IN ('exited', 'stopped') BEGIN
+            UPDATE games SET playtime = playtime + max(0, new.ended_at - new.started_at) WHERE id = new.game_id;
+        END
+    """)
+
+def _migration_session_identity(con):
+    # A PID alone may have been reused by an unrelated process since the
+    # session started; see supervisor.process_identity
+    _add_column(con, "sessions", "process_identity", "TEXT")
+
+def _migration_job_heartbeat(con):
+    # Jobs of another server process count as running only while that process
+    # keeps stamping them (see jobs.HEARTBEAT_TIMEOUT); a PID may have been reused
+    _add_column(con, "jobs", "instance", "TEXT")
+    _add_column(con, "jobs", "heartbeat", "REAL")
+
+def _migration_insert_display_order(con):
+    # INSERTs set display_order themselves (NEXT_DISPLAY_ORDER); the trigger's
+    # extra UPDATE doubled the change log rows and slowed bulk inserts
+    con.execute("DROP TRIGGER IF EXISTS games_default_display_order")
+    con.execute("UPDATE games SET display_order = id WHERE display_order IS NULL")
+
+# New games go to the end of the list; the (display_order, id) index makes this cheap
+NEXT_DISPLAY_ORDER = "(SELECT coalesce(max(display_order), 0) + 1 FROM games)"
+
+# Applied in order by init_db; PRAGMA user_version records how many have run.
+# Append new migrations to the end, never reorder or remove existing ones.
+MIGRATIONS = [
+    _migration_query_indexes,
+    _migration_display_order,
+    _migration_sessions,
+    _migration_store_ids,
+    _migration_jobs,
+    _migration_change_feed,
+    _migration_play_stats,
+    _migration_session_identity,
+    _migration_job_heartbeat,
+    _migration_insert_display_order,
+]
+
+def _migrate(con):
+    version = con.execute("PRAGMA user_version").fetchone()[0]
+    for number, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+        migration(con)
+        con.execute(f"PRAGMA user_version = {number}")
 
 def add_game_to_db(title, executable_path, cover_art_path=None):
-    con = sqlite3.connect(DB_PATH)
-    cur = con.cursor()
-    new_id = get_lowest_available_id()
     if cover_art_path:
-        cover_art_filename = os.path.basename(cover_art_path)
-        cover_art_dest = os.path.join(COVER_ART_DIR, cover_art_filename)
-        cache_cover_art_dest = os.path.join(CACHE_COVER_ART_DIR, cover_art_filename)
-        os.makedirs(COVER_ART_DIR, exist_ok=True)
-        os.makedirs(CACHE_COVER_ART_DIR, exist_ok=True)
-        shutil.copy(cover_art_path, cover_art_dest)
-        shutil.copy(cover_art_path, cache_cover_art_dest)
-        cover_art_path = cover_art_filename
-    cur.execute("INSERT INTO games (id, title, executable_path, cover_art_path) VALUES (?, ?, ?, ?)", 
-                (new_id, title, executable_path, cover_art_path))
-    con.commit()
-    con.close()
+        cover_art_path = cover_art.store_cover(cover_art_path, get_cover_store_dir())
+    with transaction() as con:
+        new_id = con.execute("INSERT INTO games (title, executable_path, cover_art_path, display_order) "
+                             f"VALUES (?, ?, ?, {NEXT_DISPLAY_ORDER})",
+                             (title, executable_path, cover_art_path)).lastrowid
+        _library_changed()
     print(f"Game '{title}' added successfully with ID {new_id}.")
 
+_supervisor = None
+_supervisor_lock = threading.Lock()
+
+def get_supervisor():
+    import supervisor  # pulls in subprocess; only needed once a game is launched
+    global _supervisor
+    pool = get_pool()
+    with _supervisor_lock:
+        if _supervisor is None or _supervisor._pool is not pool:
+            # The sessions triggers have already updated the game's play stats
+            _supervisor = supervisor.LaunchSupervisor(pool, on_exit=lambda session: _bump_library_revision())
+            _supervisor.recover()
+        return _supervisor
+
+# steam://, com.epicgames.launcher:// and other store URLs (a one-letter drive never matches)
+LAUNCH_URL = re.compile(r"^[A-Za-z][A-Za-z0-9+.-]+://")
+
+def _open_url_command(url):
+    # Returns (command, shell) that hands a steam:// style URL to the OS
+    if os.name == "nt":
+        # Quoted so that cmd does not split Epic's "...&silent=true" query
+        return f'start "" "{url}"', True
+    if sys.platform == "darwin":
+        return ["open", url], False
+    return ["xdg-open", url], False
+
 def run_game(game_id):
-    con = sqlite3.connect(DB_PATH)
-    cur = con.cursor()
-    cur.execute("SELECT executable_path FROM games WHERE id = ?", (game_id,))
-    game = cur.fetchone()
-    con.close()
+    """Launch a game without waiting for it; returns its session dict, or None.
+
+    Store URLs are handed to the OS and give a ``handed_off`` session: the
+    store starts the game, so it is not tracked and adds no playtime.
+    """
+    with connection() as con:
+        game = con.execute("SELECT executable_path FROM games WHERE id = ?", (game_id,)).fetchone()
     if game:
         executable_path = game[0]
-        if executable_path.startswith("steam://"):
+        if LAUNCH_URL.match(executable_path):
             try:
-                subprocess.run(["start", executable_path], shell=True, check=True)
-                print(f"Running Steam game with ID {game_id}.")
-            except subprocess.CalledProcessError as e:
-                print(f"Failed to run the Steam game: {e}")
+                command, shell = _open_url_command(executable_path)
+                # Only the opener is tracked, see LaunchSupervisor
+                session = get_supervisor().launch(game_id, command, shell=shell, handed_off=True)
+                _bump_library_revision()
+                print(f"Running game with ID {game_id} through its store launcher.")
+                return session
+            except OSError as e:
+                print(f"Failed to run the game through its store launcher: {e}")
         elif os.path.exists(executable_path):
             try:
-                subprocess.run(executable_path, check=True)
-                print(f"Running game with ID {game_id}.")
-            except subprocess.CalledProcessError as e:
+                session = get_supervisor().launch(game_id, [executable_path],
+                                                  cwd=os.path.dirname(executable_path) or None)
+                _bump_library_revision()
+                print(f"Running game with ID {game_id} (session {session['id']}).")
+                return session
+            except OSError as e:
                 print(f"Failed to run the game: {e}")
         else:
             print(f"Executable path '{executable_path}' does not exist.")
     else:
         print(f"No game found with ID {game_id}.")
+    return None
+
+def running_sessions():
+    return get_supervisor().running_sessions()
+
+def stop_session(session_id):
+    stopped = get_supervisor().stop(session_id)
+    if stopped:
+        _bump_library_revision()
+        print(f"Stopped session {session_id}.")
+    else:
+        print(f"No running session with ID {session_id}.")
+    return stopped
+
+def game_sessions(game_id, limit=50):
+    """The game's most recent sessions, newest first."""
+    return get_supervisor().game_sessions(game_id, limit)
+
+def _game_updates(title=None, executable_path=None, cover_art_path=None):
+    # (column, value) for every field that is set; empty values keep the current one
+    fields = (("title", title), ("executable_path", executable_path), ("cover_art_path", cover_art_path))
+    return [(column, value) for column, value in fields if value]
+
+def _update_game(con, game_id, updates):
+    # One UPDATE for all changed columns; returns whether the game exists
+    assignments = ", ".join(f"{column} = ?" for column, _ in updates)
+    cursor = con.execute(f"UPDATE games SET {assignments} WHERE id = ?", [value for _, value in updates] + [game_id])
+    return cursor.rowcount > 0
 
 def update_game_info(game_id, title=None, executable_path=None, cover_art_path=None):
-    con = sqlite3.connect(DB_PATH)
-    cur = con.cursor()
-    if title:
-        cur.execute("UPDATE games SET title = ? WHERE id = ?", (title, game_id))
-    if executable_path:
-        cur.execute("UPDATE games SET executable_path = ? WHERE id = ?", (executable_path, game_id))
     if cover_art_path:
-        cover_art_filename = os.path.basename(cover_art_path)
-        cover_art_dest = os.path.join(COVER_ART_DIR, cover_art_filename)
-        cache_cover_art_dest = os.path.join(CACHE_COVER_ART_DIR, cover_art_filename)
-        os.makedirs(COVER_ART_DIR, exist_ok=True)
-        os.makedirs(CACHE_COVER_ART_DIR, exist_ok=True)
-        shutil.copy(cover_art_path, cover_art_dest)
-        shutil.copy(cover_art_path, cache_cover_art_dest)
-        cover_art_path = cover_art_filename
-        cur.execute("UPDATE games SET cover_art_path = ? WHERE id = ?", (cover_art_path, game_id))
-    con.commit()
-    con.close()
+        cover_art_path = cover_art.store_cover(cover_art_path, get_cover_store_dir())
+    updates = _game_updates(title, executable_path, cover_art_path)
+    if updates:
+        with transaction() as con:
+            _update_game(con, game_id, updates)
+            _library_changed()
     print(f"Game with ID {game_id} updated successfully.")
 
 def get_games():
-    con = sqlite3.connect(DB_PATH)
-    cur = con.cursor()
-    cur.execute("SELECT id, title, cover_art_path, background FROM games")
-    games = cur.fetchall()
-    con.close()
-    return games
+    with connection() as con:
+        return con.execute("SELECT id, title, cover_art_path, background FROM games").fetchall()
+
+# Sort key -> (SQL expression, index of the value in a query_games row)
+GAME_SORT_KEYS = {
+    "id": ("id", 0),
+    "title": ("title COLLATE NOCASE", 1),
+    "added_date": ("added_date", 4),
+    "display_order": ("display_order", 5),
+    "most_played": ("playtime", 6),
+    "recently_played": ("last_played", 8),
+}
+GAME_QUERY_COLUMNS = ("id, title, cover_art_path, background, added_date, display_order, "
+                      "playtime, launch_count, last_played")
+
+def encode_cursor(sort, row):
+    value = row[GAME_SORT_KEYS[sort][1]]
+    return base64.urlsafe_b64encode(json.dumps([sort, value, row[0]]).encode()).decode()
+
+def decode_cursor(sort, cursor):
+    try:
+        cursor_sort, value, last_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    if cursor_sort != sort:
+        raise ValueError("Cursor was issued for a different sort order")
+    return value, last_id
+
+def _has_fts(con):
+    return con.execute("SELECT 1 FROM sqlite_master WHERE name = 'games_fts'").fetchone() is not None
+
+def _check_sort(sort, order):
+    if sort not in GAME_SORT_KEYS:
+        raise ValueError(f"Unsupported sort key '{sort}'")
+    if order not in ("asc", "desc"):
+        raise ValueError(f"Unsupported sort order '{order}'")
+
+def _games_query(con, sort, order, search, cursor):
+    _check_sort(sort, order)
+    sort_expr = GAME_SORT_KEYS[sort][0]
+    clauses = []
+    params = []
+    if search:
+        terms = re.findall(r"\w+", search)
+        if terms and _has_fts(con):
+            clauses.append("id IN (SELECT rowid FROM games_fts WHERE games_fts MATCH ?)")
+            params.append(" ".join(f'"{term}"*' for term in terms))
+        else:
+            escaped = search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            clauses.append("title LIKE ? ESCAPE '\\'")
+            params.append(escaped + "%")
+    if cursor:
+        value, last_id = decode_cursor(sort, cursor)
+        op = "<" if order == "desc" else ">"
+        # The single-column bound lets SQLite seek the sort index; the row value
+        # comparison then breaks ties on id.
+        clauses.append(f"{sort_expr} {op}= ? AND ({sort_expr}, id) {op} (?, ?)")
+        params.extend([value, value, last_id])
+    sql = f"SELECT {GAME_QUERY_COLUMNS} FROM games"
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    sql += f" ORDER BY {sort_expr} {order.upper()}, id {order.upper()}"
+    return sql, params
+
+def iter_games(sort="id", order="asc", search=None, cursor=None, batch_size=500):
+    """Return an iterator over game rows (id, title, cover_art_path, background, added_date,
+    display_order, playtime, launch_count, last_played).
+
+    Arguments are validated up front so that a bad request fails before any row
+    has been streamed.
+    """
+    _check_sort(sort, order)
+    if cursor:
+        decode_cursor(sort, cursor)
+    return _iter_game_rows(sort, order, search, cursor, batch_size)
+
+def _iter_game_rows(sort, order, search, cursor, batch_size):
+    # One keyset page per batch, each on a short-lived connection: a slow
+    # download neither holds a pooled connection nor keeps a read transaction
+    # open (which would stop WAL checkpoints) between batches
+    while True:
+        rows, cursor = _query_page(batch_size, sort, order, search, cursor)
+        yield from rows
+        if cursor is None:
+            return
+
+def _query_page(limit, sort, order, search, cursor):
+    with connection() as con:
+        sql, params = _games_query(con, sort, order, search, cursor)
+        rows = con.execute(sql + " LIMIT ?", params + [limit + 1]).fetchall()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, encode_cursor(sort, rows[-1])
+    return rows, None
+
+def query_games(limit, sort="id", order="asc", search=None, cursor=None):
+    """Return one page of game rows and the cursor for the next page (or None)."""
+    return _query_page(limit, sort, order, search, cursor)
 
 def list_games():
     games = get_games()
@@ -126,127 +570,840 @@ def list_games():
         print(f"ID: {game[0]}, Title: {game[1]}")
 
 def delete_game(game_id):
-    con = sqlite3.connect(DB_PATH)
-    cur = con.cursor()
-    cur.execute("DELETE FROM games WHERE id = ?", (game_id,))
-    con.commit()
-    cur.execute("UPDATE games SET id = id - 1 WHERE id > ?", (game_id,))
-    con.commit()
-    con.close()
-    print(f"Game with ID {game_id} deleted and IDs adjusted successfully.")
+    with transaction() as con:
+        con.execute("DELETE FROM games WHERE id = ?", (game_id,))
+        _library_changed()
+    print(f"Game with ID {game_id} deleted successfully.")
+
+# Stays well below SQLite's host parameter limit on older builds
+DELETE_BATCH_SIZE = 500
 
 def delete_games(game_ids):
-    con = sqlite3.connect(DB_PATH)
-    cur = con.cursor()
-    for game_id in game_ids:
-        cur.execute("DELETE FROM games WHERE id = ?", (game_id,))
-    con.commit()
-    cur.execute("UPDATE games SET id = id - 1 WHERE id > ?", (min(game_ids),))
-    con.commit()
-    con.close()
-    print(f"Games with IDs {game_ids} deleted and IDs adjusted successfully.")
-
-def scan_for_games(directory):
-    found_games = False
-    for root, dirs, files in os.walk(directory):
-        for file in files:
-            if file.endswith(".exe"):
-                title = os.path.splitext(file)[0]
-                executable_path = os.path.join(root, file)
-                add_game_to_db(title, executable_path)
-                print(f"Found and added game: {title}")
-                found_games = True
-        for dir in dirs:
-            dir_path = os.path.join(root, dir)
-            for sub_root, sub_dirs, sub_files in os.walk(dir_path):
-                for sub_file in sub_files:
-                    if sub_file.endswith(".exe"):
-                        title = os.path.splitext(sub_file)[0]
-                        executable_path = os.path.join(sub_root, sub_file)
-                        add_game_to_db(title, executable_path)
-                        print(f"Found and added game: {title}")
-                        found_games = True
-    if not found_games:
-        print(f"No games found in directory: {directory}")
+    game_ids = list(game_ids)
+    with transaction() as con:
+        for start in range(0, len(game_ids), DELETE_BATCH_SIZE):
+            batch = game_ids[start:start + DELETE_BATCH_SIZE]
+            con.execute(f"DELETE FROM games WHERE id IN ({', '.join('?' * len(batch))})", batch)
+        _trim_change_log(con)
+        _library_changed()
+    print(f"Games with IDs {game_ids} deleted successfully.")
+
+BATCH_OPS = ("add", "update", "delete")
+MAX_BATCH_SIZE = 10000
+
+class _BatchAborted(Exception):
+    pass
+
+def _prepare_batch_item(item):
+    # Validates one batch operation and stores its cover; returns the fields
+    # to write, or raises ValueError with the message for the item's result
+    if not isinstance(item, dict):
+        raise ValueError("Operation must be an object")
+    op = item.get("op")
+    if op not in BATCH_OPS:
+        raise ValueError(f"Unsupported op '{op}'; expected one of {', '.join(BATCH_OPS)}")
+    fields = {name: item.get(name) for name in ("title", "executable_path", "cover_art_path")}
+    for name, value in fields.items():
+        if value is not None and not isinstance(value, str):
+            raise ValueError(f"'{name}' must be a string")
+    if op != "add":
+        game_id = item.get("id")
+        if not isinstance(game_id, int) or isinstance(game_id, bool):
+            raise ValueError("'id' must be an integer")
+    if op == "add" and not (fields["title"] and fields["executable_path"]):
+        raise ValueError("'title' and 'executable_path' are required")
+    if op == "update" and not any(fields.values()):
+        raise ValueError("Nothing to update")
+    if op != "delete" and fields["cover_art_path"]:
+        fields["cover_art_path"] = cover_art.store_cover(fields["cover_art_path"], get_cover_store_dir())
+    return fields
+
+def apply_game_batch(operations, atomic=True):
+    """Apply add/update/delete operations in one transaction.
+
+    Each operation is a dict with "op" and, for update and delete, the game
+    "id"; adds take "title", "executable_path" and an optional
+    "cover_art_path", updates any of those three. Returns (committed, results)
+    with one result dict per operation, in order. With ``atomic`` a single
+    failing operation rolls the whole batch back; otherwise the failing ones
+    are skipped and the rest is committed.
+    """
+    results = []
+    prepared = []
+    # Validation and cover copies happen before the write lock is taken
+    for index, item in enumerate(operations):
+        result = {"index": index, "op": item.get("op") if isinstance(item, dict) else None}
+        try:
+            fields = _prepare_batch_item(item)
+        except (ValueError, OSError) as e:
+            result.update(status="error", error=str(e))
+            fields = None
+        else:
+            if result["op"] != "add":
+                result["id"] = item["id"]
+        results.append(result)
+        prepared.append(fields)
+    failed = any(result.get("status") == "error" for result in results)
+
+    if not (failed and atomic):
+        try:
+            with transaction() as con:
+                deleted = False
+                for result, fields in zip(results, prepared):
+                    if fields is None:
+                        continue
+                    op = result["op"]
+                    if op == "add":
+                        result["id"] = con.execute(
+                            "INSERT INTO games (title, executable_path, cover_art_path, display_order) "
+                            f"VALUES (?, ?, ?, {NEXT_DISPLAY_ORDER})",
+                            (fields["title"], fields["executable_path"], fields["cover_art_path"])).lastrowid
+                        found = True
+                    elif op == "update":
+                        found = _update_game(con, result["id"], _game_updates(**fields))
+                    else:
+                        found = con.execute("DELETE FROM games WHERE id = ?", (result["id"],)).rowcount > 0
+                        deleted = deleted or found
+                    if found:
+                        result["status"] = "ok"
+                    else:
+                        result.update(status="error", error=f"No game found with ID {result['id']}.")
+                        failed = True
+                if failed and atomic:
+                    raise _BatchAborted()
+                if deleted:
+                    _trim_change_log(con)
+                _library_changed()
+        except _BatchAborted:
+            pass
+
+    committed = not (failed and atomic)
+    if not committed:
+        for result in results:
+            if result.get("status") != "error":
+                result["status"] = "rolled_back"
+                if result["op"] == "add":
+                    result.pop("id", None)
+    applied = sum(result.get("status") == "ok" for result in results)
+    print(f"Batch of {len(results)} operations: {applied} applied, "
+          f"{len(results) - applied} not applied{'' if committed else ' (rolled back)'}.")
+    return committed, results
+
+def reorder_games(game_ids):
+    # Display order is separate from the (stable) IDs. Listed games move to
+    # positions 1..n in the given order and the rest follow in their current
+    # order, so a partial list never puts two games on one position. Only rows
+    # whose position actually changes are written.
+    with transaction() as con:
+        current = con.execute("SELECT id, display_order FROM games ORDER BY display_order, id").fetchall()
+        positions = dict(current)
+        listed = [game_id for game_id in dict.fromkeys(game_ids) if game_id in positions]
+        moved = set(listed)
+        order = listed + [game_id for game_id, _ in current if game_id not in moved]
+        con.executemany("UPDATE games SET display_order = ? WHERE id = ?",
+                        ((position, game_id) for position, game_id in enumerate(order, start=1)
+                         if positions[game_id] != position))
+        _trim_change_log(con)
+        _library_changed()
+
+# Changes older than the newest CHANGE_LOG_SIZE are dropped; clients that
+# resume from before that point get a reset and reload the list.
+CHANGE_LOG_SIZE = 10000
+CHANGE_BATCH_SIZE = 500
+
+def feed_revision():
+    with connection() as con:
+        row = con.execute("SELECT seq FROM sqlite_sequence WHERE name = 'changes'").fetchone()
+    return row[0] if row else 0
+
+def changes_since(revision, limit=CHANGE_BATCH_SIZE):
+    """Library changes after ``revision`` as (changes, reset).
+
+    Each change is (revision, op, game_id, row) where row is the game's
+    GAME_QUERY_COLUMNS, or None once it has been deleted. Several changes to
+    one game within the batch collapse into its latest state. ``reset`` is True
+    when ``revision`` is older than the retained log.
+    """
+    with connection() as con:
+        oldest = con.execute("SELECT MIN(revision) FROM changes").fetchone()[0]
+        if oldest is not None and revision < oldest - 1:
+            return [], True
+        log = con.execute("SELECT revision, op, game_id FROM changes WHERE revision > ? ORDER BY revision LIMIT ?",
+                          (revision, limit)).fetchall()
+        latest = {}
+        for change_revision, op, game_id in log:
+            first_op = latest[game_id][1] if game_id in latest else op
+            # insert followed by updates is still an insert for the client
+            latest[game_id] = (change_revision, "insert" if first_op == "insert" and op != "delete" else op)
+        live_ids = [game_id for game_id, (_, op) in latest.items() if op != "delete"]
+        rows = {}
+        for start in range(0, len(live_ids), DELETE_BATCH_SIZE):
+            batch = live_ids[start:start + DELETE_BATCH_SIZE]
+            for row in con.execute(f"SELECT {GAME_QUERY_COLUMNS} FROM games WHERE id IN "
+                                   f"({', '.join('?' * len(batch))})", batch):
+                rows[row[0]] = row
+    changes = []
+    for game_id, (change_revision, op) in latest.items():
+        row = rows.get(game_id)
+        changes.append((change_revision, "delete" if row is None else op, game_id, row))
+    changes.sort()
+    return changes, False
+
+def _trim_change_log(con):
+    # Called by the bulk write paths, which are the ones that grow the log quickly
+    con.execute("DELETE FROM changes WHERE revision <= (SELECT MAX(revision) FROM changes) - ?", (CHANGE_LOG_SIZE,))
+
+def _in_library(con, executable_path, source=None, external_id=None, install_location=None):
+    # Each check is a lookup on its own index; no table scan and no title matching
+    if con.execute("SELECT 1 FROM games WHERE executable_path = ? LIMIT 1", (executable_path,)).fetchone():
+        return True
+    if external_id is not None and con.execute(
+            "SELECT 1 FROM games WHERE source = ? AND external_id = ? LIMIT 1", (source, external_id)).fetchone():
+        return True
+    if install_location:
+        if con.execute("SELECT 1 FROM games WHERE install_location = ? LIMIT 1", (install_location,)).fetchone():
+            return True
+        # An executable added by a directory scan from inside the install folder
+        prefix = install_location.rstrip("\\/") + os.sep
+        upper = prefix[:-1] + chr(ord(os.sep) + 1)
+        if con.execute("SELECT 1 FROM games WHERE executable_path >= ? AND executable_path < ? LIMIT 1",
+                       (prefix, upper)).fetchone():
+            return True
+    return False
+
+def add_games_bulk(games):
+    """Insert discovered games ({"title", "url"} dicts) in a single transaction.
+
+    Store discoveries may also carry "source", "external_id" and
+    "install_location". Entries without a title or path are skipped. Games that
+    are already in the library by path, store ID or install folder (or repeated
+    within ``games``) are reported as duplicates.
+    """
+    summary = {"inserted": [], "skipped": [], "duplicates": []}
+    with transaction() as con:
+        seen = set()
+        rows = []
+        for game in games:
+            title = game.get("title")
+            executable_path = game.get("url")
+            if not title or not executable_path:
+                summary["skipped"].append(game)
+                continue
+            source = game.get("source")
+            external_id = game.get("external_id")
+            install_location = game.get("install_location")
+            keys = {("path", executable_path)}
+            if external_id is not None:
+                keys.add(("id", source, external_id))
+            if install_location:
+                keys.add(("location", install_location))
+            if not keys.isdisjoint(seen) or _in_library(con, executable_path, source, external_id, install_location):
+                summary["duplicates"].append(game)
+                continue
+            seen.update(keys)
+            inserted = {"title": title, "url": executable_path}
+            if source is not None:
+                inserted["source"] = source
+            summary["inserted"].append(inserted)
+            rows.append((title, executable_path, game.get("cover_art_path"), source, external_id, install_location))
+
+        con.executemany(f"""
+            INSERT INTO games (title, executable_path, cover_art_path, source, external_id, install_location,
+                               display_order)
+            VALUES (?, ?, ?, ?, ?, ?, {NEXT_DISPLAY_ORDER})
+        """, rows)
+        if summary["inserted"]:
+            # AUTOINCREMENT hands out consecutive IDs while this transaction
+            # holds the write lock, ending at the table's sequence value.
+            last_id = con.execute("SELECT seq FROM sqlite_sequence WHERE name = 'games'").fetchone()[0]
+            first_id = last_id - len(summary["inserted"]) + 1
+            for new_id, game in enumerate(summary["inserted"], start=first_id):
+                game["id"] = new_id
+            _trim_change_log(con)
+            _library_changed()
+    return summary
+
+def _print_scan_summary(summary, source, location):
+    if summary["inserted"]:
+        print(f"Found and added {len(summary['inserted'])} {source}(s), "
+              f"{len(summary['duplicates'])} already in library, {len(summary['skipped'])} skipped.")
+    else:
+        print(f"No new {source}s found in directory: {location}")
+    if summary.get("removed"):
+        print(f"{len(summary['removed'])} previously found {source}(s) are no longer on disk.")
+
+def _load_scan_index(con, root, signature):
+    row = con.execute("SELECT signature FROM scan_roots WHERE root = ?", (root,)).fetchone()
+    if row is None or row[0] != signature:
+        return {}
+    subdirs = {}
+    files = {}
+    dirs = con.execute("SELECT path, parent, mtime_ns FROM scan_dirs WHERE root = ?", (root,)).fetchall()
+    for path, parent, _ in dirs:
+        if parent is not None:
+            subdirs.setdefault(parent, []).append(path)
+    for path, dir, size, mtime_ns in con.execute(
+            "SELECT path, dir, size, mtime_ns FROM scan_files WHERE root = ?", (root,)):
+        files.setdefault(dir, []).append(scanner.ScannedFile(path, size, mtime_ns))
+    return {path: scanner.DirectoryRecord(mtime_ns, subdirs.get(path, []), files.get(path, []))
+            for path, _, mtime_ns in dirs}
+
+def _save_scan_index(con, root, signature, previous, current):
+    if not previous:
+        # First or forced full scan: drop anything indexed under other filters
+        con.execute("DELETE FROM scan_dirs WHERE root = ?", (root,))
+        con.execute("DELETE FROM scan_files WHERE root = ?", (root,))
+    gone = [path for path in previous if path not in current]
+    changed = [(path, record) for path, record in current.items() if previous.get(path) is not record]
+    con.executemany("DELETE FROM scan_dirs WHERE root = ? AND path = ?", ((root, path) for path in gone))
+    con.executemany("DELETE FROM scan_files WHERE root = ? AND dir = ?",
+                    ((root, path) for path in gone + [path for path, _ in changed]))
+    parents = {sub: path for path, record in current.items() for sub in record.subdirs}
+    con.executemany("INSERT OR REPLACE INTO scan_dirs (root, path, parent, mtime_ns) VALUES (?, ?, ?, ?)",
+                    ((root, path, parents.get(path), record.mtime_ns) for path, record in changed))
+    con.executemany("INSERT INTO scan_files (root, path, dir, size, mtime_ns) VALUES (?, ?, ?, ?, ?)",
+                    ((root, f.path, path, f.size, f.mtime_ns) for path, record in changed for f in record.files))
+    con.execute("INSERT OR REPLACE INTO scan_roots (root, signature) VALUES (?, ?)", (root, signature))
+
+def rescan_directory(directory, max_depth=None, full=False, progress=None):
+    """Scan ``directory`` against its persisted directory/mtime index.
+
+    Only directories whose mtime changed since the previous scan are listed
+    again. Newly found executables are added to the library; the summary also
+    lists the executables that disappeared from disk as ``removed``. ``progress``
+    is a job progress callback (see jobs.JobQueue).
+    """
+    root = os.path.abspath(directory)
+    if max_depth is None:
+        max_depth = get_config().get("scan_max_depth")
+    ignore = get_config().get("scan_ignore", scanner.DEFAULT_IGNORE_GLOBS)
+    signature = scanner.scan_signature(scanner.DEFAULT_EXTENSIONS, ignore, max_depth)
+    with connection() as con:
+        previous = {} if full else _load_scan_index(con, root, signature)
+    on_directory = None
+    if progress is not None:
+        def on_directory(directories, files):
+            progress(directories=directories, executables=files)
+    import metrics  # only the API server collects scan timings
+    started = time.perf_counter()
+    current = scanner.rescan_tree(root, previous, ignore=ignore, max_depth=max_depth,
+                                  workers=get_config().get("scan_workers", scanner.DEFAULT_WORKERS),
+                                  progress=on_directory)
+    metrics.observe_scan(len(current), sum(len(record.files) for record in current.values()),
+                         time.perf_counter() - started)
+    added, removed = scanner.diff_index(previous, current)
+    with transaction() as con:
+        _save_scan_index(con, root, signature, previous, current)
+        summary = add_games_bulk(
+            {"title": os.path.splitext(os.path.basename(f.path))[0], "url": f.path} for f in added)
+    summary["added"] = [f.path for f in added]
+    summary["removed"] = [f.path for f in removed]
+    return summary
+
+def scan_for_games(directory, full=False, progress=None):
+    summary = rescan_directory(directory, full=full, progress=progress)
+    _print_scan_summary(summary, "game", directory)
+    return summary
+
+def get_steam_path():
+    import steam  # store discovery is only needed by scans, not by the CLI menu
+    return get_config().get("steam_integration", {}).get("steam_path", "") or steam.default_steam_path()
 
 def fetch_steam_games():
-    steam_directory = config.get("steam_integration", {}).get("steam_path", "")
-    # Implement logic to fetch Steam games from the specified directory
-    return []
-
-def fetch_epic_games():
-    epic_directory = config.get("epic_integration", {}).get("epic_path", "")
-    epic_games = []
-    existing_games = {game[1] for game in get_games()}  # Use index 1 to get the title
-    non_game_exes = ["UnityCrashHandler", "Uninstall"]
-
-    for dir in os.listdir(epic_directory):
-        dir_path = os.path.join(epic_directory, dir)
-        if os.path.isdir(dir_path):
-            for sub_file in os.listdir(dir_path):
-                sub_file_path = os.path.join(dir_path, sub_file)
-                if os.path.isfile(sub_file_path) and sub_file.endswith(".exe"):
-                    title = os.path.splitext(sub_file)[0]
-                    if title not in existing_games and not any(exe in title for exe in non_game_exes):
-                        epic_games.append({"title": title, "url": sub_file_path})
-    return epic_games
-
-def scan_for_steam_games():
+    # Installed apps from every library folder's appmanifest_*.acf, launched
+    # through steam://rungameid/<appid> (see run_game)
+    import steam
+    return steam.find_installed_games(get_steam_path())
+
+def get_epic_data_path():
+    # epic_path is the launcher's data folder (the one holding
+    # EpicGamesLauncher and UnrealEngineLauncher)
+    import epic  # store discovery is only needed by scans, not by the CLI menu
+    return get_config().get("epic_integration", {}).get("epic_path", "") or epic.default_data_path()
+
+def fetch_epic_games(full=False):
+    import epic
+    import file_watch
+    data_path = get_epic_data_path()
+    if not data_path:
+        return []
+    # full drops the manifest cache so every .item file is parsed again
+    cache = file_watch.ManifestCache(epic.read_json) if full else None
+    return epic.find_installed_games(data_path, cache=cache)
+
+def scan_for_steam_games(progress=None):
     steam_games = fetch_steam_games()
-    steam_directory = config.get("steam_integration", {}).get("steam_path", "")
-    if steam_games:
-        for game in steam_games:
-            add_game_to_db(game["title"], game["url"])
-            print(f"Found and added Steam game: {game['title']}")
-    else:
-        print(f"No Steam games found in directory: {steam_directory}")
-
-def scan_for_epic_games():
-    epic_games = fetch_epic_games()
-    epic_directory = config.get("epic_integration", {}).get("epic_path", "")
-    if epic_games:
-        for game in epic_games:
-            add_game_to_db(game["title"], game["url"])
-            print(f"Found and added Epic game: {game['title']}")
-    else:
-        print(f"No Epic games found in directory: {epic_directory}")
+    if progress is not None:
+        progress(games_found=len(steam_games))
+    steam_directory = get_steam_path()
+    summary = add_games_bulk(steam_games)
+    _print_scan_summary(summary, "Steam game", steam_directory)
+    return summary
+
+def scan_for_epic_games(full=False, progress=None):
+    epic_games = fetch_epic_games(full=full)
+    if progress is not None:
+        progress(games_found=len(epic_games))
+    summary = add_games_bulk(epic_games)
+    _print_scan_summary(summary, "Epic game", get_epic_data_path())
+    return summary
+
+def summary_counts(summary):
+    return {key: len(entries) for key, entries in summary.items()}
+
+_job_queue = None
+_job_queue_lock = threading.Lock()
+
+def get_job_queue():
+    import jobs  # only the API server runs background jobs
+    global _job_queue
+    pool = get_pool()
+    with _job_queue_lock:
+        if _job_queue is None or _job_queue._pool is not pool:
+            _job_queue = jobs.JobQueue(pool, workers=get_config().get("job_workers", jobs.DEFAULT_WORKERS))
+            _job_queue.recover()
+        return _job_queue
+
+def _summary_job(scan, *args, progress, **kwargs):
+    # Job results are kept in the jobs table, so only the counts are stored
+    return summary_counts(scan(*args, progress=progress, **kwargs))
+
+def start_scan(directory, full=False):
+    """Queue a scan of ``directory`` and return (job, created) right away.
+
+    While a scan of the same root is queued or running, that job is returned
+    instead of starting another one.
+    """
+    root = os.path.abspath(directory)
+    return get_job_queue().submit("scan", os.path.normcase(root), _summary_job, scan_for_games, root, full=full)
+
+def start_steam_scan():
+    return get_job_queue().submit("scan_steam", get_steam_path(), _summary_job, scan_for_steam_games)
+
+def start_epic_scan(full=False):
+    return get_job_queue().submit("scan_epic", get_epic_data_path() or "", _summary_job, scan_for_epic_games,
+                                  full=full)
+
+def _on_config_changed(old, new):
+    # get_pool() follows db_path on the next call; make sure the new database
+    # has the schema and that caches built from the old library are dropped.
+    if old is None:
+        return
+    if _db_path(old) != _db_path(new):
+        init_db()
+        _bump_library_revision()
 
 def edit_config(new_config):
-    config_path = os.path.join(os.path.dirname(__file__), "config.json")
-    with open(config_path, "w") as config_file:
-        json.dump(new_config, config_file, indent=4)
+    config_store().replace(new_config)
     print("Configuration updated successfully.")
 
-def display_menu(stdscr):
-    curses.curs_set(0)
-    stdscr.clear()
-    stdscr.refresh()
+# Export/import (see backup.py for the format). Rows are streamed in batches
+# and the archive is written through temporary files, so memory use does not
+# grow with the library.
+EXPORT_CHUNK_SIZE = 64 * 1024
+IMPORT_BATCH_SIZE = 500
 
-    games = get_games()
-    current_row = 0
+def _export_rows(fields):
+    # Keyset batches on short-lived connections, so a slow download holds
+    # neither a pooled connection nor a read transaction between batches
+    sql = f"SELECT display_order, id, {', '.join(fields)} FROM games"
+    position = None
+    while True:
+        with connection() as con:
+            if position is None:
+                batch = con.execute(f"{sql} ORDER BY display_order, id LIMIT ?", (IMPORT_BATCH_SIZE,)).fetchall()
+            else:
+                batch = con.execute(f"{sql} WHERE display_order >= ? AND (display_order, id) > (?, ?) "
+                                    "ORDER BY display_order, id LIMIT ?",
+                                    (position[0], *position, IMPORT_BATCH_SIZE)).fetchall()
+        for row in batch:
+            yield row[2:]
+        if len(batch) < IMPORT_BATCH_SIZE:
+            return
+        position = batch[-1][:2]
+
+def iter_export_ndjson():
+    """The library as NDJSON, in bytes chunks of about EXPORT_CHUNK_SIZE."""
+    import backup
+    parts = [backup.header_line()]
+    size = 0
+    for row in _export_rows(backup.FIELDS):
+        line = backup.game_line(row)
+        parts.append(line)
+        size += len(line)
+        if size >= EXPORT_CHUNK_SIZE:
+            yield "".join(parts).encode()
+            parts, size = [], 0
+    if parts:
+        yield "".join(parts).encode()
+
+def _cover_file(name):
+    # Only files of the cover store are ever exported: a path that came from an
+    # import must not turn an export into a way to read arbitrary files
+    import backup
+    if not backup.is_cover_name(name):
+        return None
+    path = os.path.join(get_cover_store_dir(), name)
+    return path if os.path.isfile(path) else None
 
+def _export_covers():
+    seen = set()
+    last_id = 0
     while True:
-        stdscr.clear()
-        for idx, game in enumerate(games):
-            x = 0
-            y = idx
-            if idx == current_row:
-                stdscr.attron(curses.color_pair(1))
-                stdscr.addstr(y, x, f"{game[1]}")
-                stdscr.attroff(curses.color_pair(1))
+        with connection() as con:
+            batch = con.execute("SELECT id, cover_art_path FROM games WHERE id > ? AND cover_art_path IS NOT NULL "
+                                "AND cover_art_path != '' ORDER BY id LIMIT ?",
+                                (last_id, IMPORT_BATCH_SIZE)).fetchall()
+        for _, name in batch:
+            if name in seen:
+                continue
+            seen.add(name)
+            path = _cover_file(name)
+            if path:
+                yield os.path.basename(name), path
+        if len(batch) < IMPORT_BATCH_SIZE:
+            return
+        last_id = batch[-1][0]
+
+def export_library(fileobj, covers=False, compress=True):
+    """Write the library to a binary file: NDJSON, or with ``covers`` a tar
+    archive (gzip'd unless ``compress`` is False) that also holds the covers."""
+    if not covers:
+        for chunk in iter_export_ndjson():
+            fileobj.write(chunk)
+        return
+    import backup
+    backup.write_archive(fileobj, _export_covers(), export_library, compress=compress)
+
+def iter_export_archive(compress=True):
+    """export_library(covers=True) as an iterator of bytes chunks."""
+    import backup
+    return backup.iter_written(lambda fileobj: export_library(fileobj, covers=True, compress=compress))
+
+def _import_batch(con, games, summary):
+    paths = list({game["executable_path"] for game in games})
+    existing = {path: game_id for game_id, path in con.execute(
+        f"SELECT id, executable_path FROM games WHERE executable_path IN ({', '.join('?' * len(paths))})", paths)}
+    for game in games:
+        game_id = existing.get(game["executable_path"])
+        if game_id is None:
+            existing[game["executable_path"]] = con.execute(f"""
+                INSERT INTO games (title, executable_path, cover_art_path, background, added_date, source,
+                                   external_id, install_location, playtime, launch_count, last_played,
+                                   display_order)
+                VALUES (:title, :executable_path, :cover_art_path, :background,
+                        coalesce(:added_date, CURRENT_TIMESTAMP), :source, :external_id, :install_location,
+                        coalesce(:playtime, 0), coalesce(:launch_count, 0), coalesce(:last_played, 0),
+                        {NEXT_DISPLAY_ORDER})
+            """, game).lastrowid
+            summary["inserted"] += 1
+        else:
+            # Play stats keep the higher value, so importing the same export
+            # twice (or into the library it came from) changes nothing. Rows
+            # that would not change are not written at all, which also keeps
+            # them out of the search index and change log triggers.
+            params = dict(game, id=game_id)
+            updated = con.execute("""
+                UPDATE games SET title = :title, cover_art_path = coalesce(:cover_art_path, cover_art_path),
+                    background = coalesce(:background, background), source = coalesce(:source, source),
+                    external_id = coalesce(:external_id, external_id),
+                    install_location = coalesce(:install_location, install_location),
+                    playtime = max(playtime, coalesce(:playtime, 0)),
+                    launch_count = max(launch_count, coalesce(:launch_count, 0)),
+                    last_played = max(last_played, coalesce(:last_played, 0))
+                WHERE id = :id AND (
+                    title IS NOT :title
+                    OR coalesce(:cover_art_path, cover_art_path) IS NOT cover_art_path
+                    OR coalesce(:background, background) IS NOT background
+                    OR coalesce(:source, source) IS NOT source
+                    OR coalesce(:external_id, external_id) IS NOT external_id
+                    OR coalesce(:install_location, install_location) IS NOT install_location
+                    OR coalesce(:playtime, 0) > playtime
+                    OR coalesce(:launch_count, 0) > launch_count
+                    OR coalesce(:last_played, 0) > last_played)
+            """, params).rowcount
+            summary["updated" if updated else "unchanged"] += 1
+
+def _import_games(fileobj, cover_name=None):
+    import tempfile
+    import backup
+    summary = {"inserted": 0, "updated": 0, "unchanged": 0, "skipped": 0, "errors": []}
+    # The upload is read and validated into a temporary file before the write
+    # transaction opens, so the library is never locked for as long as a slow
+    # client takes to send it, and a bad header fails without locking it at all
+    with tempfile.TemporaryFile("w+", encoding="utf-8") as spool:
+        for _, game, error in backup.read_games(fileobj):
+            if error:
+                summary["skipped"] += 1
+                if len(summary["errors"]) < backup.MAX_REPORTED_ERRORS:
+                    summary["errors"].append(error)
+                continue
+            if cover_name is not None and game["cover_art_path"]:
+                game["cover_art_path"] = cover_name(game["cover_art_path"])
+            spool.write(json.dumps(game) + "\n")
+        spool.seek(0)
+        with transaction() as con:
+            batch = []
+            for line in spool:
+                batch.append(json.loads(line))
+                if len(batch) >= IMPORT_BATCH_SIZE:
+                    _import_batch(con, batch, summary)
+                    batch = []
+            if batch:
+                _import_batch(con, batch, summary)
+            if summary["inserted"] or summary["updated"]:
+                _trim_change_log(con)
+                _library_changed()
+    return summary
+
+def import_library(fileobj):
+    """Import an export_library NDJSON file or archive from a binary stream.
+
+    Games are matched on executable path: known ones are updated, the others
+    added, all in one transaction that opens once the whole input has been
+    read and validated. Covers from an archive go to the cover store first.
+    Returns a summary dict.
+    """
+    import io
+    import backup
+    stream = fileobj if hasattr(fileobj, "peek") else io.BufferedReader(fileobj)
+    if not backup.is_archive(stream.peek(512)):
+        summary = _import_games(stream)
+    else:
+        store_dir = get_cover_store_dir()
+        # Archive names that the store saved under a different (content hash) name
+        renamed = {}
+        covers = []
+
+        def store(path, arcname):
+            stored = cover_art.store_cover(path, store_dir)
+            if stored != arcname:
+                renamed[arcname] = stored
+            covers.append(None)
+
+        def cover_name(name):
+            base = os.path.basename(name)
+            if base in renamed:
+                return renamed[base]
+            return base if os.path.isfile(os.path.join(store_dir, base)) else name
+
+        summary = backup.read_archive(stream, store, lambda library: _import_games(library, cover_name))
+        summary["covers"] = len(covers)
+    print(f"Imported library: {summary['inserted']} added, {summary['updated']} updated, "
+          f"{summary['unchanged']} unchanged, {summary['skipped']} skipped.")
+    return summary
+
+CATALOG_COLUMNS = "id, title, executable_path, cover_art_path, source, external_id, install_location"
+
+def _normalize_path(path):
+    # Store URLs are kept as they are; file paths compare the way the OS does
+    if LAUNCH_URL.match(path):
+        return path
+    return os.path.normcase(os.path.normpath(path))
+
+def _normalize_title(title):
+    # "DOOM Eternal™" and "Doom: Eternal" share a key
+    return " ".join(re.findall(r"\w+", title.casefold()))
+
+class CatalogGame:
+    __slots__ = ("id", "title", "executable_path", "cover_art_path", "source", "external_id", "install_location")
+
+    def __init__(self, row):
+        (self.id, self.title, self.executable_path, self.cover_art_path,
+         self.source, self.external_id, self.install_location) = row
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+class GameManager:
+    """The library as an in-memory catalog, indexed by ID, normalized
+    executable path and normalized title.
+
+    Writes made through the catalog go to SQLite first and are applied to the
+    catalog once committed. Writes made anywhere else (the module functions,
+    other server processes) are read from the change log the next time the
+    catalog is used after library_revision() has moved on; while it has not,
+    lookups are dictionary hits and issue no query.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._by_id = {}
+        self._by_path = {}
+        self._by_title = {}
+        self._db_path = None
+        self._revision = None
+        self._feed_revision = None
+
+    def _index(self, key, index, game_id):
+        index.setdefault(key, set()).add(game_id)
+
+    def _unindex(self, key, index, game_id):
+        ids = index.get(key)
+        if ids is not None:
+            ids.discard(game_id)
+            if not ids:
+                del index[key]
+
+    def _put(self, row):
+        game = CatalogGame(row)
+        self._remove(game.id)
+        self._by_id[game.id] = game
+        self._index(_normalize_path(game.executable_path), self._by_path, game.id)
+        self._index(_normalize_title(game.title), self._by_title, game.id)
+        return game
+
+    def _remove(self, game_id):
+        game = self._by_id.pop(game_id, None)
+        if game is not None:
+            self._unindex(_normalize_path(game.executable_path), self._by_path, game_id)
+            self._unindex(_normalize_title(game.title), self._by_title, game_id)
+
+    def _load(self, con):
+        self._by_id, self._by_path, self._by_title = {}, {}, {}
+        # Position first: anything written while the rows are read is replayed
+        # (idempotently) from the change log by the next sync
+        row = con.execute("SELECT seq FROM sqlite_sequence WHERE name = 'changes'").fetchone()
+        self._feed_revision = row[0] if row else 0
+        for row in con.execute(f"SELECT {CATALOG_COLUMNS} FROM games ORDER BY id"):
+            self._put(row)
+
+    def _apply_changes(self, con):
+        oldest = con.execute("SELECT MIN(revision) FROM changes").fetchone()[0]
+        if oldest is not None and self._feed_revision < oldest - 1:
+            self._load(con)  # trimmed past our position
+            return
+        changed = {}
+        for revision, game_id in con.execute("SELECT revision, game_id FROM changes WHERE revision > ?",
+                                             (self._feed_revision,)):
+            changed[game_id] = revision
+        if not changed:
+            return
+        ids = list(changed)
+        rows = {}
+        for start in range(0, len(ids), DELETE_BATCH_SIZE):
+            batch = ids[start:start + DELETE_BATCH_SIZE]
+            for row in con.execute(f"SELECT {CATALOG_COLUMNS} FROM games WHERE id IN "
+                                   f"({', '.join('?' * len(batch))})", batch):
+                rows[row[0]] = row
+        for game_id in ids:
+            if game_id in rows:
+                self._put(rows[game_id])
             else:
-                stdscr.addstr(y, x, f"{game[1]}")
-        stdscr.refresh()
+                self._remove(game_id)
+        self._feed_revision = max(self._feed_revision, max(changed.values()))
 
-        key = stdscr.getch()
+    def _sync(self):
+        revision = library_revision()
+        db_path = get_db_path()
+        if revision == self._revision and db_path == self._db_path:
+            return
+        with self._lock:
+            if revision == self._revision and db_path == self._db_path:
+                return
+            with connection() as con:
+                if db_path != self._db_path or self._feed_revision is None:
+                    self._load(con)
+                else:
+                    self._apply_changes(con)
+            self._db_path = db_path
+            self._revision = revision
 
-        if key == curses.KEY_UP and current_row > 0:
-            current_row -= 1
-        elif key == curses.KEY_DOWN and current_row < len(games) - 1:
-            current_row += 1
-        elif key == curses.KEY_ENTER or key in [10, 13]:
-            run_game(games[current_row][0])
-            break
+    def get(self, game_id):
+        self._sync()
+        game = self._by_id.get(game_id)
+        return game.to_dict() if game else None
+
+    def get_all_games(self):
+        self._sync()
+        with self._lock:
+            return [game.to_dict() for game in self._by_id.values()]
+
+    def find_by_path(self, executable_path):
+        """Games whose executable path is ``executable_path`` once normalized."""
+        self._sync()
+        with self._lock:
+            return [self._by_id[game_id].to_dict()
+                    for game_id in sorted(self._by_path.get(_normalize_path(executable_path), ()))]
+
+    def find_by_title(self, title):
+        """Games whose title matches ``title`` ignoring case and punctuation."""
+        self._sync()
+        with self._lock:
+            return [self._by_id[game_id].to_dict()
+                    for game_id in sorted(self._by_title.get(_normalize_title(title), ()))]
+
+    def contains_path(self, executable_path):
+        self._sync()
+        return _normalize_path(executable_path) in self._by_path
+
+    def contains_title(self, title):
+        self._sync()
+        return _normalize_title(title) in self._by_title
+
+    def _read_row(self, con, game_id):
+        return con.execute(f"SELECT {CATALOG_COLUMNS} FROM games WHERE id = ?", (game_id,)).fetchone()
+
+    def add_game(self, title, executable_path, cover_art_path=None):
+        """Add a game unless one with the same executable path exists; returns
+        (game dict, created), with the existing game when nothing was added."""
+        if cover_art_path:
+            cover_art_path = cover_art.store_cover(cover_art_path, get_cover_store_dir())
+        self._sync()
+        with self._lock:
+            with transaction() as con:
+                # With the write lock held the change log is complete, so this
+                # also sees writes whose revision bump has not landed yet
+                self._apply_changes(con)
+                existing = self._by_path.get(_normalize_path(executable_path))
+                if existing:
+                    return self._by_id[min(existing)].to_dict(), False
+                game_id = con.execute("INSERT INTO games (title, executable_path, cover_art_path, display_order) "
+                                      f"VALUES (?, ?, ?, {NEXT_DISPLAY_ORDER})",
+                                      (title, executable_path, cover_art_path)).lastrowid
+                row = self._read_row(con, game_id)
+                _library_changed()
+            return self._put(row).to_dict(), True
+
+    def update_game(self, game_id, title=None, executable_path=None, cover_art_path=None):
+        """Update the given fields; returns the updated dict, or None if there is no such game."""
+        if cover_art_path:
+            cover_art_path = cover_art.store_cover(cover_art_path, get_cover_store_dir())
+        updates = _game_updates(title, executable_path, cover_art_path)
+        self._sync()
+        with self._lock:
+            with transaction() as con:
+                if updates and not _update_game(con, game_id, updates):
+                    return None
+                row = self._read_row(con, game_id)
+                if updates:
+                    _library_changed()
+            if row is None:
+                return None
+            return self._put(row).to_dict()
+
+    def delete_game(self, game_id):
+        """Delete a game; returns False if there was no such game."""
+        self._sync()
+        with self._lock:
+            with transaction() as con:
+                deleted = con.execute("DELETE FROM games WHERE id = ?", (game_id,)).rowcount > 0
+                if deleted:
+                    _library_changed()
+            self._remove(game_id)
+        return deleted
+
+    def launch_game(self, game_id):
+        """Launch a game; returns its session dict, or None if it could not be started."""
+        self._sync()
+        if game_id not in self._by_id:
+            return None
+        return run_game(game_id)
+
+def display_menu(stdscr):
+    """Interactive game picker (see tui.Browser); returns the chosen game ID or None."""
+    import tui
+    return tui.browse(stdscr, [(game[0], game[1]) for game in iter_games(sort="display_order")])
 
 def simple_menu():
     while True:
@@ -322,11 +1479,12 @@ def simple_menu():
             print("\nOptions")
             print("1. Edit DB path")
             print("2. Edit Steam games path")
-            print("3. Edit Epic Games path")
+            print("3. Edit Epic Games launcher data path")
             print("4. Edit scan directory")
             print("0. Back")
             
             config_choice = input("Select an option: ").strip()
+            config = copy.deepcopy(get_config())
             
             if config_choice == '1':
                 new_db_path = input("Enter new DB path: ").strip()
@@ -337,7 +1495,7 @@ def simple_menu():
                 config["steam_integration"]["steam_path"] = new_steam_path
                 edit_config(config)
             elif config_choice == '3':
-                new_epic_path = input("Enter new Epic Games path: ").strip()
+                new_epic_path = input("Enter new Epic Games launcher data path (e.g. C:\\ProgramData\\Epic): ").strip()
                 config["epic_integration"]["epic_path"] = new_epic_path
                 edit_config(config)
             elif config_choice == '4':
@@ -356,22 +1514,56 @@ def simple_menu():
             print("Invalid choice. Please try again.")
 
 def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Game Launcher. Without a command the interactive menu starts.")
+    commands = parser.add_subparsers(dest="command")
+    export_parser = commands.add_parser("export", help="write the library as NDJSON, or an archive with --covers")
+    export_parser.add_argument("output", nargs="?", default="-", help="file to write (default: stdout)")
+    export_parser.add_argument("--covers", action="store_true", help="bundle cover art into a tar archive")
+    export_parser.add_argument("--no-compress", action="store_true", help="don't gzip the --covers archive")
+    import_parser = commands.add_parser("import", help="merge an exported NDJSON file or archive into the library")
+    import_parser.add_argument("input", nargs="?", default="-", help="file to read (default: stdin)")
+    args = parser.parse_args()
+
     # Ensure the required directory exists
-    user_home = os.path.expanduser("~")
-    required_directory = os.path.join(user_home, "AppData", "Roaming", "sagrusea", "game-launcher")
+    required_directory = app_data_dir()
     if not os.path.exists(required_directory):
         os.makedirs(required_directory)
-        print(f"Created directory: {required_directory}")
+        print(f"Created directory: {required_directory}", file=sys.stderr if args.command else sys.stdout)
 
     init_db()
-    if CURSES_AVAILABLE:
-        curses.wrapper(display_menu)
-    else:
+    if args.command == "export":
+        if args.output == "-":
+            export_library(sys.stdout.buffer, covers=args.covers, compress=not args.no_compress)
+        else:
+            with open(args.output, "wb") as f:
+                export_library(f, covers=args.covers, compress=not args.no_compress)
+            print(f"Library exported to {args.output}.")
+        return
+    if args.command == "import":
+        if args.input == "-":
+            summary = import_library(sys.stdin.buffer)
+        else:
+            with open(args.input, "rb") as f:
+                summary = import_library(f)
+        for error in summary["errors"]:
+            print(error)
+        return
+
+    # curses is only needed by the interactive menu, so it is imported here
+    try:
+        import curses
+    except ImportError:
         simple_menu()
+    else:
+        game_id = curses.wrapper(display_menu)
+        # Launched once curses has restored the terminal, so its output is readable
+        if game_id is not None:
+            run_game(game_id)
 
     # Wait for user input before closing
     input("Press Enter to exit...")
 
 # Example usage
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,274 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+JOB_COLUMNS = "id, kind, key, status, progress, result, error, created_at, started_at, ended_at"
+ACTIVE_STATUSES = ("queued", "running")
+DEFAULT_WORKERS = 2
+# Progress lives in memory while a job runs and is written to the jobs table at
+# most this often, so other server processes can follow it too.
+PROGRESS_WRITE_INTERVAL = 1.0
+# While a server process has queued or running jobs it stamps their rows this
+# often; another process treats a job as abandoned once its stamp is older
+# than HEARTBEAT_TIMEOUT, whatever has become of the PID that ran it.
+HEARTBEAT_INTERVAL = 5.0
+HEARTBEAT_TIMEOUT = 30.0
+
+
+def job_to_dict(row):
+    job_id, kind, key, status, progress, result, error, created_at, started_at, ended_at = row
+    return {
+        "id": job_id,
+        "kind": kind,
+        "key": key,
+        "status": status,
+        "progress": json.loads(progress) if progress else {},
+        "result": json.loads(result) if result else None,
+        "error": error,
+        "created_at": created_at,
+        "started_at": started_at,
+        "ended_at": ended_at,
+    }
+
+
+def _record_end(con, job, status, result, error, ended_at):
+    con.execute("UPDATE jobs SET status = ?, progress = ?, result = ?, error = ?, ended_at = ? WHERE id = ?",
+                (status, json.dumps(job.progress), json.dumps(result) if result is not None else None,
+                 error, ended_at, job.id))
+
+
+class _Job:
+    __slots__ = ("id", "kind", "key", "status", "progress", "result", "error", "created_at", "started_at",
+                 "ended_at", "written_at")
+
+    def __init__(self, job_id, kind, key, created_at):
+        self.id = job_id
+        self.kind = kind
+        self.key = key
+        self.status = "queued"
+        self.progress = {}
+        self.result = None
+        self.error = None
+        self.created_at = created_at
+        self.started_at = None
+        self.ended_at = None
+        self.written_at = 0.0
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "key": self.key,
+            "status": self.status,
+            "progress": dict(self.progress),
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "ended_at": self.ended_at,
+        }
+
+
+class JobQueue:
+    """Runs long operations on a bounded thread pool, one jobs row per run.
+
+    ``submit`` returns immediately. A job with the same (kind, key) that is
+    still queued or running, here or in another live server process, is
+    returned instead of starting a second one. The job function is called with
+    a ``progress`` keyword, a callable taking counters to publish; its return
+    value must be JSON serializable and becomes the job's result.
+    """
+
+    def __init__(self, pool, workers=DEFAULT_WORKERS):
+        self._pool = pool
+        self.workers = max(1, int(workers))
+        # Tells this queue's rows apart from those of other (or earlier) server processes
+        self.instance = uuid.uuid4().hex
+        self._executor = None
+        self._heartbeat = None
+        self._active = {}
+        self._by_key = {}
+        self._started_here = set()
+        # Finished jobs whose final state could not be written yet
+        self._unrecorded = {}
+        self._cond = threading.Condition()
+
+    def _get_executor(self):
+        # Imported here so that importing this module stays cheap for the CLI
+        from concurrent.futures import ThreadPoolExecutor
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="job")
+        return self._executor
+
+    def _owned_elsewhere(self, instance, heartbeat):
+        # Whether another live server process is running the job
+        return (instance is not None and instance != self.instance and heartbeat is not None
+                and heartbeat >= time.time() - HEARTBEAT_TIMEOUT)
+
+    def _beat(self):
+        try:
+            while True:
+                try:
+                    with self._pool.transaction() as con:
+                        con.execute("UPDATE jobs SET heartbeat = ? WHERE instance = ? "
+                                    "AND status IN ('queued', 'running')", (time.time(), self.instance))
+                except sqlite3.Error:
+                    pass  # e.g. "database is locked"; the stamp has HEARTBEAT_TIMEOUT to spare
+                with self._cond:
+                    if self._cond.wait_for(lambda: not self._active, HEARTBEAT_INTERVAL):
+                        self._heartbeat = None
+                        return
+        finally:
+            # Lets the next submit() start a new thread, however this one ended
+            with self._cond:
+                if self._heartbeat is threading.current_thread():
+                    self._heartbeat = None
+
+    def _record_unrecorded(self, con):
+        # Retries the final writes _run could not make; called under self._cond
+        # inside a transaction, and forgets the jobs once it has committed
+        jobs = list(self._unrecorded.values())
+        for job in jobs:
+            _record_end(con, job, job.status, job.result, job.error, job.ended_at)
+
+        def recorded():
+            with self._cond:
+                for job in jobs:
+                    self._unrecorded.pop(job.id, None)
+        self._pool.after_commit(recorded)
+
+    def recover(self):
+        """Mark jobs whose server process is gone as interrupted."""
+        with self._cond, self._pool.transaction() as con:
+            self._record_unrecorded(con)
+            rows = con.execute("SELECT id, instance, heartbeat FROM jobs WHERE status IN ('queued', 'running')").fetchall()
+            dead = [job_id for job_id, instance, heartbeat in rows
+                    if job_id not in self._active and job_id not in self._unrecorded and not self._owned_elsewhere(instance, heartbeat)]
+            con.executemany("UPDATE jobs SET status = 'interrupted', ended_at = ? WHERE id = ?",
+                            ((time.time(), job_id) for job_id in dead))
+        return len(dead)
+
+    def submit(self, kind, key, fn, *args, **kwargs):
+        """Queue ``fn(*args, progress=..., **kwargs)``; returns (job dict, created)."""
+        with self._cond:
+            job = self._by_key.get((kind, key))
+            if job is not None:
+                return job.to_dict(), False
+            with self._pool.transaction() as con:
+                self._record_unrecorded(con)
+                rows = con.execute(f"SELECT {JOB_COLUMNS}, instance, heartbeat FROM jobs WHERE kind = ? AND key = ? "
+                                   "AND status IN ('queued', 'running')", (kind, key)).fetchall()
+                for row in rows:
+                    if self._owned_elsewhere(*row[-2:]):
+                        return job_to_dict(row[:-2]), False
+                created_at = time.time()
+                # Whoever ran these is gone; don't leave them active forever
+                con.executemany("UPDATE jobs SET status = 'interrupted', ended_at = ? WHERE id = ?",
+                                ((created_at, row[0]) for row in rows))
+                job_id = con.execute(
+                    "INSERT INTO jobs (kind, key, status, pid, instance, heartbeat, created_at) "
+                    "VALUES (?, ?, 'queued', ?, ?, ?, ?)",
+                    (kind, key, os.getpid(), self.instance, created_at, created_at)).lastrowid
+            job = _Job(job_id, kind, key, created_at)
+            self._active[job_id] = job
+            self._by_key[(kind, key)] = job
+            self._started_here.add(job_id)
+            if self._heartbeat is None:
+                self._heartbeat = threading.Thread(target=self._beat, name="job-heartbeat", daemon=True)
+                self._heartbeat.start()
+        self._get_executor().submit(self._run, job, fn, args, kwargs)
+        return job.to_dict(), True
+
+    def _run(self, job, fn, args, kwargs):
+        with self._cond:
+            job.status = "running"
+            job.started_at = time.time()
+            self._cond.notify_all()
+        result, status, error, ended_at, recorded = None, "failed", None, None, False
+        try:
+            try:
+                with self._pool.transaction() as con:
+                    con.execute("UPDATE jobs SET status = 'running', started_at = ? WHERE id = ?",
+                                (job.started_at, job.id))
+                result = fn(*args, progress=self._reporter(job), **kwargs)
+                status = "done"
+            except Exception as e:
+                result, status, error = None, "failed", str(e)
+            ended_at = time.time()
+            try:
+                with self._pool.transaction() as con:
+                    _record_end(con, job, status, result, error, ended_at)
+                recorded = True
+            except sqlite3.Error as e:
+                result, status, error = None, "failed", f"Could not record the job's result: {e}"
+        finally:
+            # Whatever happened, the job is over here: later submits must not
+            # coalesce onto it and waiters must wake up. A job whose row still
+            # says running is served from memory until submit() or recover()
+            # manage to write it.
+            with self._cond:
+                job.status, job.result, job.error, job.ended_at = status, result, error, ended_at or time.time()
+                self._active.pop(job.id, None)
+                self._by_key.pop((job.kind, job.key), None)
+                if not recorded:
+                    self._unrecorded[job.id] = job
+                self._cond.notify_all()
+
+    def _reporter(self, job):
+        def progress(**counters):
+            now = time.monotonic()
+            with self._cond:
+                job.progress.update(counters)
+                self._cond.notify_all()
+                write = now - job.written_at >= PROGRESS_WRITE_INTERVAL
+                if write:
+                    job.written_at = now
+                    snapshot = json.dumps(job.progress)
+            if write:
+                with self._pool.transaction() as con:
+                    con.execute("UPDATE jobs SET progress = ? WHERE id = ?", (snapshot, job.id))
+        return progress
+
+    def get(self, job_id):
+        with self._cond:
+            job = self._active.get(job_id) or self._unrecorded.get(job_id)
+            if job is not None:
+                return job.to_dict()
+        with self._pool.connection() as con:
+            row = con.execute(f"SELECT {JOB_COLUMNS} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return job_to_dict(row) if row else None
+
+    def list(self, limit=50):
+        with self._pool.connection() as con:
+            rows = con.execute(f"SELECT {JOB_COLUMNS} FROM jobs ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+        jobs = [job_to_dict(row) for row in rows]
+        with self._cond:
+            # Running jobs report their live progress rather than the last write
+            live = {**self._unrecorded, **self._active}
+            return [live[job["id"]].to_dict() if job["id"] in live else job for job in jobs]
+
+    def wait(self, job_id, previous=None, timeout=None):
+        """Block until the job's dict differs from ``previous`` or ``timeout`` passes.
+
+        Jobs of this process wake the caller as soon as they change; jobs of
+        another process are re-read from the table every PROGRESS_WRITE_INTERVAL.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            job = self.get(job_id)
+            if job is None or job != previous:
+                return job
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return job
+            with self._cond:
+                local = self._active.get(job_id)
+                if local is not None:
+                    self._cond.wait_for(lambda: local.to_dict() != previous, remaining)
+                    continue
+                if job_id in self._started_here:
+                    continue  # finished since get(); the table now has the final state
+            time.sleep(PROGRESS_WRITE_INTERVAL if remaining is None else min(remaining, PROGRESS_WRITE_INTERVAL))
@@ -0,0 +1,185 @@
+import functools
+import threading
+import time
+import types
+
+# Upper bounds in seconds; chosen for a local API whose requests mostly take
+# between a fraction of a millisecond and a few hundred milliseconds.
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs.extend(f'{name}="{value}"' for name, value in extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(labels.get(name, "") for name in self.labelnames)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+            lines.extend(self._render_items(items))
+        return lines
+
+    def _render_items(self, items):
+        return [f"{self.name}{_labels(self.labelnames, key)} {_number(value)}" for key, value in items]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0, 0.0]
+            counts = state[0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+                    break
+            state[1] += 1
+            state[2] += value
+
+    def _render_items(self, items):
+        lines = []
+        for key, (counts, count, total) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, [('le', bound)])} {cumulative}")
+            lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, [('le', '+Inf')])} {count}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        """The metrics in the Prometheus text exposition format."""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+http_request_seconds = REGISTRY.register(Histogram(
+    "gamelauncher_http_request_duration_seconds",
+    "Time until the response was handed to the server (first byte for streamed responses)",
+    ("method", "endpoint", "status")))
+db_statements = REGISTRY.register(Counter(
+    "gamelauncher_db_statements_total", "SQL statements executed, including BEGIN/COMMIT"))
+function_seconds = REGISTRY.register(Histogram(
+    "gamelauncher_function_duration_seconds", "Time spent in instrumented game_manager functions", ("function",)))
+scan_directories = REGISTRY.register(Counter(
+    "gamelauncher_scan_directories_total", "Directories visited by directory scans"))
+scan_files = REGISTRY.register(Counter(
+    "gamelauncher_scan_files_total", "Matching files found by directory scans"))
+scan_seconds = REGISTRY.register(Counter(
+    "gamelauncher_scan_seconds_total", "Wall time spent walking directories"))
+last_scan_rate = REGISTRY.register(Gauge(
+    "gamelauncher_last_scan_per_second", "Throughput of the most recent directory scan", ("unit",)))
+
+
+def count_statement(statement):
+    # sqlite3 trace callback (see database.ConnectionPool)
+    db_statements.inc()
+
+
+def observe_scan(directories, files, seconds):
+    scan_directories.inc(directories)
+    scan_files.inc(files)
+    scan_seconds.inc(seconds)
+    if seconds > 0:
+        last_scan_rate.set(directories / seconds, unit="directories")
+        last_scan_rate.set(files / seconds, unit="files")
+
+
+def _timed_generator(generator, name, started):
+    try:
+        yield from generator
+    finally:
+        function_seconds.observe(time.perf_counter() - started, function=name)
+
+
+def timed(fn, name=None):
+    """Wrap ``fn`` so each call is recorded in function_seconds. When it returns
+    a generator, the time until the generator is exhausted or closed counts."""
+    name = name or fn.__name__
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        result = fn(*args, **kwargs)
+        if isinstance(result, types.GeneratorType):
+            return _timed_generator(result, name, started)
+        function_seconds.observe(time.perf_counter() - started, function=name)
+        return result
+
+    wrapper.__timed__ = True
+    return wrapper
+
+
+def instrument(module, exclude=()):
+    """Replace the public functions defined in ``module`` with timed wrappers.
+
+    Calls between the module's own functions go through the module globals, so
+    they are timed as well. Running it twice does not wrap twice.
+    """
+    for name, value in list(vars(module).items()):
+        if (name.startswith("_") or name in exclude or not isinstance(value, types.FunctionType)
+                or value.__module__ != module.__name__ or getattr(value, "__timed__", False)):
+            continue
+        setattr(module, name, timed(value, name))
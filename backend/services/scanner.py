@@ -0,0 +1,150 @@
+import fnmatch
+import json
+import os
+import queue
+import re
+import time
+from collections import namedtuple
+
+# Matched case-insensitively against every file and directory name; a matching
+# directory is pruned together with everything below it.
+DEFAULT_IGNORE_GLOBS = ("_CommonRedist", "Uninstall*", "UnityCrashHandler*")
+DEFAULT_EXTENSIONS = (".exe",)
+DEFAULT_WORKERS = 8
+RACY_MTIME_WINDOW_NS = 2_000_000_000  # FAT/exFAT timestamps have 2 second resolution
+
+ScannedFile = namedtuple("ScannedFile", ["path", "size", "mtime_ns"])
+DirectoryRecord = namedtuple("DirectoryRecord", ["mtime_ns", "subdirs", "files"])
+
+
+def compile_ignore(globs):
+    if not globs:
+        return lambda name: False
+    pattern = re.compile("|".join(fnmatch.translate(glob.lower()) for glob in globs))
+    return lambda name: pattern.match(name.lower()) is not None
+
+
+def list_directory(path, extensions=DEFAULT_EXTENSIONS, is_ignored=compile_ignore(DEFAULT_IGNORE_GLOBS)):
+    """Read one directory with a single scandir call.
+
+    Returns the matching files and the subdirectories to descend into. Symlinked
+    directories are not followed, and unreadable entries are skipped.
+    """
+    files = []
+    subdirs = []
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if is_ignored(entry.name):
+                    continue
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                    elif entry.name.lower().endswith(extensions) and entry.is_file():
+                        stat = entry.stat()
+                        files.append(ScannedFile(entry.path, stat.st_size, stat.st_mtime_ns))
+                except OSError:
+                    continue
+    except OSError:
+        pass
+    return files, subdirs
+
+
+def _traverse(root, read_directory, max_depth, workers):
+    # read_directory(path) -> (payload, subdirs). Yields (path, payload) for
+    # every directory visited, in completion order.
+    from concurrent.futures import ThreadPoolExecutor  # deferred: costly to import, only needed to scan
+    results = queue.SimpleQueue()
+    pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="scanner")
+
+    def submit(path, depth):
+        future = pool.submit(read_directory, path)
+        future.add_done_callback(lambda f: results.put((path, f, depth)))
+
+    try:
+        submit(root, 0)
+        outstanding = 1
+        while outstanding:
+            path, future, depth = results.get()
+            outstanding -= 1
+            payload, subdirs = future.result()
+            if max_depth is None or depth < max_depth:
+                for subdir in subdirs:
+                    submit(subdir, depth + 1)
+                    outstanding += 1
+            yield path, payload
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def scan_tree(root, extensions=DEFAULT_EXTENSIONS, ignore=DEFAULT_IGNORE_GLOBS, max_depth=None,
+              workers=DEFAULT_WORKERS):
+    """Stream every matching file below ``root``, visiting each directory once.
+
+    Directories are listed concurrently on a thread pool and files are yielded
+    as soon as their directory has been read. ``max_depth`` limits how far below
+    ``root`` (depth 0) the scan descends.
+    """
+    extensions = tuple(ext.lower() for ext in extensions)
+    is_ignored = compile_ignore(ignore)
+
+    def read_directory(path):
+        return list_directory(path, extensions, is_ignored)
+
+    for _, files in _traverse(root, read_directory, max_depth, workers):
+        yield from files
+
+
+def scan_signature(extensions, ignore, max_depth):
+    # Cached listings are only valid for the filters they were produced with.
+    return json.dumps([sorted(ext.lower() for ext in extensions), sorted(ignore or ()), max_depth])
+
+
+def rescan_tree(root, previous, extensions=DEFAULT_EXTENSIONS, ignore=DEFAULT_IGNORE_GLOBS, max_depth=None,
+                workers=DEFAULT_WORKERS, progress=None):
+    """Walk ``root`` again, re-listing only directories whose mtime changed.
+
+    ``previous`` maps directory paths to the DirectoryRecord from the last scan.
+    Unchanged directories cost a single stat: their files and subdirectories are
+    taken from the record. Returns the new {path: DirectoryRecord} index; records
+    that were reused are the same objects as in ``previous``. ``progress`` is
+    called with the running (directories, files) counts after each directory.
+    """
+    extensions = tuple(ext.lower() for ext in extensions)
+    is_ignored = compile_ignore(ignore)
+    # Directories modified this close to the scan may change again within the
+    # same mtime tick, so they are stored as "always re-list" (mtime -1).
+    racy_after = time.time_ns() - RACY_MTIME_WINDOW_NS
+
+    def read_directory(path):
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except OSError:
+            return None, []
+        record = previous.get(path)
+        if record is not None and record.mtime_ns == mtime_ns:
+            return record, record.subdirs
+        files, subdirs = list_directory(path, extensions, is_ignored)
+        if mtime_ns >= racy_after:
+            mtime_ns = -1
+        return DirectoryRecord(mtime_ns, subdirs, files), subdirs
+
+    index = {}
+    files = 0
+    for path, record in _traverse(root, read_directory, max_depth, workers):
+        if record is None:
+            continue
+        index[path] = record
+        files += len(record.files)
+        if progress is not None:
+            progress(len(index), files)
+    return index
+
+
+def diff_index(previous, current):
+    """Return (added, removed) ScannedFile lists between two directory indexes."""
+    old_files = {f.path: f for record in previous.values() for f in record.files}
+    new_files = {f.path: f for record in current.values() for f in record.files}
+    added = [f for path, f in new_files.items() if path not in old_files]
+    removed = [f for path, f in old_files.items() if path not in new_files]
+    return added, removed
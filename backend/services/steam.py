@@ -0,0 +1,185 @@
+import os
+import re
+import sys
+
+import file_watch
+
+# One VDF token per match: a quoted string, a brace, a // comment, a
+# [$PLATFORM] conditional or a bare word. Comments and conditionals are dropped.
+TOKEN = re.compile(r'"((?:[^"\\]|\\.)*)"|([{}])|//[^\n]*|\[[^\]]*\]|([^\s{}"\[]+)')
+ESCAPES = {"n": "\n", "t": "\t", "\\": "\\", '"': '"'}
+OPEN = object()
+CLOSE = object()
+
+# Installed "apps" that are runtimes and redistributables, not games
+NON_GAME_APPIDS = {
+    "228980",   # Steamworks Common Redistributables
+    "1070560",  # Steam Linux Runtime
+    "1391110",  # Steam Linux Runtime - Soldier
+    "1628350",  # Steam Linux Runtime - Sniper
+}
+NON_GAME_PREFIXES = ("Proton ", "Steam Linux Runtime")
+# AppState.StateFlags bit set once the app is fully installed
+STATE_FULLY_INSTALLED = 4
+MANIFEST_KEYS = ("appid", "name", "installdir", "stateflags")
+
+
+def _unescape(value):
+    if "\\" not in value:
+        return value
+    return re.sub(r"\\(.)", lambda m: ESCAPES.get(m.group(1), m.group(1)), value)
+
+
+def tokenize(lines):
+    """Yield the tokens of VDF text line by line; braces come out as OPEN/CLOSE."""
+    for line in lines:
+        for match in TOKEN.finditer(line):
+            quoted, brace, bare = match.groups()
+            if quoted is not None:
+                yield _unescape(quoted)
+            elif brace:
+                yield OPEN if brace == "{" else CLOSE
+            elif bare:
+                yield bare
+
+
+def parse(lines):
+    """Parse VDF text into nested dicts. Keys are lower-cased, as Steam itself
+    treats them case-insensitively."""
+    root = {}
+    stack = [root]
+    key = None
+    for token in tokenize(lines):
+        if token is OPEN:
+            child = {}
+            stack[-1][(key or "").lower()] = child
+            stack.append(child)
+            key = None
+        elif token is CLOSE:
+            if len(stack) > 1:
+                stack.pop()
+            key = None
+        elif key is None:
+            key = token
+        else:
+            stack[-1][key.lower()] = token
+            key = None
+    return root
+
+
+def load(path):
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        return parse(f)
+
+
+def read_app_manifest(path):
+    """The top-level AppState values of an appmanifest_*.acf file.
+
+    Reading stops as soon as appid, name, installdir and StateFlags have been
+    seen, which in practice is within the first few lines; the depot and user
+    config blocks that make up the rest of the file are never tokenized.
+    """
+    app = {}
+    depth = 0
+    key = None
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for token in tokenize(f):
+            if token is OPEN:
+                depth += 1
+                key = None
+            elif token is CLOSE:
+                depth -= 1
+                if depth <= 0:
+                    break
+            elif key is None:
+                key = token
+            else:
+                if depth == 1:
+                    app[key.lower()] = token
+                    if all(k in app for k in MANIFEST_KEYS):
+                        break
+                key = None
+    return app
+
+
+def default_steam_path():
+    if os.name == "nt":
+        return os.path.join(os.getenv("ProgramFiles(x86)", r"C:\Program Files (x86)"), "Steam")
+    if sys.platform == "darwin":
+        return os.path.expanduser("~/Library/Application Support/Steam")
+    for candidate in ("~/.steam/steam", "~/.local/share/Steam"):
+        path = os.path.expanduser(candidate)
+        if os.path.isdir(path):
+            return path
+    return os.path.expanduser("~/.local/share/Steam")
+
+
+def library_folders(steam_path):
+    """Every library root (the folder that contains ``steamapps``) known to Steam."""
+    roots = [steam_path]
+    vdf_path = os.path.join(steam_path, "steamapps", "libraryfolders.vdf")
+    try:
+        folders = load(vdf_path).get("libraryfolders", {})
+    except OSError:
+        folders = {}
+    for key, value in folders.items():
+        if not key.isdigit():
+            continue  # e.g. "TimeNextStatsReport" in the old format
+        # Current format: "0" { "path" "..." ... }; old format: "1" "D:\\SteamLibrary"
+        path = value.get("path") if isinstance(value, dict) else value
+        if path:
+            roots.append(path)
+    seen = set()
+    unique = []
+    for root in roots:
+        key = os.path.normcase(os.path.normpath(root))
+        if key not in seen and os.path.isdir(os.path.join(root, "steamapps")):
+            seen.add(key)
+            unique.append(root)
+    return unique
+
+
+_manifest_cache = file_watch.ManifestCache(read_app_manifest)
+
+
+def _is_game(app):
+    appid = app.get("appid", "")
+    name = app.get("name", "")
+    if not appid.isdigit() or not name or appid in NON_GAME_APPIDS or name.startswith(NON_GAME_PREFIXES):
+        return False
+    flags = app.get("stateflags")
+    return flags is None or not flags.isdigit() or bool(int(flags) & STATE_FULLY_INSTALLED)
+
+
+def find_installed_games(steam_path, cache=None):
+    """Discovered-game dicts for every installed app in every library folder,
+    launched through ``steam://rungameid/<appid>``."""
+    cache = cache if cache is not None else _manifest_cache
+    games = []
+    seen_paths = []
+    for root in library_folders(steam_path):
+        steamapps = os.path.join(root, "steamapps")
+        try:
+            entries = list(os.scandir(steamapps))
+        except OSError:
+            continue
+        for entry in entries:
+            if not (entry.name.startswith("appmanifest_") and entry.name.endswith(".acf")):
+                continue
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            app = cache.get(entry.path, (st.st_mtime_ns, st.st_size))
+            seen_paths.append(entry.path)
+            if app and _is_game(app):
+                games.append({
+                    "title": app["name"],
+                    "url": f"steam://rungameid/{app['appid']}",
+                    "source": "steam",
+                    "external_id": app["appid"],
+                    "install_location": os.path.join(steamapps, "common", app["installdir"])
+                    if app.get("installdir") else None,
+                })
+    cache.prune(seen_paths)
+    return games
@@ -0,0 +1,265 @@
+import os
+import signal
+import subprocess
+import threading
+import time
+
+SESSION_COLUMNS = "id, game_id, pid, status, exit_code, started_at, ended_at"
+STOP_TIMEOUT = 10
+
+_boot_id = None
+
+
+def pid_alive(pid):
+    if os.name == "nt":
+        # os.kill(pid, 0) would terminate the process on Windows
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return False
+        try:
+            exit_code = ctypes.c_ulong()
+            kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code))
+            return exit_code.value == 259  # STILL_ACTIVE
+        finally:
+            kernel32.CloseHandle(handle)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _linux_boot_id():
+    global _boot_id
+    if _boot_id is None:
+        try:
+            with open("/proc/sys/kernel/random/boot_id") as f:
+                _boot_id = f.read().strip()
+        except OSError:
+            _boot_id = ""
+    return _boot_id
+
+
+def _windows_creation_time(pid):
+    import ctypes
+    kernel32 = ctypes.windll.kernel32
+    handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+    if not handle:
+        return None
+    try:
+        times = [ctypes.c_ulonglong() for _ in range(4)]  # creation, exit, kernel, user FILETIMEs
+        if not kernel32.GetProcessTimes(handle, *(ctypes.byref(t) for t in times)):
+            return None
+        return str(times[0].value)
+    finally:
+        kernel32.CloseHandle(handle)
+
+
+def process_identity(pid):
+    """A token that tells the process ``pid`` apart from any later process
+    that reuses the PID, or None when it is gone or cannot be identified.
+
+    Linux uses the boot ID and the start time from /proc/<pid>/stat, Windows
+    the creation time; other systems need psutil installed.
+    """
+    if os.name == "nt":
+        return _windows_creation_time(pid)
+    try:
+        with open(f"/proc/{pid}/stat", "rb") as f:
+            stat = f.read()
+    except FileNotFoundError:
+        if os.path.isdir("/proc/self"):
+            return None  # procfs is there, the process is not
+    except OSError:
+        return None
+    else:
+        # The command name (field 2) may contain spaces and parentheses;
+        # starttime is field 22, the 20th after it
+        return f"{_linux_boot_id()}:{int(stat[stat.rindex(b')') + 2:].split()[19])}"
+    try:
+        import psutil
+    except ImportError:
+        return None
+    try:
+        return repr(psutil.Process(pid).create_time())
+    except psutil.Error:
+        return None
+
+
+def same_process(pid, identity):
+    """Whether ``pid`` is still the process that ``identity`` was recorded for.
+
+    Without a recorded identity only the PID can be checked, which is all
+    there is on systems where process_identity returns None; elsewhere such
+    a row cannot be told apart from a reused PID and counts as gone.
+    """
+    if pid is None or not pid_alive(pid):
+        return False
+    current = process_identity(pid)
+    if identity is None:
+        return current is None
+    return current == identity
+
+
+def _detach_options():
+    # Games get their own process group so stopping one never signals the launcher
+    if os.name == "nt":
+        return {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+    return {"start_new_session": True}
+
+
+def signal_group(pid, force=False):
+    """Stop the process group that _detach_options gave ``pid``, so that
+    children a game or its launcher script spawned are stopped with it."""
+    if os.name == "nt":
+        # /T ends the whole process tree; without /F windows are asked to close
+        subprocess.run(["taskkill", "/T"] + (["/F"] if force else []) + ["/PID", str(pid)],
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        return
+    try:
+        os.killpg(pid, signal.SIGKILL if force else signal.SIGTERM)
+    except ProcessLookupError:
+        pass
+
+
+def session_to_dict(row, now=None):
+    session_id, game_id, pid, status, exit_code, started_at, ended_at = row
+    end = ended_at if ended_at is not None else (now or time.time())
+    return {
+        "id": session_id,
+        "game_id": game_id,
+        "pid": pid,
+        "status": status,
+        "exit_code": exit_code,
+        "started_at": started_at,
+        "ended_at": ended_at,
+        # A handed-off session only timed the opener, not the game
+        "duration": None if status == "handed_off" else round(end - started_at, 3),
+    }
+
+
+class LaunchSupervisor:
+    """Starts games without blocking and records each run in the sessions table.
+
+    Every launched process gets a reaper thread that waits for it and stores its
+    exit code and end time. ``on_exit`` is called with the finished session dict.
+
+    With ``handed_off=True`` the command only asks another program to start the
+    game (e.g. ``xdg-open steam://rungameid/...``) and exits right away. Such a
+    session is recorded as ``handed_off``: it counts as a launch, but the game
+    itself is not tracked, so it never shows as running, cannot be stopped and
+    adds no playtime.
+    """
+
+    def __init__(self, pool, on_exit=None):
+        self._pool = pool
+        self._processes = {}
+        self._stopping = set()
+        self._lock = threading.Lock()
+        self.on_exit = on_exit
+
+    def launch(self, game_id, command, shell=False, cwd=None, handed_off=False):
+        started_at = time.time()
+        process = subprocess.Popen(command, shell=shell, cwd=cwd, stdin=subprocess.DEVNULL,
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, **_detach_options())
+        identity = process_identity(process.pid)
+        with self._pool.transaction() as con:
+            session_id = con.execute(
+                "INSERT INTO sessions (game_id, pid, process_identity, command, status, started_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (game_id, process.pid, identity,
+                 command if isinstance(command, str) else subprocess.list2cmdline(command),
+                 "handed_off" if handed_off else "running", started_at)).lastrowid
+        if not handed_off:
+            with self._lock:
+                self._processes[session_id] = process
+        threading.Thread(target=self._reap, args=(session_id, process, handed_off), name=f"session-{session_id}",
+                         daemon=True).start()
+        return self.get_session(session_id)
+
+    def _reap(self, session_id, process, handed_off=False):
+        exit_code = process.wait()
+        ended_at = time.time()
+        with self._lock:
+            self._processes.pop(session_id, None)
+            if handed_off:
+                status = "handed_off"
+            else:
+                status = "stopped" if session_id in self._stopping else "exited"
+            self._stopping.discard(session_id)
+        with self._pool.transaction() as con:
+            con.execute("UPDATE sessions SET status = ?, exit_code = ?, ended_at = ? WHERE id = ?",
+                        (status, exit_code, ended_at, session_id))
+        if self.on_exit is not None:
+            self.on_exit(self.get_session(session_id))
+
+    def get_session(self, session_id):
+        with self._pool.connection() as con:
+            row = con.execute(f"SELECT {SESSION_COLUMNS} FROM sessions WHERE id = ?", (session_id,)).fetchone()
+        return session_to_dict(row) if row else None
+
+    def game_sessions(self, game_id, limit=50):
+        with self._pool.connection() as con:
+            rows = con.execute(f"SELECT {SESSION_COLUMNS} FROM sessions WHERE game_id = ? "
+                               "ORDER BY started_at DESC LIMIT ?", (game_id, limit)).fetchall()
+        return [session_to_dict(row) for row in rows]
+
+    def _stale(self, rows):
+        # Sessions started by another (or a previous) server process are only
+        # known by PID and process identity; these are the ones whose process is gone
+        with self._lock:
+            local = set(self._processes)
+        return [row[0] for row in rows if row[0] not in local and not same_process(row[-2], row[-1])]
+
+    def _mark_lost(self, session_ids):
+        if session_ids:
+            with self._pool.transaction() as con:
+                con.executemany("UPDATE sessions SET status = 'lost', ended_at = ? WHERE id = ? AND status = 'running'",
+                                ((time.time(), session_id) for session_id in session_ids))
+
+    def recover(self):
+        """Mark running sessions whose process is gone as lost; returns how many."""
+        with self._pool.connection() as con:
+            rows = con.execute("SELECT id, pid, process_identity FROM sessions WHERE status = 'running'").fetchall()
+        lost = self._stale(rows)
+        self._mark_lost(lost)
+        return len(lost)
+
+    def running_sessions(self):
+        with self._pool.connection() as con:
+            rows = con.execute(f"SELECT {SESSION_COLUMNS}, process_identity FROM sessions "
+                               "WHERE status = 'running' ORDER BY id").fetchall()
+        lost = set(self._stale([(row[0], row[2], row[-1]) for row in rows]))
+        self._mark_lost(lost)
+        return [session_to_dict(row[:-1]) for row in rows if row[0] not in lost]
+
+    def stop(self, session_id, timeout=STOP_TIMEOUT):
+        with self._lock:
+            process = self._processes.get(session_id)
+            if process is not None:
+                self._stopping.add(session_id)
+        if process is not None:
+            signal_group(process.pid)
+            try:
+                process.wait(timeout)
+            except subprocess.TimeoutExpired:
+                signal_group(process.pid, force=True)
+            return True
+        with self._pool.connection() as con:
+            row = con.execute("SELECT pid, process_identity FROM sessions WHERE id = ? AND status = 'running'",
+                              (session_id,)).fetchone()
+        if row is None:
+            return False
+        if not same_process(*row):
+            # Never signal whatever process has reused the PID since
+            self._mark_lost([session_id])
+            return False
+        signal_group(row[0])
+        with self._pool.transaction() as con:
+            con.execute("UPDATE sessions SET status = 'stopped', ended_at = ? WHERE id = ? AND status = 'running'",
+                        (time.time(), session_id))
+        return True
@@ -0,0 +1,199 @@
+import curses
+
+# Rows that scroll past with one page up/down keep this many rows of context
+PAGE_OVERLAP = 1
+
+
+class TitleIndex:
+    """Case-insensitive substring filter over (id, title) pairs.
+
+    Results are kept on a stack keyed by query, so typing one more character
+    only rescans the previous matches and backspace pops back to a result that
+    was already computed.
+    """
+
+    def __init__(self, games):
+        self.games = list(games)
+        self._keys = [title.casefold() for _, title in self.games]
+        self._stack = [("", range(len(self.games)))]
+
+    def filter(self, query):
+        """Positions in ``games`` whose title contains ``query``."""
+        query = query.casefold()
+        while len(self._stack) > 1 and not query.startswith(self._stack[-1][0]):
+            self._stack.pop()
+        base_query, base = self._stack[-1]
+        if query != base_query:
+            keys = self._keys
+            self._stack.append((query, [position for position in base if query in keys[position]]))
+        return self._stack[-1][1]
+
+
+class Browser:
+    """Scrollable, filterable game list drawn into a curses window.
+
+    Only the rows that fit in the window are rendered, and a row is written to
+    the window only when its text or highlight differs from the last frame, so
+    a keypress costs the same with 50 games as with 50,000.
+    """
+
+    def __init__(self, screen, games):
+        self.screen = screen
+        self.index = TitleIndex(games)
+        self.query = ""
+        self.matches = self.index.filter("")
+        self.cursor = 0
+        self.top = 0
+        self.resize()
+
+    def resize(self):
+        self.height, self.width = self.screen.getmaxyx()
+        # Whatever was on screen is unknown now; repaint every row once
+        self._frame = [None] * self.height
+        self._drawn_top = None
+        self._scroll()
+
+    @property
+    def list_height(self):
+        return max(1, self.height - 1)
+
+    def selected(self):
+        """ID of the highlighted game, or None when nothing matches."""
+        if not self.matches:
+            return None
+        return self.index.games[self.matches[self.cursor]][0]
+
+    def move(self, delta):
+        self.cursor = max(0, min(len(self.matches) - 1, self.cursor + delta))
+        self._scroll()
+
+    def set_query(self, query):
+        selected = self.selected()
+        self.query = query
+        self.matches = self.index.filter(query)
+        self.cursor = 0
+        # Filtering over a huge library must not turn into a linear search for
+        # the old selection, so it is only kept when it is on the first page
+        for offset, position in enumerate(self.matches[:self.list_height]):
+            if self.index.games[position][0] == selected:
+                self.cursor = offset
+                break
+        self.top = 0
+        self._scroll()
+
+    def _scroll(self):
+        rows = self.list_height
+        if self.cursor < self.top:
+            self.top = self.cursor
+        elif self.cursor >= self.top + rows:
+            self.top = self.cursor - rows + 1
+        self.top = max(0, min(self.top, len(self.matches) - rows))
+
+    def lines(self):
+        """The (text, attribute) pair for every row of the window."""
+        width = max(0, self.width - 1)  # writing the last column can scroll the window
+        games = self.index.games
+        lines = []
+        for row in range(self.list_height):
+            position = self.top + row
+            if position < len(self.matches):
+                title = games[self.matches[position]][1]
+                attr = curses.A_REVERSE if position == self.cursor else curses.A_NORMAL
+                lines.append((title[:width], attr))
+            elif row == 0:
+                lines.append(("No games match the filter."[:width], curses.A_DIM))
+            else:
+                lines.append(("", curses.A_NORMAL))
+        status = f"Filter: {self.query}" if self.query else "Type to filter"
+        status += f"  [{len(self.matches)}/{len(games)}]  Enter run  Esc {'clear' if self.query else 'quit'}"
+        lines.append((status[:width], curses.A_BOLD))
+        return lines[:self.height]
+
+    def _shift(self):
+        # Moving the view by a few rows scrolls what is already in the window
+        # (a terminal scroll when idlok is on) instead of rewriting every row
+        delta = self.top - self._drawn_top if self._drawn_top is not None else 0
+        rows = min(self.list_height, self.height)
+        if not delta or abs(delta) >= rows:
+            return
+        self.screen.setscrreg(0, rows - 1)
+        self.screen.scrollok(True)
+        self.screen.scroll(delta)
+        self.screen.scrollok(False)
+        self.screen.setscrreg(0, self.height - 1)
+        kept = self._frame[:rows]
+        if delta > 0:
+            kept = kept[delta:] + [None] * delta
+        else:
+            kept = [None] * -delta + kept[:delta]
+        self._frame[:rows] = kept
+
+    def draw(self):
+        """Write the rows that changed since the last frame; returns how many."""
+        self._shift()
+        self._drawn_top = self.top
+        changed = 0
+        for y, line in enumerate(self.lines()):
+            if self._frame[y] == line:
+                continue
+            text, attr = line
+            self.screen.move(y, 0)
+            self.screen.clrtoeol()
+            if text:
+                self.screen.addstr(y, 0, text, attr)
+            self._frame[y] = line
+            changed += 1
+        self.screen.refresh()
+        return changed
+
+    def handle_key(self, key):
+        """Apply a key from get_wch(); returns "run", "quit" or None."""
+        if key in (curses.KEY_ENTER, "\n", "\r"):
+            return "run" if self.matches else None
+        if key == "\x1b":
+            if not self.query:
+                return "quit"
+            self.set_query("")
+        elif key in (curses.KEY_BACKSPACE, "\x7f", "\b"):
+            self.set_query(self.query[:-1])
+        elif key == curses.KEY_UP:
+            self.move(-1)
+        elif key == curses.KEY_DOWN:
+            self.move(1)
+        elif key == curses.KEY_PPAGE:
+            self.move(-(self.list_height - PAGE_OVERLAP))
+        elif key == curses.KEY_NPAGE:
+            self.move(self.list_height - PAGE_OVERLAP)
+        elif key == curses.KEY_HOME:
+            self.move(-len(self.matches))
+        elif key == curses.KEY_END:
+            self.move(len(self.matches))
+        elif key == curses.KEY_RESIZE:
+            self.resize()
+        elif isinstance(key, str) and key.isprintable():
+            self.set_query(self.query + key)
+        return None
+
+
+def browse(stdscr, games):
+    """Let the user pick one of ``games`` ((id, title) pairs); returns its ID or None."""
+    if hasattr(curses, "set_escdelay"):
+        curses.set_escdelay(25)  # Esc clears the filter; don't wait a second for a sequence
+    try:
+        curses.curs_set(0)
+    except curses.error:
+        pass  # terminal cannot hide the cursor
+    stdscr.clear()
+    stdscr.idlok(True)
+    browser = Browser(stdscr, games)
+    while True:
+        browser.draw()
+        try:
+            key = stdscr.get_wch()
+        except curses.error:
+            continue
+        action = browser.handle_key(key)
+        if action == "run":
+            return browser.selected()
+        if action == "quit":
+            return None
@@ -0,0 +1,25 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent / "services"))
+
+
+@pytest.fixture
+def library(tmp_path, monkeypatch):
+    """game_manager on an empty database in a temporary directory."""
+    import database
+    import game_manager
+
+    config_path = tmp_path / "config.json"
+    config_path.write_text(json.dumps({"db_path": str(tmp_path / "launcher.db")}))
+    monkeypatch.setenv("APPDATA", str(tmp_path / "appdata"))
+    monkeypatch.setattr(game_manager, "CONFIG_PATH", str(config_path))
+    monkeypatch.setattr(game_manager, "_config_store", None)
+    monkeypatch.setattr(game_manager, "_supervisor", None)
+    monkeypatch.setattr(game_manager, "_job_queue", None)
+    game_manager.init_db()
+    yield game_manager
+    database.close_all()
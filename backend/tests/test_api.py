@@ -0,0 +1,86 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent / "api"))
+
+
+@pytest.fixture
+def client(library):
+    import app
+    return app.create_app().test_client()
+
+
+def test_exhausted_pool_answers_503(client, library, monkeypatch):
+    import threading
+
+    pool = library.get_pool()
+    monkeypatch.setattr(pool, "busy_timeout_ms", 50)
+    held = threading.Event()
+    release = threading.Event()
+
+    def hold():
+        with pool.connection():
+            held.set()
+            release.wait(10)
+
+    holders = [threading.Thread(target=hold) for _ in range(pool.size)]
+    for holder in holders:
+        holder.start()
+    try:
+        while pool._opened < pool.size:
+            held.wait(0.01)
+        response = client.get("/api/games?limit=5")
+    finally:
+        release.set()
+        for holder in holders:
+            holder.join()
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    assert "error" in response.get_json()
+
+
+@pytest.mark.parametrize("limit", ["0", "-5"])
+def test_games_page_limit_below_one_is_rejected(client, limit):
+    response = client.get(f"/api/games?limit={limit}")
+
+    assert response.status_code == 400
+    assert "limit" in response.get_json()["error"]
+
+
+def test_games_page_limit(client, library):
+    for i in range(3):
+        library.add_game_to_db(f"Game {i}", f"/games/{i}")
+
+    page = client.get("/api/games?limit=2").get_json()
+    rest = client.get(f"/api/games?cursor={page['next_cursor']}").get_json()
+
+    assert len(page["games"]) == 2
+    assert [game["title"] for game in rest["games"]] == ["Game 2"] and rest["next_cursor"] is None
+
+
+@pytest.fixture
+def music(client, tmp_path, monkeypatch):
+    import app
+    track = tmp_path / "theme.ogg"
+    track.write_bytes(bytes(range(256)) * 4)
+    monkeypatch.setattr(app, "MUSIC_DIR", tmp_path)
+    return track
+
+
+def test_music_range_request_gets_partial_content(client, music):
+    response = client.get(f"/music/{music.name}", headers={"Range": "bytes=100-199"})
+
+    assert response.status_code == 206
+    assert response.headers["Content-Range"] == "bytes 100-199/1024"
+    assert response.data == music.read_bytes()[100:200]
+
+
+def test_music_revalidation_gets_not_modified(client, music):
+    first = client.get(f"/music/{music.name}")
+    again = client.get(f"/music/{music.name}", headers={"If-None-Match": first.headers["ETag"]})
+
+    assert first.status_code == 200 and "max-age=3600" in first.headers["Cache-Control"]
+    assert again.status_code == 304 and again.data == b""
@@ -0,0 +1,129 @@
+import io
+import json
+import threading
+
+import backup
+
+
+def ndjson(*games):
+    lines = [backup.header_line()] + [json.dumps(game) + "\n" for game in games]
+    return "".join(lines).encode()
+
+
+def game_count(library):
+    with library.connection() as con:
+        return con.execute("SELECT COUNT(*) FROM games").fetchone()[0]
+
+
+def test_import_round_trip(library, tmp_path):
+    library.add_game_to_db("One", str(tmp_path / "one.exe"))
+    exported = io.BytesIO()
+    library.export_library(exported)
+    with library.transaction() as con:
+        con.execute("DELETE FROM games")
+
+    summary = library.import_library(io.BytesIO(exported.getvalue()))
+
+    assert summary["inserted"] == 1
+    assert game_count(library) == 1
+
+
+class SlowUpload(io.RawIOBase):
+    """An upload whose second half only arrives once ``resume`` is set;
+    ``stalled`` is set when a read is waiting for it."""
+
+    def __init__(self, data, resume):
+        self._first, self._rest = data[:len(data) // 2], data[len(data) // 2:]
+        self._resume = resume
+        self.stalled = threading.Event()
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if not self._first and self._rest:
+            self.stalled.set()
+            self._resume.wait(10)
+            self._first, self._rest = self._rest, b""
+        size = min(len(buffer), len(self._first))
+        buffer[:size] = self._first[:size]
+        self._first = self._first[size:]
+        return size
+
+
+def test_import_does_not_lock_the_library_while_reading(library, tmp_path):
+    data = ndjson(*({"title": f"Game {i}", "executable_path": str(tmp_path / f"{i}.exe")} for i in range(2000)))
+    resume = threading.Event()
+    result = {}
+    upload = SlowUpload(data, resume)
+    importer = threading.Thread(target=lambda: result.update(library.import_library(upload)))
+    importer.start()
+    try:
+        assert upload.stalled.wait(10)
+        # While the upload stalls other writers still get through
+        library.add_game_to_db("Meanwhile", str(tmp_path / "meanwhile.exe"))
+    finally:
+        resume.set()
+        importer.join()
+
+    assert result["inserted"] == 2000
+    assert game_count(library) == 2001
+
+
+def test_unsupported_header_fails_before_writing(library):
+    data = json.dumps({"format": backup.FORMAT, "version": backup.VERSION + 1}).encode() + b"\n"
+    try:
+        library.import_library(io.BytesIO(data))
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("expected ValueError")
+    assert game_count(library) == 0
+
+
+def test_import_drops_cover_paths_outside_the_store(library, tmp_path):
+    data = ndjson({"title": "Absolute", "executable_path": "/games/a", "cover_art_path": "/etc/passwd"},
+                  {"title": "Relative", "executable_path": "/games/b", "cover_art_path": "../../etc/passwd"},
+                  {"title": "Windows", "executable_path": "/games/c", "cover_art_path": "C:\\secrets.txt"},
+                  {"title": "Stored", "executable_path": "/games/d", "cover_art_path": "ab12.png"})
+
+    library.import_library(io.BytesIO(data))
+
+    with library.connection() as con:
+        covers = dict(con.execute("SELECT title, cover_art_path FROM games"))
+    assert covers == {"Absolute": None, "Relative": None, "Windows": None, "Stored": "ab12.png"}
+
+
+def test_export_only_bundles_files_from_the_cover_store(library, tmp_path):
+    import tarfile
+
+    cover = tmp_path / "cover.png"
+    cover.write_bytes(b"not really a png")
+    library.add_game_to_db("Real", "/games/real", str(cover))
+    secret = tmp_path / "secret.txt"
+    secret.write_text("do not export")
+    with library.transaction() as con:
+        con.execute("INSERT INTO games (title, executable_path, cover_art_path) VALUES ('Crafted', '/games/x', ?)",
+                    (str(secret),))
+    exported = io.BytesIO()
+
+    library.export_library(exported, covers=True)
+
+    with tarfile.open(fileobj=io.BytesIO(exported.getvalue())) as tar:
+        names = tar.getnames()
+    assert len(names) == 2 and names[0].startswith(backup.COVERS_PREFIX) and names[0].endswith(".png")
+    assert names[1] == backup.LIBRARY_MEMBER
+
+
+def test_export_releases_its_connection_between_batches(library):
+    with library.transaction() as con:
+        con.executemany("INSERT INTO games (title, executable_path, display_order) VALUES (?, ?, ?)",
+                        ((f"Game {i}", f"/games/{i}", i + 1) for i in range(1200)))
+    pool = library.get_pool()
+
+    chunks = library.iter_export_ndjson()
+    first = next(chunks)
+
+    assert pool._idle.qsize() == pool._opened
+    lines = (first + b"".join(chunks)).splitlines()
+    assert len(lines) == 1 + 1200
@@ -0,0 +1,78 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent / "api"))
+
+
+def titles(library):
+    with library.connection() as con:
+        return [row[0] for row in con.execute("SELECT title FROM games ORDER BY id")]
+
+
+@pytest.fixture
+def game_id(library):
+    library.add_game_to_db("Existing", "/games/existing")
+    with library.connection() as con:
+        return con.execute("SELECT id FROM games").fetchone()[0]
+
+
+def test_atomic_batch_rolls_back_when_one_operation_fails(library, game_id):
+    committed, results = library.apply_game_batch([
+        {"op": "add", "title": "New", "executable_path": "/games/new"},
+        {"op": "update", "id": game_id, "title": "Renamed"},
+        {"op": "delete", "id": 999},
+    ])
+
+    assert not committed
+    assert results == [
+        {"index": 0, "op": "add", "status": "rolled_back"},
+        {"index": 1, "op": "update", "id": game_id, "status": "rolled_back"},
+        {"index": 2, "op": "delete", "id": 999, "status": "error", "error": "No game found with ID 999."},
+    ]
+    assert titles(library) == ["Existing"]
+
+
+def test_atomic_batch_with_an_invalid_operation_writes_nothing(library, game_id):
+    committed, results = library.apply_game_batch([
+        {"op": "delete", "id": game_id},
+        {"op": "add", "title": "No path"},
+    ])
+
+    assert not committed
+    assert [result["status"] for result in results] == ["rolled_back", "error"]
+    assert results[1]["error"] == "'title' and 'executable_path' are required"
+    assert titles(library) == ["Existing"]
+
+
+def test_non_atomic_batch_commits_the_good_operations(library, game_id):
+    committed, results = library.apply_game_batch([
+        {"op": "add", "title": "New", "executable_path": "/games/new"},
+        {"op": "rename", "id": game_id},
+        {"op": "update", "id": game_id, "title": "Renamed"},
+        {"op": "delete", "id": 999},
+    ], atomic=False)
+
+    assert committed
+    assert [result["index"] for result in results] == [0, 1, 2, 3]
+    assert [result["status"] for result in results] == ["ok", "error", "ok", "error"]
+    assert results[0]["id"] > game_id
+    assert results[1]["error"].startswith("Unsupported op 'rename'")
+    assert results[3]["error"] == "No game found with ID 999."
+    assert titles(library) == ["Renamed", "New"]
+
+
+def test_batch_endpoint(library, game_id):
+    import app
+    client = app.create_app().test_client()
+    operations = [{"op": "update", "id": game_id, "title": "Renamed"}, {"op": "delete", "id": 999}]
+
+    rolled_back = client.post("/api/games/batch", json={"operations": operations})
+    partial = client.post("/api/games/batch", json={"operations": operations, "atomic": False})
+
+    assert rolled_back.status_code == 409
+    assert rolled_back.get_json()["committed"] is False
+    assert partial.status_code == 200
+    assert [result["status"] for result in partial.get_json()["results"]] == ["ok", "error"]
+    assert titles(library) == ["Renamed"]
@@ -0,0 +1,51 @@
+import os
+import threading
+
+import game_manager
+
+
+def test_add_game_rejects_a_duplicate_path(library, tmp_path):
+    catalog = game_manager.GameManager()
+    path = str(tmp_path / "Game" / "game.exe")
+
+    game, created = catalog.add_game("Game", path)
+    again, created_again = catalog.add_game("Game (copy)", os.path.join(str(tmp_path), "Game", ".", "game.exe"))
+
+    assert created and not created_again
+    assert again == game
+    assert len(catalog.get_all_games()) == 1
+
+
+def test_add_game_sees_writes_not_yet_signalled(library, tmp_path):
+    catalog = game_manager.GameManager()
+    catalog.get_all_games()
+    path = str(tmp_path / "game.exe")
+    # Another process has committed but not yet bumped the revision marker
+    with library.transaction() as con:
+        con.execute("INSERT INTO games (title, executable_path) VALUES ('Game', ?)", (path,))
+
+    game, created = catalog.add_game("Game", path)
+
+    assert not created
+    assert game["executable_path"] == path
+
+
+def test_concurrent_adds_of_one_path_create_one_game(library, tmp_path):
+    catalog = game_manager.GameManager()
+    path = str(tmp_path / "game.exe")
+    results = []
+    barrier = threading.Barrier(8)
+
+    def add():
+        barrier.wait()
+        results.append(catalog.add_game("Game", path)[1])
+
+    threads = [threading.Thread(target=add) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(results) == [False] * 7 + [True]
+    with library.connection() as con:
+        assert con.execute("SELECT COUNT(*) FROM games").fetchone()[0] == 1
@@ -0,0 +1,54 @@
+def add_games(library, *titles):
+    for title in titles:
+        library.add_game_to_db(title, f"/games/{title}")
+    with library.connection() as con:
+        return [row[0] for row in con.execute("SELECT id FROM games ORDER BY id")]
+
+
+def test_changes_collapse_per_game_since_the_cursor(library):
+    kept, renamed, removed = add_games(library, "Kept", "Renamed", "Removed")
+    cursor = library.feed_revision()
+
+    added, = add_games(library, "Added")[3:]
+    library.update_game_info(added, title="Added later")
+    library.update_game_info(renamed, title="New title")
+    library.update_game_info(renamed, title="Newer title")
+    library.update_game_info(removed, title="Doomed")
+    library.delete_game(removed)
+
+    changes, reset = library.changes_since(cursor)
+
+    assert not reset
+    assert [(op, game_id) for _, op, game_id, _ in changes] == [("insert", added), ("update", renamed),
+                                                                ("delete", removed)]
+    rows = {game_id: row for _, _, game_id, row in changes}
+    assert rows[added][1] == "Added later"
+    assert rows[renamed][1] == "Newer title"
+    assert rows[removed] is None
+    assert [revision for revision, _, _, _ in changes] == sorted(revision for revision, _, _, _ in changes)
+    assert changes[-1][0] == library.feed_revision()
+    assert library.changes_since(library.feed_revision()) == ([], False)
+
+
+def test_insert_then_delete_since_the_cursor_is_a_delete(library):
+    cursor = library.feed_revision()
+    game_id, = add_games(library, "Brief")
+    library.delete_game(game_id)
+
+    changes, reset = library.changes_since(cursor)
+
+    assert not reset
+    assert [(op, changed_id, row) for _, op, changed_id, row in changes] == [("delete", game_id, None)]
+
+
+def test_cursor_older_than_the_retained_log_gets_a_reset(library, monkeypatch):
+    monkeypatch.setattr(library, "CHANGE_LOG_SIZE", 5)
+    add_games(library, "A")
+    cursor = library.feed_revision()
+    ids = add_games(library, *"BCDEFGHIJ")
+
+    library.delete_games(ids[1:3])
+
+    assert library.changes_since(cursor) == ([], True)
+    changes, reset = library.changes_since(library.feed_revision() - 5)
+    assert not reset and len(changes) == 5
@@ -0,0 +1,52 @@
+import os
+
+import pytest
+
+import cover_art
+
+pytest.importorskip("PIL")
+pytestmark = pytest.mark.skipif("webp" not in cover_art.output_formats(), reason="Pillow without WebP support")
+
+
+@pytest.fixture(autouse=True)
+def executor(monkeypatch):
+    # A pool of the test's own, so that waiting for it waits for the variants
+    monkeypatch.setattr(cover_art, "_executor", None)
+    yield
+    if cover_art._executor is not None:
+        cover_art._executor.shutdown(wait=True)
+
+
+def make_cover(tmp_path, content=None):
+    source = tmp_path / "cover.png"
+    if content is None:
+        from PIL import Image
+        Image.new("RGB", (900, 1200), "red").save(source)
+    else:
+        source.write_bytes(content)
+    store_dir = tmp_path / "store"
+    name = cover_art.store_cover(str(source), str(store_dir))
+    cover_art._get_executor().shutdown(wait=True)
+    cover_art._executor = None
+    return str(store_dir), name
+
+
+@pytest.mark.parametrize("accepted", [["*/*"], ["image/*"], ["image/webp", "*/*"]])
+def test_wildcard_accept_gets_webp(tmp_path, accepted):
+    store_dir, name = make_cover(tmp_path)
+
+    assert cover_art.resolve(store_dir, name, "grid", accepted) == (cover_art.variant_name(name, "grid", "webp"), True)
+
+
+def test_original_is_final_for_clients_without_a_variant_format(tmp_path):
+    store_dir, name = make_cover(tmp_path)
+
+    assert cover_art.resolve(store_dir, name, "grid", ["image/png"]) == (name, True)
+
+
+def test_failed_variants_are_not_retried(tmp_path):
+    store_dir, name = make_cover(tmp_path, b"not an image")
+
+    assert os.path.exists(os.path.join(store_dir, cover_art.failed_marker_name(name)))
+    assert cover_art.resolve(store_dir, name, "grid", ["*/*"]) == (name, True)
+    assert cover_art.schedule_variants(store_dir, name) is None
@@ -0,0 +1,78 @@
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+
+import epic
+import file_watch
+
+FIXTURES = Path(__file__).parent / "fixtures" / "epic"
+MANIFESTS = Path(epic.manifest_dir(str(FIXTURES)))
+
+
+def find_games(data_path):
+    games = epic.find_installed_games(str(data_path), cache=file_watch.ManifestCache(epic.read_json))
+    return sorted(games, key=lambda game: game["title"])
+
+
+@pytest.fixture
+def epic_data(tmp_path):
+    root = tmp_path / "Epic"
+    shutil.copytree(FIXTURES, root)
+    return root
+
+
+def test_read_launcher_installed():
+    installed = epic.read_launcher_installed(epic.launcher_installed_path(str(FIXTURES)))
+
+    assert installed == {"Min": "/epic/Hades", "Calluna": "", "CallunaFoundation": "/epic/Control",
+                         "UE_5.3": "/epic/UE_5.3", "Dawn": "/epic/AlanWake2"}
+
+
+def test_malformed_manifest_is_cached_as_none():
+    cache = file_watch.ManifestCache(epic.read_json)
+
+    assert cache.get(str(MANIFESTS / "E1E2E3E4E5E6E7E8E9EAEBECEDEEEFF0.item")) is None
+
+
+def test_find_installed_games():
+    # Skipped: the DLC, the engine, the incomplete install, the manifest left
+    # behind by an uninstalled game and the malformed one
+    assert find_games(FIXTURES) == [
+        {
+            "title": "Control",
+            "url": "com.epicgames.launcher://apps/calluna%3Ac0f1e2d3b4a5968778695a4b3c2d1e0f%3ACalluna"
+                   "?action=launch&silent=true",
+            "source": "epic",
+            "external_id": "c0f1e2d3b4a5968778695a4b3c2d1e0f",
+            # LauncherInstalled.dat has no location for it; the manifest's is used
+            "install_location": os.path.normpath("/epic/Control"),
+        },
+        {
+            "title": "Hades",
+            "url": "com.epicgames.launcher://apps/min%3Aa2e5b4c9d1f04e3aa8b7c6d5e4f3a2b1%3AMin"
+                   "?action=launch&silent=true",
+            "source": "epic",
+            "external_id": "a2e5b4c9d1f04e3aa8b7c6d5e4f3a2b1",
+            # LauncherInstalled.dat wins over the manifest's older location
+            "install_location": os.path.normpath("/epic/Hades"),
+        },
+    ]
+
+
+def test_without_launcher_installed_every_manifest_counts(epic_data):
+    os.remove(epic.launcher_installed_path(str(epic_data)))
+
+    assert [game["title"] for game in find_games(epic_data)] == ["Control", "Hades", "Uninstalled Game"]
+    assert find_games(epic_data)[1]["install_location"] == os.path.normpath("/old/Epic Games/Hades")
+
+
+def test_malformed_launcher_installed_is_ignored(epic_data):
+    Path(epic.launcher_installed_path(str(epic_data))).write_text('{"InstallationList": [')
+
+    assert [game["title"] for game in find_games(epic_data)] == ["Control", "Hades", "Uninstalled Game"]
+
+
+def test_missing_data_path_finds_nothing(tmp_path):
+    assert find_games(tmp_path / "no Epic here") == []
@@ -0,0 +1,140 @@
+import os
+import sqlite3
+import threading
+import time
+
+import jobs
+
+
+def insert_job(library, instance, heartbeat, kind="scan", key="/games"):
+    with library.transaction() as con:
+        return con.execute("INSERT INTO jobs (kind, key, status, pid, instance, heartbeat, created_at) "
+                           "VALUES (?, ?, 'running', ?, ?, ?, ?)",
+                           (kind, key, os.getpid(), instance, heartbeat, time.time())).lastrowid
+
+
+def job_status(library, job_id):
+    with library.connection() as con:
+        return con.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()[0]
+
+
+def blocking_job(release):
+    def run(progress):
+        release.wait(10)
+        return {"ok": True}
+    return run
+
+
+def test_job_of_a_live_process_is_joined(library):
+    other = insert_job(library, "another server", time.time())
+    queue = jobs.JobQueue(library.get_pool())
+
+    job, created = queue.submit("scan", "/games", blocking_job(threading.Event()))
+
+    assert not created
+    assert job["id"] == other
+
+
+def test_abandoned_job_with_a_reused_pid_is_replaced(library):
+    # Same PID as this process, but nobody has stamped the row for a minute
+    stale = insert_job(library, "an earlier server", time.time() - 60)
+    queue = jobs.JobQueue(library.get_pool())
+    release = threading.Event()
+
+    job, created = queue.submit("scan", "/games", blocking_job(release))
+    release.set()
+
+    assert created
+    assert job["id"] != stale
+    assert job_status(library, stale) == "interrupted"
+
+
+def test_recover_interrupts_jobs_without_a_recent_heartbeat(library):
+    stale = insert_job(library, "an earlier server", time.time() - 60, key="/a")
+    legacy = insert_job(library, None, None, key="/b")
+    live = insert_job(library, "another server", time.time(), key="/c")
+
+    assert jobs.JobQueue(library.get_pool()).recover() == 2
+
+    assert job_status(library, stale) == "interrupted"
+    assert job_status(library, legacy) == "interrupted"
+    assert job_status(library, live) == "running"
+
+
+def test_running_jobs_keep_their_heartbeat_fresh(library, monkeypatch):
+    monkeypatch.setattr(jobs, "HEARTBEAT_INTERVAL", 0.05)
+    queue = jobs.JobQueue(library.get_pool())
+    release = threading.Event()
+    job, _ = queue.submit("scan", "/games", blocking_job(release))
+    with library.connection() as con:
+        first = con.execute("SELECT heartbeat FROM jobs WHERE id = ?", (job["id"],)).fetchone()[0]
+
+    time.sleep(0.3)
+    with library.connection() as con:
+        later = con.execute("SELECT heartbeat FROM jobs WHERE id = ?", (job["id"],)).fetchone()[0]
+    release.set()
+    queue.wait(job["id"], queue.get(job["id"]), timeout=5)
+
+    assert later > first
+    assert jobs.JobQueue(library.get_pool())._owned_elsewhere(queue.instance, later)
+
+
+class LockedPool:
+    """Pool whose transactions fail with "database is locked" while ``locked``."""
+
+    def __init__(self, pool):
+        self._pool = pool
+        self.locked = False
+
+    def __getattr__(self, name):
+        return getattr(self._pool, name)
+
+    def transaction(self):
+        if self.locked:
+            raise sqlite3.OperationalError("database is locked")
+        return self._pool.transaction()
+
+
+def test_a_locked_database_does_not_leave_the_job_running(library):
+    pool = LockedPool(library.get_pool())
+    queue = jobs.JobQueue(pool)
+    release = threading.Event()
+    job, _ = queue.submit("scan", "/games", blocking_job(release))
+    pool.locked = True
+    release.set()
+
+    finished = queue.get(job["id"])
+    deadline = time.monotonic() + 5
+    while finished["status"] in ("queued", "running") and time.monotonic() < deadline:
+        finished = queue.wait(job["id"], finished, timeout=1)
+    assert finished["status"] == "failed"
+    assert "database is locked" in finished["error"]
+    assert job_status(library, job["id"]) in ("queued", "running")
+
+    pool.locked = False
+    again, created = queue.submit("scan", "/games", blocking_job(release))
+    assert created and again["id"] != job["id"]
+    assert job_status(library, job["id"]) == "failed"
+
+
+def test_heartbeat_survives_a_locked_database(library, monkeypatch):
+    monkeypatch.setattr(jobs, "HEARTBEAT_INTERVAL", 0.05)
+    pool = LockedPool(library.get_pool())
+    queue = jobs.JobQueue(pool)
+    release = threading.Event()
+    job, _ = queue.submit("scan", "/games", blocking_job(release))
+    while job_status(library, job["id"]) != "running":
+        time.sleep(0.01)
+    pool.locked = True
+    time.sleep(0.2)
+    pool.locked = False
+    with library.connection() as con:
+        before = con.execute("SELECT heartbeat FROM jobs WHERE id = ?", (job["id"],)).fetchone()[0]
+    time.sleep(0.2)
+    with library.connection() as con:
+        after = con.execute("SELECT heartbeat FROM jobs WHERE id = ?", (job["id"],)).fetchone()[0]
+    release.set()
+    queue.wait(job["id"], queue.get(job["id"]), timeout=5)
+
+    assert after > before
+
@@ -0,0 +1,25 @@
+def add_games(library, count):
+    with library.transaction() as con:
+        con.executemany("INSERT INTO games (title, executable_path, display_order) VALUES (?, ?, ?)",
+                        ((f"Game {i:04}", f"/games/{i}", i + 1) for i in range(count)))
+
+
+def test_iter_games_pages_through_every_row(library):
+    add_games(library, 1203)
+
+    titles = [row[1] for row in library.iter_games(sort="title", order="desc", batch_size=100)]
+
+    assert titles == sorted((f"Game {i:04}" for i in range(1203)), reverse=True)
+
+
+def test_iter_games_releases_its_connection_between_batches(library):
+    add_games(library, 50)
+    pool = library.get_pool()
+
+    rows = library.iter_games(batch_size=10)
+    next(rows)
+
+    # A client still downloading holds no connection and no read transaction
+    assert pool._idle.qsize() == pool._opened
+    assert not any(con.in_transaction for con in list(pool._idle.queue))
+    assert len(list(rows)) == 49
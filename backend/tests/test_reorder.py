@@ -0,0 +1,72 @@
+def display_order(library):
+    with library.connection() as con:
+        return [row[0] for row in con.execute("SELECT title FROM games ORDER BY display_order, id")]
+
+
+def positions(library):
+    with library.connection() as con:
+        return [row[0] for row in con.execute("SELECT display_order FROM games ORDER BY display_order, id")]
+
+
+def add_games(library, *titles):
+    for title in titles:
+        library.add_game_to_db(title, f"/games/{title}")
+
+
+def test_partial_reorder_moves_the_rest_after_the_listed_games(library):
+    add_games(library, "A", "B", "C", "D", "E")
+
+    library.reorder_games([5, 3])
+
+    assert display_order(library) == ["E", "C", "A", "B", "D"]
+    assert positions(library) == [1, 2, 3, 4, 5]
+
+
+def test_full_reorder(library):
+    add_games(library, "A", "B", "C")
+
+    library.reorder_games([2, 3, 1])
+
+    assert display_order(library) == ["B", "C", "A"]
+
+
+def test_unknown_and_repeated_ids_are_ignored(library):
+    add_games(library, "A", "B", "C")
+
+    library.reorder_games([3, 99, 3, 1])
+
+    assert display_order(library) == ["C", "A", "B"]
+    assert positions(library) == [1, 2, 3]
+
+
+def test_unchanged_positions_are_not_written(library):
+    add_games(library, "A", "B", "C")
+    with library.connection() as con:
+        before = con.execute("SELECT MAX(revision) FROM changes").fetchone()[0]
+
+    library.reorder_games([1, 3, 2])
+
+    with library.connection() as con:
+        assert [row[0] for row in con.execute("SELECT game_id FROM changes WHERE revision > ? ORDER BY game_id",
+                                              (before,))] == [2, 3]
+
+
+def test_new_games_go_after_reordered_ones(library):
+    add_games(library, "A", "B", "C")
+    library.reorder_games([3, 1, 2])
+
+    library.add_games_bulk([{"title": "D", "url": "/games/D"}, {"title": "E", "url": "/games/E"}])
+
+    assert display_order(library) == ["C", "A", "B", "D", "E"]
+    assert positions(library) == [1, 2, 3, 4, 5]
+
+
+def test_each_insert_logs_one_change(library):
+    with library.connection() as con:
+        before = con.execute("SELECT count(*) FROM changes").fetchone()[0]
+
+    library.add_games_bulk([{"title": f"Game {i}", "url": f"/games/{i}"} for i in range(10)])
+
+    with library.connection() as con:
+        after = con.execute("SELECT count(*) FROM changes").fetchone()[0]
+    assert after - before == 10
@@ -0,0 +1,52 @@
+import os
+import time
+
+
+def backdate(root, seconds):
+    # Outside scanner.RACY_MTIME_WINDOW_NS, so unchanged directories are not re-listed
+    stamp = time.time() - seconds
+    for dirpath, _, filenames in os.walk(root, topdown=False):
+        for name in filenames:
+            os.utime(os.path.join(dirpath, name), (stamp, stamp))
+        os.utime(dirpath, (stamp, stamp))
+
+
+def library_paths(library):
+    with library.connection() as con:
+        return sorted(row[0] for row in con.execute("SELECT executable_path FROM games"))
+
+
+def indexed_paths(library, root):
+    with library.connection() as con:
+        return sorted(row[0] for row in con.execute("SELECT path FROM scan_files WHERE root = ?", (str(root),)))
+
+
+def test_rescan_reports_added_and_removed_games(library, tmp_path):
+    root = tmp_path / "games"
+    for name in ("Alpha/alpha.exe", "Beta/beta.exe", "Beta/Uninstall.exe", "Gamma/readme.txt"):
+        (root / name).parent.mkdir(parents=True, exist_ok=True)
+        (root / name).write_bytes(b"MZ")
+    backdate(root, 3600)
+    alpha, beta, gamma = (str(root / name) for name in ("Alpha/alpha.exe", "Beta/beta.exe", "Gamma/gamma.exe"))
+
+    first = library.rescan_directory(str(root))
+
+    assert sorted(first["added"]) == [alpha, beta] and first["removed"] == []
+    assert library_paths(library) == [alpha, beta]
+    assert indexed_paths(library, root) == [alpha, beta]
+
+    os.remove(beta)
+    (root / "Gamma" / "gamma.exe").write_bytes(b"MZ")
+    backdate(root, 1800)
+
+    second = library.rescan_directory(str(root))
+
+    assert second["added"] == [gamma] and second["removed"] == [beta]
+    # Removed executables are reported, not deleted from the library
+    assert library_paths(library) == [alpha, beta, gamma]
+    assert indexed_paths(library, root) == [alpha, gamma]
+
+    third = library.rescan_directory(str(root))
+
+    assert third["added"] == [] and third["removed"] == []
+    assert indexed_paths(library, root) == [alpha, gamma]
@@ -0,0 +1,103 @@
+import shutil
+from pathlib import Path
+
+import pytest
+
+import file_watch
+import steam
+
+FIXTURES = Path(__file__).parent / "fixtures" / "steam"
+
+
+def test_parse_nested_blocks():
+    folders = steam.load(FIXTURES / "libraryfolders.vdf")["libraryfolders"]
+
+    assert sorted(folders) == ["0", "1"]
+    assert folders["0"]["path"] == r"C:\Program Files (x86)\Steam"
+    assert folders["0"]["apps"] == {"228980": "186015042", "620": "12776040466"}
+    assert folders["1"]["apps"] == {"1245620": "60183957108"}
+
+
+def test_parse_escaped_quotes():
+    folders = steam.load(FIXTURES / "libraryfolders.vdf")["libraryfolders"]
+
+    assert folders["1"]["path"] == r"D:\SteamLibrary"
+    assert folders["1"]["label"] == 'The "fast" disk'
+
+
+def test_parse_legacy_library_folders():
+    folders = steam.load(FIXTURES / "libraryfolders_legacy.vdf")["libraryfolders"]
+
+    assert folders["1"] == r"D:\SteamLibrary"
+    assert folders["2"] == r"E:\Games\Steam"
+    assert folders["timenextstatsreport"] == "1580000000"
+
+
+def test_parse_skips_comments_and_conditionals():
+    data = steam.parse(['"root" // comment\n', '{\n', '"key" "value" [$WIN32]\n', '"other" "x" // trailing\n', '}\n'])
+
+    assert data == {"root": {"key": "value", "other": "x"}}
+
+
+@pytest.mark.parametrize("text", [
+    '"root"\n{\n"key" "value"\n',           # block never closed
+    '"root"\n{\n}\n}\n}\n',                 # too many closing braces
+    '"root"\n{\n"key" "unterminated\n}\n',  # quote never closed
+    '"lonely key"\n',
+    "",
+    "\x00\xff garbage {{ \"",
+])
+def test_parse_malformed_input_does_not_raise(text):
+    assert isinstance(steam.parse(text.splitlines(keepends=True)), dict)
+
+
+def test_read_app_manifest_top_level_values():
+    app = steam.read_app_manifest(FIXTURES / "steamapps" / "appmanifest_620.acf")
+
+    # "name" inside UserConfig must not replace the title
+    assert app["name"] == "Portal 2"
+    assert app["appid"] == "620"
+    assert app["installdir"] == "Portal 2"
+    assert app["stateflags"] == "4"
+
+
+def test_read_app_manifest_mixed_case_keys_and_escapes():
+    app = steam.read_app_manifest(FIXTURES / "library" / "steamapps" / "appmanifest_1245620.acf")
+
+    assert app == {"appid": "1245620", "name": 'ELDEN RING "Shadow" Edition', "stateflags": "4",
+                   "installdir": "ELDEN RING"}
+
+
+def test_read_app_manifest_truncated_file():
+    app = steam.read_app_manifest(FIXTURES / "library" / "steamapps" / "appmanifest_999.acf")
+
+    assert app.get("appid") == "999"
+    assert "installdir" not in app
+
+
+@pytest.fixture
+def steam_install(tmp_path):
+    # The fixture tree with libraryfolders.vdf pointing at its real location
+    root = tmp_path / "steam"
+    shutil.copytree(FIXTURES, root)
+    template = (FIXTURES / "libraryfolders.vdf.in").read_text()
+    for name, path in (("steam", root), ("library", root / "library"), ("missing", tmp_path / "unplugged")):
+        template = template.replace("{%s}" % name, str(path).replace("\\", "\\\\"))
+    (root / "steamapps" / "libraryfolders.vdf").write_text(template)
+    return root
+
+
+def test_library_folders_lists_each_existing_root_once(steam_install):
+    assert steam.library_folders(str(steam_install)) == [str(steam_install), str(steam_install / "library")]
+
+
+def test_find_installed_games_across_library_folders(steam_install):
+    games = steam.find_installed_games(str(steam_install), cache=file_watch.ManifestCache(steam.read_app_manifest))
+
+    assert sorted((game["external_id"], game["title"]) for game in games) == [
+        ("1245620", 'ELDEN RING "Shadow" Edition'),
+        ("620", "Portal 2"),
+    ]
+    portal = next(game for game in games if game["external_id"] == "620")
+    assert portal["url"] == "steam://rungameid/620"
+    assert portal["install_location"] == str(steam_install / "steamapps" / "common" / "Portal 2")
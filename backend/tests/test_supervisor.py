@@ -0,0 +1,154 @@
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+import supervisor
+
+pytestmark = pytest.mark.skipif(os.name == "nt", reason="dummy games are POSIX scripts")
+
+# A dummy game that starts a child of its own, as launcher scripts do, and
+# writes the child's PID to the file given as its first argument
+GAME_SCRIPT = f"""#!{sys.executable}
+import subprocess, sys, time
+child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+with open(sys.argv[1], "w") as f:
+    f.write(str(child.pid))
+time.sleep(60)
+"""
+
+
+def running(pid):
+    # Zombies count as gone: nothing may reap orphans inside a container
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().rsplit(")", 1)[1].split()[0] != "Z"
+    except FileNotFoundError:
+        return False
+    except OSError:
+        return supervisor.pid_alive(pid)
+
+
+def wait_until(condition, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return condition()
+
+
+def make_game(library, tmp_path):
+    script = tmp_path / "game.py"
+    script.write_text(GAME_SCRIPT)
+    script.chmod(0o755)
+    library.add_game_to_db("Dummy", str(script))
+    with library.connection() as con:
+        return con.execute("SELECT id FROM games").fetchone()[0], script
+
+
+def insert_running(library, pid, identity):
+    with library.transaction() as con:
+        return con.execute("INSERT INTO sessions (game_id, pid, process_identity, command, status, started_at) "
+                           "VALUES (1, ?, ?, 'game', 'running', ?)", (pid, identity, time.time())).lastrowid
+
+
+def session_status(library, session_id):
+    with library.connection() as con:
+        return con.execute("SELECT status FROM sessions WHERE id = ?", (session_id,)).fetchone()[0]
+
+
+@pytest.fixture
+def bystander():
+    # An unrelated process that has "reused" the PID of an old session
+    process = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+    yield process
+    process.kill()
+    process.wait()
+
+
+def test_stop_ends_the_whole_process_group(library, tmp_path):
+    game_id, script = make_game(library, tmp_path)
+    pid_file = tmp_path / "child.pid"
+    session = library.get_supervisor().launch(game_id, [str(script), str(pid_file)])
+    assert wait_until(lambda: pid_file.exists() and pid_file.read_text())
+    child = int(pid_file.read_text())
+
+    assert library.stop_session(session["id"])
+
+    assert wait_until(lambda: not running(child))
+    assert wait_until(lambda: session_status(library, session["id"]) == "stopped")
+
+
+def test_stop_from_another_server_process_checks_identity(library, tmp_path):
+    game_id, script = make_game(library, tmp_path)
+    pid_file = tmp_path / "child.pid"
+    process = subprocess.Popen([str(script), str(pid_file)], start_new_session=True)
+    try:
+        assert wait_until(lambda: pid_file.exists() and pid_file.read_text())
+        child = int(pid_file.read_text())
+        session_id = insert_running(library, process.pid, supervisor.process_identity(process.pid))
+
+        assert [s["id"] for s in library.running_sessions()] == [session_id]
+        assert library.stop_session(session_id)
+
+        assert process.wait(10) is not None
+        assert wait_until(lambda: not running(child))
+    finally:
+        process.kill()
+        process.wait()
+
+
+@pytest.mark.skipif(supervisor.process_identity(os.getpid()) is None, reason="no process identity on this system")
+def test_reused_pid_is_never_signalled(library, bystander):
+    stale = insert_running(library, bystander.pid, "an earlier process")
+    legacy = insert_running(library, bystander.pid, None)
+
+    assert library.running_sessions() == []
+    assert not library.stop_session(stale)
+    assert not library.stop_session(legacy)
+
+    assert bystander.poll() is None
+    assert session_status(library, stale) == "lost"
+    assert session_status(library, legacy) == "lost"
+
+
+def test_stale_sessions_are_closed_when_the_supervisor_starts(library, bystander):
+    gone = subprocess.Popen([sys.executable, "-c", "pass"])
+    gone.wait()
+    session_id = insert_running(library, gone.pid, "an earlier process")
+
+    library.get_supervisor()
+
+    assert session_status(library, session_id) == "lost"
+    assert bystander.poll() is None
+
+
+def test_exit_is_recorded(library, tmp_path):
+    script = tmp_path / "quick.py"
+    script.write_text(f"#!{sys.executable}\nimport sys\nsys.exit(3)\n")
+    script.chmod(0o755)
+    library.add_game_to_db("Quick", str(script))
+
+    session = library.run_game(1)
+
+    assert wait_until(lambda: session_status(library, session["id"]) == "exited")
+    assert library.get_supervisor().get_session(session["id"])["exit_code"] == 3
+
+
+def test_store_url_launch_is_handed_off(library, monkeypatch):
+    opener = [sys.executable, "-c", "import time; time.sleep(0.2)"]
+    monkeypatch.setattr(library, "_open_url_command", lambda url: (opener, False))
+    library.add_game_to_db("Store Game", "steam://rungameid/10")
+
+    session = library.run_game(1)
+
+    assert session["status"] == "handed_off" and session["duration"] is None
+    assert library.running_sessions() == []
+    assert not library.stop_session(session["id"])
+    assert wait_until(lambda: library.get_supervisor().get_session(session["id"])["ended_at"] is not None)
+    assert session_status(library, session["id"]) == "handed_off"
+    with library.connection() as con:
+        assert con.execute("SELECT playtime, launch_count FROM games WHERE id = 1").fetchone() == (0, 1)